@@ -31,10 +31,11 @@ from .add_compression_spring import ROMLYADDON_OT_add_compression_spring
 from .add_pinheader import ROMLYADDON_OT_add_pinheader
 from .add_loadcell import ROMLYADDON_OT_add_loadcell
 from .add_nut_hole import ROMLYADDON_OT_add_nut_hole
-from .export_collection_as_stl import ROMLYADDON_OT_export_collection_as_stl, ROMLYADDON_OT_export_selection_as_stl
+from .export_collection_as_stl import ROMLYADDON_OT_export_collection_as_stl, ROMLYADDON_OT_export_all_collections_as_stl, ROMLYADDON_OT_export_selection_as_stl
 from .select_edges_on_fair_surface import ROMLYADDON_OT_select_edges_on_fair_surface, ROMLYADDON_OT_select_edges_along_axis, ROMLYADDON_OT_toggle_edge_bevel_weight, ROMLYADDON_OT_transform_object_aligning_edge_to_axis
 from .language_panel import ROMLYADDON_PT_language_panel, ROMLYADDON_OT_change_language
 from .reload_and_run_script import ROMLYADDON_OT_reload_and_run_script
+from .clear_mesh_cache import ROMLYADDON_OT_clear_mesh_cache
 from .romly_translation import TRANSLATION_DICT
 
 
@@ -175,6 +176,8 @@ class ROMLYADDON_MT_romly_add_mesh_menu_parent(bpy.types.Menu):
 			(ROMLYADDON_OT_add_loadcell, 'Add Loadcell', 'NLA_PUSHDOWN'),
 			(None, None, None),
 			(ROMLYADDON_OT_add_nut_hole, 'Add Nut Hole', 'SEQ_CHROMA_SCOPE'),
+			(None, None, None),
+			(ROMLYADDON_OT_clear_mesh_cache, 'Clear Mesh Cache', 'TRASH'),
 		]
 		for operator, text, icon in OPERATORS:
 			if operator is None:
@@ -208,6 +211,7 @@ class ROMLYADDON_MT_romly_export_collection_as_stl_menu_parent(bpy.types.Menu):
 	def draw(self, context):
 		layout = self.layout
 		layout.operator(ROMLYADDON_OT_export_collection_as_stl.bl_idname, text=bpy.app.translations.pgettext_iface('Export Collection as STL'), icon='EXPORT')
+		layout.operator(ROMLYADDON_OT_export_all_collections_as_stl.bl_idname, text=bpy.app.translations.pgettext_iface('Export All Collections as STL'), icon='EXPORT')
 
 
 
@@ -252,6 +256,7 @@ MY_CLASS_LIST = [
 	ROMLYADDON_OT_add_nut_hole,
 	ROMLYADDON_MT_romly_add_mesh_menu_parent,
 	ROMLYADDON_OT_export_collection_as_stl,
+	ROMLYADDON_OT_export_all_collections_as_stl,
 	ROMLYADDON_OT_export_selection_as_stl,
 	ROMLYADDON_MT_romly_export_collection_as_stl_menu_parent,
 	ROMLYADDON_MT_romly_export_selection_as_stl_menu_parent,
@@ -262,6 +267,7 @@ MY_CLASS_LIST = [
 	ROMLYADDON_PT_language_panel,
 	ROMLYADDON_OT_change_language,
 	ROMLYADDON_OT_reload_and_run_script,
+	ROMLYADDON_OT_clear_mesh_cache,
 ]
 
 
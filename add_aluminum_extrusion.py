@@ -6,6 +6,7 @@ from bmesh.types import BMVert
 from bpy.props import *
 from mathutils import Vector, Matrix, Quaternion
 from typing import NamedTuple
+import numpy as np
 
 
 
@@ -20,6 +21,21 @@ from . import romly_utils
 
 
 
+# 以前の方法（面ごとに掃引してから内部の面を削除する）で作成する（比較用）
+ALUMINUM_EXTRUSION_LEGACY_BUILDER_FLAG = 'ALUMINUM_EXTRUSION_LEGACY_BUILDER'
+
+# 以前の方法（掃引した立体に円柱のブーリアンで穴を開ける）で穴を開ける（比較用）
+ALUMINUM_EXTRUSION_LEGACY_HOLES_FLAG = 'ALUMINUM_EXTRUSION_LEGACY_HOLES'
+
+
+
+
+
+
+
+
+
+
 def mirror_point(point: Vector, normal: Vector) -> Vector:
 	"""
 	指定された点を、特定の法線を持つ平面に関してミラーリングします。
@@ -353,7 +369,8 @@ def on_size_update(self, context):
 
 
 
-def make_corner_holes(object, spec: AluminumExtrusionSpec, diameter: float, space: float, keep_modifiers = False, vertices: int = 32):
+def create_corner_hole_cutters(object, spec: AluminumExtrusionSpec, diameter: float, space: float, vertices: int = 32) -> list[bpy.types.Object]:
+	"""四隅の穴を開けるための円柱を作って返す。"""
 	HOLE_X = space / 2 + spec.size / 2 * (spec.x_slots - 1)
 	HOLE_Y = space / 2 + spec.size / 2 * (spec.y_slots - 1)
 	locations = [
@@ -366,10 +383,24 @@ def make_corner_holes(object, spec: AluminumExtrusionSpec, diameter: float, spac
 	# 全体を貫くのに十分な長さ
 	depth = object.dimensions[2] * 2.1
 
+	cutters = []
 	for l in locations:
 		bpy.ops.mesh.primitive_cylinder_add(vertices=vertices, radius=diameter / 2, depth=depth, enter_editmode=False, align='WORLD', location=l, scale=(1, 1, 1))
-		toolObj = bpy.data.objects[bpy.context.active_object.name]
-		romly_utils.apply_boolean_object(object=object, boolObject=toolObj, unlink=not keep_modifiers, apply=not keep_modifiers)
+		cutters.append(bpy.data.objects[bpy.context.active_object.name])
+	return cutters
+
+
+
+
+
+
+
+
+
+
+def make_corner_holes(object, spec: AluminumExtrusionSpec, diameter: float, space: float, keep_modifiers = False, vertices: int = 32):
+	cutters = create_corner_hole_cutters(object, spec=spec, diameter=diameter, space=space, vertices=vertices)
+	romly_utils.apply_boolean_objects(object=object, boolObjects=cutters, unlink=not keep_modifiers, apply=not keep_modifiers)
 
 
 
@@ -415,7 +446,7 @@ def make_corner_bevels(object: bpy.types.Object, frame_size: float, x_slots: int
 		return False
 
 	bpy.context.view_layer.objects.active = object
-	bpy.ops.object.mode_set(mode='EDIT')
+	romly_utils.set_mode('EDIT')
 
 	# Bevel Weightを設定
 	mesh = bmesh.from_edit_mesh(object.data)
@@ -429,7 +460,7 @@ def make_corner_bevels(object: bpy.types.Object, frame_size: float, x_slots: int
 			edge[bevel_layer] = 1.0
 
 	# オブジェクトモードに戻す
-	bpy.ops.object.mode_set(mode='OBJECT')
+	romly_utils.set_mode('OBJECT')
 
 
 
@@ -441,7 +472,7 @@ def make_corner_bevels(object: bpy.types.Object, frame_size: float, x_slots: int
 
 def cleanup_interior_faces(object: bpy.types.Object) -> None:
 	bpy.context.view_layer.objects.active = object
-	bpy.ops.object.mode_set(mode='EDIT')
+	romly_utils.set_mode('EDIT')
 
 	# 内部の面を選択
 	bpy.ops.mesh.select_all(action='DESELECT')
@@ -450,21 +481,21 @@ def cleanup_interior_faces(object: bpy.types.Object) -> None:
 	# 選択した面を削除
 	bpy.ops.mesh.delete(type='FACE')
 	bpy.ops.mesh.select_mode(use_extend=False, use_expand=False, type='VERT')
-	bpy.ops.object.mode_set(mode='OBJECT')
+	romly_utils.set_mode('OBJECT')
 
 
 	# 平面上にある辺（融解すべきもの）を選択
 	# いちいち編集モードを切り替えてるのはなぜかこうしないと選択されないため。たぶんモード切替時に内部で必要な処理が走ってるっぽい。
-	bpy.ops.object.mode_set(mode='EDIT')
+	romly_utils.set_mode('EDIT')
 	romly_utils.select_edges_on_fair_surface(object)
-	bpy.ops.object.mode_set(mode='OBJECT')
+	romly_utils.set_mode('OBJECT')
 
 
 	# 辺を融解
 	# こちらも同様にいちいち編集モードを切り替える必要がある
-	bpy.ops.object.mode_set(mode='EDIT')
+	romly_utils.set_mode('EDIT')
 	bpy.ops.mesh.dissolve_edges()
-	bpy.ops.object.mode_set(mode='OBJECT')
+	romly_utils.set_mode('OBJECT')
 
 
 
@@ -479,19 +510,22 @@ def make_holes(object: bpy.types.Object, spec: AluminumExtrusionSpec, center_hol
 	# 穴を開ける時のブーリアンモデファイアとシリンダーを残すか。デバッグ用。
 	DEBUG_KEEP_HOLE_MODS = False
 
-	# 中心に穴を開ける
+	# 中心の穴の円柱
+	cutters = []
 	for x in range(spec.x_slots):
 		for y in range(spec.y_slots):
 			center = [0, 0, 0]
 			center[0] = spec.size * x - 0.5 * spec.size * (spec.x_slots - 1)
 			center[1] = -spec.size * y + 0.5 * spec.size * (spec.y_slots - 1)
 			bpy.ops.mesh.primitive_cylinder_add(vertices=vertices, radius=center_hole_diameter / 2, depth=object.dimensions[2] * 2.1, enter_editmode=False, align='WORLD', location=center, scale=(1, 1, 1))
-			toolObj = bpy.data.objects[bpy.context.active_object.name]
-			romly_utils.apply_boolean_object(object=object, boolObject=toolObj, unlink=not DEBUG_KEEP_HOLE_MODS, apply=not DEBUG_KEEP_HOLE_MODS)
+			cutters.append(bpy.data.objects[bpy.context.active_object.name])
 
-	# 四隅に穴を開ける
+	# 四隅の穴の円柱
 	if corner_hole_diameter > 0:
-		make_corner_holes(object, spec=spec, diameter=corner_hole_diameter, space=corner_hole_space, keep_modifiers=DEBUG_KEEP_HOLE_MODS, vertices=vertices)
+		cutters.extend(create_corner_hole_cutters(object, spec=spec, diameter=corner_hole_diameter, space=corner_hole_space, vertices=vertices))
+
+	# 穴は重ならないので、一度のブーリアンでまとめて開ける
+	romly_utils.apply_boolean_objects(object=object, boolObjects=cutters, unlink=not DEBUG_KEEP_HOLE_MODS, apply=not DEBUG_KEEP_HOLE_MODS)
 
 	# 四隅のベベルを作成
 	make_corner_bevels(object, frame_size=spec.size, x_slots=spec.x_slots, y_slots=spec.y_slots)
@@ -505,6 +539,52 @@ def make_holes(object: bpy.types.Object, spec: AluminumExtrusionSpec, center_hol
 
 
 
+def make_hole_cutouts(spec: AluminumExtrusionSpec, center_hole_diameter: float, corner_hole_diameter: float, corner_hole_space: float, vertices: int) -> list[np.ndarray]:
+	"""
+	断面からくり抜く中心と四隅の穴の多角形を作成する。`make_holes`の円柱と同じ位置に頂点を置く。
+
+	Parameters
+	----------
+	spec : AluminumExtrusionSpec
+		アルミフレームの仕様（大きさ）。
+	center_hole_diameter : float
+		中心の穴の直径。0の場合は中心の穴を開けない。
+	corner_hole_diameter : float
+		四隅の穴の直径。0の場合は四隅の穴を開けない。
+	corner_hole_space : float
+		四隅の穴どうしの距離。
+	vertices : int
+		穴の頂点数。
+
+	Returns
+	-------
+	list[np.ndarray]
+		穴の多角形の頂点（反時計回り）の(vertices, 2)の配列のリスト。
+	"""
+	holes = []
+	if center_hole_diameter > 0:
+		for x in range(spec.x_slots):
+			for y in range(spec.y_slots):
+				center = (spec.size * x - 0.5 * spec.size * (spec.x_slots - 1), -spec.size * y + 0.5 * spec.size * (spec.y_slots - 1), 0)
+				holes.append((center, center_hole_diameter))
+	if corner_hole_diameter > 0:
+		HOLE_X = corner_hole_space / 2 + spec.size / 2 * (spec.x_slots - 1)
+		HOLE_Y = corner_hole_space / 2 + spec.size / 2 * (spec.y_slots - 1)
+		for center in [(-HOLE_X, HOLE_Y, 0), (HOLE_X, HOLE_Y, 0), (-HOLE_X, -HOLE_Y, 0), (HOLE_X, -HOLE_Y, 0)]:
+			holes.append((center, corner_hole_diameter))
+
+	# primitive_cylinder_addと同じく、真上の頂点から始まる
+	return [np.array(romly_utils.make_circle_vertices(diameter / 2, num_vertices=vertices, center=center, start_angle_degree=90))[:, :2] for center, diameter in holes]
+
+
+
+
+
+
+
+
+
+
 class ROMLYADDON_OT_add_aluminum_extrusion(bpy.types.Operator):
 	bl_idname = "romlyaddon.add_aluminum_extrusion"
 	bl_label = bpy.app.translations.pgettext_iface('Add Aluminium Extrusion')
@@ -623,12 +703,15 @@ class ROMLYADDON_OT_add_aluminum_extrusion(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# パラメータを取得
 		length = self.val_length
 		bevel_width = self.val_bevel_width
 		bevel_segments = self.val_bevel_segments
 		hole_segments = self.val_hole_segments
+		legacy_builder = romly_utils.legacy_flag(ALUMINUM_EXTRUSION_LEGACY_BUILDER_FLAG)
+		legacy_holes = romly_utils.legacy_flag(ALUMINUM_EXTRUSION_LEGACY_HOLES_FLAG)
 
 		# 現在の選択を解除
 		bpy.ops.object.select_all(action='DESELECT')
@@ -644,30 +727,49 @@ class ROMLYADDON_OT_add_aluminum_extrusion(bpy.types.Operator):
 			wall_thickness=self.val_thickness,
 			middle_wall_thickness=self.val_middle_wall_thickness,
 			x_bone_thickness=self.val_x_bone_thickness)
-		vertices, faces = make_aluminum_extrusion_bottom(aluminum_extrusion_spec)
 
-		# 掃引
-		extrude_faces = []
-		for face in faces:
-			romly_utils.extrude_face(vertices, extrude_faces, extrude_vertex_indices=face, z_offset=length)
-		faces.extend(extrude_faces)
+		def build() -> bpy.types.Object:
+			vertices, faces = make_aluminum_extrusion_bottom(aluminum_extrusion_spec)
 
-		obj = romly_utils.cleanup_mesh(romly_utils.create_object(vertices, faces=faces, name='Aluminum Extrusion'))
-		bpy.context.collection.objects.link(obj)
+			if legacy_builder:
+				# 掃引
+				extrude_faces = []
+				for face in faces:
+					romly_utils.extrude_face(vertices, extrude_faces, extrude_vertex_indices=face, z_offset=length)
+				faces.extend(extrude_faces)
 
+				obj = romly_utils.cleanup_mesh(romly_utils.create_object(vertices, faces=faces, name='Aluminum Extrusion'))
+				bpy.context.collection.objects.link(obj)
 
+				# 連結部に残ってしまった面（立体の内部にある面）を削除する
+				cleanup_interior_faces(obj)
+			else:
+				# 断面の部品をつなげて境界だけを掃引するので、内部の面はできない。穴は掃引する前の断面からくり抜く
+				cutouts = None if legacy_holes else make_hole_cutouts(aluminum_extrusion_spec, center_hole_diameter=self.val_center_hole_diameter, corner_hole_diameter=self.val_corner_hole_diameter, corner_hole_space=self.val_corner_hole_space, vertices=hole_segments)
+				profile = romly_utils.make_extrusion_profile(vertices, faces, cutouts=cutouts)
+				obj = romly_utils.create_extruded_profile_object(profile, length=length, name='Aluminum Extrusion')
+				bpy.context.collection.objects.link(obj)
 
-		# 連結部に残ってしまった面（立体の内部にある面）を削除する
-		cleanup_interior_faces(obj)
 
+			bpy.context.view_layer.objects.active = obj
 
-		bpy.context.view_layer.objects.active = obj
+			if legacy_builder or legacy_holes:
+				make_holes(obj, aluminum_extrusion_spec, center_hole_diameter=self.val_center_hole_diameter, corner_hole_diameter=self.val_corner_hole_diameter, corner_hole_space=self.val_corner_hole_space, vertices=hole_segments)
+			else:
+				make_corner_bevels(obj, frame_size=aluminum_extrusion_spec.size, x_slots=aluminum_extrusion_spec.x_slots, y_slots=aluminum_extrusion_spec.y_slots)
 
-		make_holes(obj, aluminum_extrusion_spec, center_hole_diameter=self.val_center_hole_diameter, corner_hole_diameter=self.val_corner_hole_diameter, corner_hole_space=self.val_corner_hole_space, vertices=hole_segments)
 
 
+			obj = romly_utils.cleanup_mesh(obj)
+			bpy.context.collection.objects.unlink(obj)
+			return obj
 
-		obj = romly_utils.cleanup_mesh(obj)
+		# 同じ断面と長さのフレームは、ディスクキャッシュに保存されたメッシュから作る（四隅のベベルウェイトもキャッシュされる）
+		cache_key = ('aluminum_extrusion', tuple(aluminum_extrusion_spec), length,
+			self.val_center_hole_diameter, self.val_corner_hole_diameter, self.val_corner_hole_space, hole_segments, legacy_builder, legacy_holes)
+		obj = romly_utils.create_cached_object(cache_key, build, name='Aluminum Extrusion')
+		bpy.context.collection.objects.link(obj)
+		bpy.context.view_layer.objects.active = obj
 
 		# ベベルを追加。ベベルは幅が0だと適用するとエラーになるので、0より大きい場合にのみ追加する
 		if bevel_width > 0:
@@ -69,6 +69,7 @@ class ROMLYADDON_OT_add_box(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		offset = Vector([float(self.val_origin_x), float(self.val_origin_y), float(self.val_origin_z)]) * self.val_size
 		obj_name = 'Cube' if self.val_size[0] == self.val_size[1] and self.val_size[1] == self.val_size[2] else 'Cuboid'
@@ -6,6 +6,7 @@ from bmesh.types import BMVert
 from bpy.props import *
 from mathutils import Vector, Matrix, Quaternion
 from typing import NamedTuple
+import numpy as np
 
 
 
@@ -20,6 +21,121 @@ from . import romly_utils
 
 
 
+# フレネル積分をべき級数で計算する範囲の上限。これより大きい場合は連分数で計算する
+FRESNEL_SERIES_LIMIT = 1.5
+
+# べき級数の項数。FRESNEL_SERIES_LIMITでも最後の項は1e-16以下になる
+FRESNEL_SERIES_TERMS = 40
+
+# 連分数の反復の上限と、収束したとみなす誤差
+FRESNEL_CONTINUED_FRACTION_MAX_ITERATIONS = 100
+FRESNEL_EPSILON = 1e-15
+
+# 適応サンプリングで作る頂点数（区間数）の上限
+ADAPTIVE_SAMPLING_MAX_VERTICES = 1024
+
+
+
+
+
+def fresnel_integrals(z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	フレネル積分 C(z) = ∫[0, z] cos(πu²/2) du と S(z) = ∫[0, z] sin(πu²/2) du を、配列のすべての要素についてまとめて計算する。
+	|z| <= 1.5 はべき級数、それより大きい場合は漸近展開（相補誤差関数）を連分数にしたものをLentz法で計算する。どちらも誤差は1e-15程度。
+
+	Parameters
+	----------
+	z : np.ndarray
+		積分の上限の配列。
+
+	Returns
+	-------
+	tuple[np.ndarray, np.ndarray]
+		C(z)とS(z)の配列。
+	"""
+	z = np.asarray(z, dtype=np.float64)
+	x = np.abs(z)
+	c = np.zeros_like(x)
+	s = np.zeros_like(x)
+
+	# べき級数。k番目の項 x (πx²/2)^k / k! / (2k + 1) が、kが偶数ならCに、奇数ならSに符号を交互に変えて足される
+	small = x <= FRESNEL_SERIES_LIMIT
+	if np.any(small):
+		xs = x[small]
+		fact = 0.5 * math.pi * xs * xs
+		term = xs.copy()
+		sum_c = xs.copy()
+		sum_s = np.zeros_like(xs)
+		for k in range(1, FRESNEL_SERIES_TERMS):
+			term = term * fact / k
+			sign = -1.0 if (k // 2) % 2 else 1.0
+			if k % 2 == 0:
+				sum_c += sign * term / (2 * k + 1)
+			else:
+				sum_s += sign * term / (2 * k + 1)
+		c[small] = sum_c
+		s[small] = sum_s
+
+	# 連分数（Numerical Recipesのfrenelと同じ方法）
+	large = ~small
+	if np.any(large):
+		xl = x[large]
+		pix2 = math.pi * xl * xl
+		b = 1.0 - 1j * pix2
+		cc = np.full(len(xl), 1e300, dtype=np.complex128)
+		d = 1.0 / b
+		h = d.copy()
+		n = -1
+		for _ in range(FRESNEL_CONTINUED_FRACTION_MAX_ITERATIONS):
+			n += 2
+			a = -n * (n + 1)
+			b = b + 4.0
+			d = 1.0 / (a * d + b)
+			cc = b + a / cc
+			delta = cc * d
+			h = h * delta
+			if np.all(np.abs(delta - 1.0) < FRESNEL_EPSILON):
+				break
+		h = h * (xl - 1j * xl)
+		cs = (0.5 + 0.5j) * (1.0 - np.exp(0.5j * pix2) * h)
+		c[large] = cs.real
+		s[large] = cs.imag
+
+	# C(z)とS(z)は奇関数
+	negative = z < 0
+	c[negative] = -c[negative]
+	s[negative] = -s[negative]
+	return c, s
+
+
+
+
+
+def euler_spiral(a: float, t: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	クロソイド曲線（オイラー螺旋）の指定された位置（時間、割合、進み具合）における座標を、配列でまとめて求める。
+	x(t) = ∫[0, t] cos(a s² / 2) ds、y(t) = ∫[0, t] sin(a s² / 2) ds を、s = u √(π / a) と置き換えてフレネル積分で計算する。
+
+	Parameters
+	----------
+	a : float
+		クロソイドパラメーター。
+	t : np.ndarray
+		曲線上の位置の配列。
+
+	Returns
+	-------
+	tuple[np.ndarray, np.ndarray]
+		X座標とY座標の配列。
+	"""
+	scale = math.sqrt(math.pi / a)
+	c, s = fresnel_integrals(np.asarray(t, dtype=np.float64) / scale)
+	return scale * c, scale * s
+
+
+
+
+
 def tangent_at(a: float, t: float) -> tuple[float, float]:
 	"""
 	クロソイド曲線での指定された位置での接線の角度を求める（接線を斜辺とする三角形の底辺と高さを返す）。
@@ -43,6 +159,66 @@ def tangent_at(a: float, t: float) -> tuple[float, float]:
 
 
 
+def calc_adaptive_t_values(a: float, t_max: float, max_deviation: float) -> tuple[np.ndarray, bool]:
+	"""
+	クロソイド曲線の各区間の弦（頂点を結ぶ辺）と曲線とのずれが、指定された許容値以下になるような頂点の位置を求める。
+	クロソイド曲線はtが弧長そのもので、曲率は a t（`radius_of_curvature`の逆数）。曲率κの円弧を長さhの弦で結ぶとずれは h²κ/8 なので、
+	区間の数の密度を √(κ / 8δ) にすれば、どの区間もずれがδ程度になる。これを積分した (2/3)√(a / 8δ) t^(3/2) が頂点の番号になるので、
+	頂点の位置は t_max (i / n)^(2/3) で求まる。始点の区間だけは曲率が0から増えていくぶん2/√3倍ずれるので、その分だけ許容値を小さくしている。
+
+	Parameters
+	----------
+	a : float
+		クロソイドパラメーター。
+	t_max : float
+		曲線の終点の位置。
+	max_deviation : float
+		弦と曲線のずれの許容値。
+
+	Returns
+	-------
+	tuple[np.ndarray, bool]
+		0からt_maxまでの頂点の位置の配列（区間の数は1以上、ADAPTIVE_SAMPLING_MAX_VERTICES以下）と、
+		上限に達したために許容値を守れなかったかどうか。
+	"""
+	deviation = max_deviation * math.sqrt(3) / 2
+	num_segments = max(math.ceil(2 / 3 * math.sqrt(a / (8 * deviation)) * t_max ** 1.5), 1)
+	capped = num_segments > ADAPTIVE_SAMPLING_MAX_VERTICES
+	num_segments = min(num_segments, ADAPTIVE_SAMPLING_MAX_VERTICES)
+	return t_max * (np.arange(num_segments + 1) / num_segments) ** (2 / 3), capped
+
+
+
+
+
+def calc_adaptive_arc_num_vertices(radius: float, angle_radians: float, max_deviation: float) -> tuple[int, bool]:
+	"""
+	円弧を辺で結んだときに、弦と円弧のずれ（サジッタ）が指定された許容値以下になる区間の数を求める。
+
+	Parameters
+	----------
+	radius : float
+		円弧の半径。
+	angle_radians : float
+		円弧の角度（ラジアン）。
+	max_deviation : float
+		弦と円弧のずれの許容値。
+
+	Returns
+	-------
+	tuple[int, bool]
+		区間の数（1以上、ADAPTIVE_SAMPLING_MAX_VERTICES以下）と、上限に達したために許容値を守れなかったかどうか。
+	"""
+	if max_deviation >= radius:
+		return 1, False
+	segment_angle = 2 * math.acos(1 - max_deviation / radius)
+	num_segments = max(math.ceil(angle_radians / segment_angle), 1)
+	return min(num_segments, ADAPTIVE_SAMPLING_MAX_VERTICES), num_segments > ADAPTIVE_SAMPLING_MAX_VERTICES
+
+
+
+
+
 class ClothoidCurveVertices(NamedTuple):
 	"""
 	make_clothoid_curve_vertices の戻り値を格納する NamedTuple
@@ -57,18 +233,21 @@ class ClothoidCurveVertices(NamedTuple):
 		曲線の終点での接触円の中心座標
 	angle_radians: float
 		曲線の終点での接触角度。X軸プラスベクトルを左回りにこの角度だけ回転すると終点からまっすぐ伸ばした線になり、Y軸プラスベクトルを左回りにこの角度だけ回転すると終点での垂直線（接触円に向かう直線）の向きになる。
+	sampling_capped: bool
+		適応サンプリングで頂点数の上限に達し、ずれが許容値を超えているかどうか。
 	"""
 	vertices: list[Vector]
 	osculating_circle_radius: float
 	osculating_circle_center: Vector
 	angle_radians: float
+	sampling_capped: bool = False
 
 
 
 
 
 # MARK: create_clothoid_curve_vertices
-def create_clothoid_curve_vertices(clothoid_param_A: float, curve_length: float, num_vertices: int, t_max: float = math.inf) -> ClothoidCurveVertices:
+def create_clothoid_curve_vertices(clothoid_param_A: float, curve_length: float, num_vertices: int, t_max: float = math.inf, max_deviation: float = 0) -> ClothoidCurveVertices:
 	"""
 
 	Parameters
@@ -85,6 +264,8 @@ def create_clothoid_curve_vertices(clothoid_param_A: float, curve_length: float,
 
 		例えば45度になったら止めたい場合は下記のように指定する。
 		t_max = math.sqrt((2 * math.radians(45)) / clothoid_param_A)
+	max_deviation : float, optional
+		0より大きい場合は、頂点を等間隔ではなく曲率に応じて配置し、辺と曲線のずれがこの値以下になるようにする。このときnum_verticesは使われない。
 
 	Returns
 	-------
@@ -92,19 +273,6 @@ def create_clothoid_curve_vertices(clothoid_param_A: float, curve_length: float,
 		生成した頂点群と終点での接触円に関する情報を返す。
 	"""
 
-	def euler_spiral(a, t):
-		"""クロソイド曲線（オイラー螺旋）を描く関数。指定された位置（時間、割合、進み具合）における座標を返す。"""
-		x = 0
-		y = 0
-		dt = 0.01 # 時間の刻み幅。細かいほどスムーズなカーブになる。
-		for i in range(int(t / dt)):
-			angle = 0.5 * a * dt * dt * (i ** 2)
-			dx = math.cos(angle) * dt
-			dy = math.sin(angle) * dt
-			x += dx
-			y += dy
-		return x, y
-
 	# Function to calculate radius of osculating circle
 	def radius_of_curvature(a, t):
 		"""クロソイド曲線の指定された位置における接触円の半径を返す関数。"""
@@ -118,25 +286,33 @@ def create_clothoid_curve_vertices(clothoid_param_A: float, curve_length: float,
 	if math.isinf(t_max):
 		t_max = curve_length ** 2 / (clothoid_param_A ** 2 * math.pi)
 
-	step = t_max / num_vertices
-	t_values = [i * step for i in range(num_vertices + 1)]
-	vertices = []
+	sampling_capped = False
+	if max_deviation > 0:
+		# 曲率に応じて頂点を配置
+		t_values, sampling_capped = calc_adaptive_t_values(clothoid_param_A, t_max, max_deviation)
+	else:
+		step = t_max / num_vertices
+		t_values = np.arange(num_vertices + 1) * step
+
+	# すべての頂点の座標をまとめて計算
+	xs, ys = euler_spiral(clothoid_param_A, t_values)
+	vertices = [(x, y, 0) for x, y in zip(xs.tolist(), ys.tolist())]
+
+	# 終点での接触円
 	radius = 0
 	center_x, center_y = 0, 0
 	angle_radians = 0
-	for t in t_values:
-		x, y = euler_spiral(clothoid_param_A, t)
-		vertices.append((x, y, 0))
-
-		if t > 0:
-			tangent_x, tangent_y = tangent_at(clothoid_param_A, t)
-			radius = radius_of_curvature(clothoid_param_A, t)
-			center_x = x - radius * tangent_y
-			center_y = y + radius * tangent_x
+	t = t_values[-1]
+	if t > 0:
+		x, y = vertices[-1][0], vertices[-1][1]
+		tangent_x, tangent_y = tangent_at(clothoid_param_A, t)
+		radius = radius_of_curvature(clothoid_param_A, t)
+		center_x = x - radius * tangent_y
+		center_y = y + radius * tangent_x
 
-			angle_radians = math.atan2(tangent_y, tangent_x)
+		angle_radians = math.atan2(tangent_y, tangent_x)
 
-	return ClothoidCurveVertices(vertices=vertices, osculating_circle_radius=radius, osculating_circle_center=Vector((center_x, center_y, 0)), angle_radians=angle_radians)
+	return ClothoidCurveVertices(vertices=vertices, osculating_circle_radius=radius, osculating_circle_center=Vector((center_x, center_y, 0)), angle_radians=angle_radians, sampling_capped=sampling_capped)
 
 
 
@@ -180,7 +356,7 @@ def translate_vertices(vertices: list[Vector | tuple[float, float, float]], offs
 
 
 # MARK: create_clothoid_only_corner_vertices
-def create_clothoid_only_corner_vertices(clothoid_param_A: float, curve_length: float, num_curve_vertices: int) -> list[tuple[float, float, float]]:
+def create_clothoid_only_corner_vertices(clothoid_param_A: float, curve_length: float, num_curve_vertices: int, max_deviation: float = 0) -> tuple[list[tuple[float, float, float]], bool]:
 	"""
 	クロソイド曲線のみを使った角部分の頂点群を作成する。X軸プラス方向からY軸プラス方向へ90度曲がる軌跡の頂点群で、開始座標は(0, 0, 0)、終了座標は第1象限のどこか。
 	接線が45度になるまでのクロソイド曲線と、その曲線を反転した曲線で90度曲がる感じ。
@@ -193,11 +369,13 @@ def create_clothoid_only_corner_vertices(clothoid_param_A: float, curve_length:
 		クロソイド曲線の曲線長。クロソイド曲線を決定するのに使われるだけで、この長さになるわけではない。
 	num_curve_vertices : int
 		いくつの頂点を作成するか。少ないと当然荒い曲線になっちゃうよ。
+	max_deviation : float, optional
+		0より大きい場合は、辺と曲線のずれがこの値以下になるように頂点を配置する（`create_clothoid_curve_vertices`を参照）。
 
 	Returns
 	-------
-	list[tuple[float, float, float]]
-		頂点群
+	tuple[list[tuple[float, float, float]], bool]
+		頂点群と、適応サンプリングで頂点数の上限に達したかどうか。
 	"""
 
 	# 45度になるときのtを求める
@@ -208,7 +386,8 @@ def create_clothoid_only_corner_vertices(clothoid_param_A: float, curve_length:
 		clothoid_param_A=clothoid_param_A,
 		curve_length=curve_length,
 		num_vertices=num_curve_vertices,
-		t_max=t)
+		t_max=t,
+		max_deviation=max_deviation)
 
 	# 後半部分を作成
 	ending_vertices = []
@@ -220,7 +399,7 @@ def create_clothoid_only_corner_vertices(clothoid_param_A: float, curve_length:
 	for i, v in enumerate(ending_vertices):
 		ending_vertices[i] = tuple(Vector(ending_vertices[i]) - offset + Vector(clothoid_vertices.vertices[-1]))
 
-	return clothoid_vertices.vertices + ending_vertices
+	return clothoid_vertices.vertices + ending_vertices, clothoid_vertices.sampling_capped
 
 
 
@@ -232,7 +411,7 @@ def create_clothoid_only_corner_vertices(clothoid_param_A: float, curve_length:
 
 
 # MARK: create_clothoid_and_arc_corner_vertices
-def create_clothoid_and_arc_corner_vertices(clothoid_param_A: float, curve_length: float, num_curve_vertices: int, num_arc_vertices: int) -> tuple[list[Vector], float]:
+def create_clothoid_and_arc_corner_vertices(clothoid_param_A: float, curve_length: float, num_curve_vertices: int, num_arc_vertices: int, max_deviation: float = 0) -> tuple[list[Vector], float, bool]:
 	"""
 	クロソイド曲線による緩和区間 → 円弧部分 → クロソイド曲線による緩和区間で構成される角部分の頂点群を作成する。
 	クロソイド区間のみで接角が45度に到達してしまった場合は円弧部分は省略され、そのまま再びクロソイド区間となる。
@@ -247,11 +426,13 @@ def create_clothoid_and_arc_corner_vertices(clothoid_param_A: float, curve_lengt
 		クロソイド曲線区間それぞれの頂点数。
 	num_arc_vertices : int
 		円弧部分の頂点数。
+	max_deviation : float, optional
+		0より大きい場合は、クロソイド区間と円弧部分のどちらも辺と曲線のずれがこの値以下になるように頂点を配置する。このときnum_curve_verticesとnum_arc_verticesは使われない。
 
 	Returns
 	-------
-	tuple[list[Vector], float]
-		作成した頂点のリストと、円弧部分の角度（ラジアン）を返す。
+	tuple[list[Vector], float, bool]
+		作成した頂点のリストと、円弧部分の角度（ラジアン）、適応サンプリングで頂点数の上限に達したかどうかを返す。
 	"""
 
 	def mirror_vertices_45degree(vertices: list[Vector]) -> list[Vector]:
@@ -273,13 +454,17 @@ def create_clothoid_and_arc_corner_vertices(clothoid_param_A: float, curve_lengt
 	# 接角が45度になるときの t_45 が、t_max 以上の場合はクロソイド曲線の終点で45度未満ということなので普通に作成、そうでない場合はクロソイド区間のみで最後まで曲がるように作成
 	corner_vertices = []
 	arc_angle = 0
+	sampling_capped = False
 	if t_45 >= t_max:
 		# クロソイド区間の頂点群を作成
 		clothoid_vertices = create_clothoid_curve_vertices(
 			clothoid_param_A=clothoid_param_A,
 			curve_length=curve_length,
 			num_vertices=num_curve_vertices,
-			t_max=t_max)
+			t_max=t_max,
+			max_deviation=max_deviation)
+
+		sampling_capped = clothoid_vertices.sampling_capped
 
 		# 円弧部の角度を求める（クロソイド区間の終点の接角と45度の差を2倍した値）
 		arc_angle = (math.pi / 4 - clothoid_vertices.angle_radians) * 2
@@ -297,6 +482,9 @@ def create_clothoid_and_arc_corner_vertices(clothoid_param_A: float, curve_lengt
 		# 円弧部
 		# クロソイド区間の終点での角度（X軸と接線との角度、Y軸マイナス方向と垂線の角度）が、45度未満なら円弧部を作成
 		if arc_angle > 0:
+			if max_deviation > 0:
+				num_arc_vertices, arc_capped = calc_adaptive_arc_num_vertices(clothoid_vertices.osculating_circle_radius, arc_angle, max_deviation)
+				sampling_capped = sampling_capped or arc_capped
 			arc_vertices = romly_utils.make_circle_vertices(
 				radius=clothoid_vertices.osculating_circle_radius,
 				num_vertices=num_arc_vertices, center=(0, 0, 0),
@@ -310,11 +498,11 @@ def create_clothoid_and_arc_corner_vertices(clothoid_param_A: float, curve_lengt
 
 	else:
 		# 指定されたクロソイドパラメーターと曲線長でクロソイド区間を作った時に接角が45度以上になったので、クロソイド区間のみで角を作成する処理へ
-		corner_vertices = create_clothoid_only_corner_vertices(clothoid_param_A=clothoid_param_A, curve_length=curve_length, num_curve_vertices=num_curve_vertices)
+		corner_vertices, sampling_capped = create_clothoid_only_corner_vertices(clothoid_param_A=clothoid_param_A, curve_length=curve_length, num_curve_vertices=num_curve_vertices, max_deviation=max_deviation)
 		# この場合、円弧部分は作成されないので、円弧部分の角度は0
 		arc_angle = 0
 
-	return corner_vertices, arc_angle
+	return corner_vertices, arc_angle, sampling_capped
 
 
 
@@ -327,7 +515,7 @@ def create_clothoid_and_arc_corner_vertices(clothoid_param_A: float, curve_lengt
 
 
 # MARK: create_clothoid_corner_rectangle
-def create_clothoid_corner_rectangle(clothoid_param_A: float, curve_length: float, num_curve_vertices: int, num_arc_vertices: int, rectangle_width: float, rectangle_height: float) -> tuple[list[Vector], float, float]:
+def create_clothoid_corner_rectangle(clothoid_param_A: float, curve_length: float, num_curve_vertices: int, num_arc_vertices: int, rectangle_width: float, rectangle_height: float, max_deviation: float = 0) -> tuple[list[Vector], float, float, float, bool]:
 	"""
 	クロソイド曲線と円弧を使った角丸を持つ矩形の頂点群を作成する。
 
@@ -345,19 +533,22 @@ def create_clothoid_corner_rectangle(clothoid_param_A: float, curve_length: floa
 		矩形の幅（X軸方向のお大きさ）。角丸部分を含む、全体の幅。
 	rectangle_height : float
 		矩形の高さ（Y軸方向の大きさ）。角丸部分を含む、全体の高さ。
+	max_deviation : float, optional
+		0より大きい場合は、角丸部分の辺と曲線のずれがこの値以下になるように頂点を配置する。角丸部分が縮小される場合、ずれも同じ割合で小さくなる。
 
 	Returns
 	-------
-	tuple[list[Vector], float, float]
-		矩形の頂点群、円弧部分の角度、角丸部分全体の幅（高さ）
+	tuple[list[Vector], float, float, float, bool]
+		矩形の頂点群、円弧部分の角度、角丸部分全体の幅（高さ）、角丸部分の縮小率、適応サンプリングで頂点数の上限に達したかどうか
 	"""
 
 	# 角部分の頂点群を作成
-	corner_vertices, arc_angle = create_clothoid_and_arc_corner_vertices(
+	corner_vertices, arc_angle, sampling_capped = create_clothoid_and_arc_corner_vertices(
 		clothoid_param_A=clothoid_param_A,
 		curve_length=curve_length,
 		num_curve_vertices=num_curve_vertices,
-		num_arc_vertices=num_arc_vertices)
+		num_arc_vertices=num_arc_vertices,
+		max_deviation=max_deviation)
 	corner_width = corner_vertices[-1][0]
 
 	# 角丸部分の大きさが矩形の大きさを越えてしまった場合、矩形サイズに収まるよう縮小する
@@ -388,7 +579,7 @@ def create_clothoid_corner_rectangle(clothoid_param_A: float, curve_length: floa
 	# Y方向中央に移動
 	all_vertices = translate_vertices(all_vertices, Vector((0, -rectangle_height / 2, 0)))
 
-	return all_vertices, arc_angle, corner_width, corner_scale
+	return all_vertices, arc_angle, corner_width, corner_scale, sampling_capped
 
 
 
@@ -408,6 +599,13 @@ CURVE_SPECIFICATION_ITEMS = (
 	(CURVE_SPECIFICATION_BY_RA, 'R & A', 'Input Curve Radius and Clothoid Parameter to determine the clothoid curve.'),
 )
 
+SAMPLING_UNIFORM = 'uniform'
+SAMPLING_ADAPTIVE = 'adaptive'
+SAMPLING_ITEMS = (
+	(SAMPLING_UNIFORM, 'Uniform', 'Place the specified number of vertices at equal intervals along the curve.'),
+	(SAMPLING_ADAPTIVE, 'Adaptive', 'Place vertices according to the curvature so that the edges deviate from the curve by no more than the tolerance.'),
+)
+
 
 
 
@@ -453,6 +651,30 @@ def make_curve_specification_props(self, context, col):
 
 
 
+def make_sampling_props(self, context, col, num_vertices_props: list[str]):
+	"""頂点の配置方法のUIを作成する。適応サンプリングの場合は許容値と、実際に作成された頂点数を表示する。"""
+
+	col.label(text='Sampling')
+	row = col.row(align=True)
+	row.prop(self, 'val_sampling', expand=True)
+	if self.val_sampling == SAMPLING_ADAPTIVE:
+		col.prop(self, 'val_max_deviation')
+		row = col.row(align=True)
+		row.alignment = 'RIGHT'
+		row.label(text=f"{bpy.app.translations.pgettext_iface('Vertices')}: {self.num_sampled_vertices}")
+	else:
+		for prop in num_vertices_props:
+			col.prop(self, prop)
+
+
+
+
+
+
+
+
+
+
 # MARK: Class
 class ROMLYADDON_OT_add_clothoid_curve(bpy.types.Operator):
 	"""クロソイド曲線を作成するオペレーター"""
@@ -468,6 +690,11 @@ class ROMLYADDON_OT_add_clothoid_curve(bpy.types.Operator):
 
 	val_num_vertices: IntProperty(name='Curve Vertices', default=64, min=3, soft_max=128, max=1024, step=1)
 
+	# 頂点の配置方法
+	val_sampling: EnumProperty(name='Sampling', items=SAMPLING_ITEMS, default=SAMPLING_UNIFORM)
+	val_max_deviation: FloatProperty(name='Max Deviation', description='Maximum distance between the edges and the curve', default=0.001, min=0.00001, soft_max=0.1, step=0.01, precision=5, unit=bpy.utils.units.categories.LENGTH)
+	num_sampled_vertices: int = 0
+
 	# スケーリング
 	val_scale: FloatVectorProperty(name='Scale', size=2, default=[1.0, 1.0])
 
@@ -486,7 +713,7 @@ class ROMLYADDON_OT_add_clothoid_curve(bpy.types.Operator):
 		make_curve_specification_props(self, context, col)
 		col.separator()
 
-		col.prop(self, 'val_num_vertices')
+		make_sampling_props(self, context, col, ['val_num_vertices'])
 		col.separator()
 
 		row = col.row(align=True)
@@ -495,6 +722,7 @@ class ROMLYADDON_OT_add_clothoid_curve(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		if self.val_elements == CURVE_SPECIFICATION_BY_LA:
 			# 曲線長とクロソイドパラメータで指定する場合
@@ -509,7 +737,11 @@ class ROMLYADDON_OT_add_clothoid_curve(bpy.types.Operator):
 		curve_length = self.val_curve_length
 		clothoid_param_A = math.sqrt(self.val_curve_radius * curve_length)
 
-		clothoid_vertices = create_clothoid_curve_vertices(clothoid_param_A=clothoid_param_A, curve_length=curve_length, num_vertices=self.val_num_vertices)
+		max_deviation = self.val_max_deviation if self.val_sampling == SAMPLING_ADAPTIVE else 0
+		clothoid_vertices = create_clothoid_curve_vertices(clothoid_param_A=clothoid_param_A, curve_length=curve_length, num_vertices=self.val_num_vertices, max_deviation=max_deviation)
+		self.num_sampled_vertices = len(clothoid_vertices.vertices)
+		if clothoid_vertices.sampling_capped:
+			romly_utils.report(self, 'WARNING', msg_key='The number of vertices reached the limit of {limit}, so the edges deviate from the curve by more than Max Deviation', params={'limit': ADAPTIVE_SAMPLING_MAX_VERTICES})
 		obj = romly_utils.create_object(clothoid_vertices.vertices,
 			name=bpy.app.translations.pgettext_data('Clothoid Curve'),
 			edges=[(i, i + 1) for i in range(len(clothoid_vertices.vertices) - 1)])
@@ -560,6 +792,12 @@ class ROMLYADDON_OT_add_clothoid_corner_plate(bpy.types.Operator):
 
 	val_num_vertices: IntProperty(name='Curve Vertices', default=12, min=2, soft_max=32, max=128, step=1)
 	val_num_arc_vertices: IntProperty(name='Arc Vertices', default=16, min=3, soft_max=32, max=128, step=1)
+
+	# 頂点の配置方法
+	val_sampling: EnumProperty(name='Sampling', items=SAMPLING_ITEMS, default=SAMPLING_UNIFORM)
+	val_max_deviation: FloatProperty(name='Max Deviation', description='Maximum distance between the edges and the curve', default=0.001, min=0.00001, soft_max=0.1, step=0.01, precision=5, unit=bpy.utils.units.categories.LENGTH)
+	num_sampled_vertices: int = 0
+
 	arc_angle: float = 0
 	corner_width: float = 0
 	corner_scale: float = 1
@@ -597,12 +835,12 @@ class ROMLYADDON_OT_add_clothoid_corner_plate(bpy.types.Operator):
 		col.prop(self, 'val_thickness', text=romly_utils.translate('Thickness', 'IFACE'))	# 'Thickness'はBlender内部の辞書で『幅』に翻訳されてしまうので、自前で翻訳
 		col.separator()
 
-		col.prop(self, 'val_num_vertices')
-		col.prop(self, 'val_num_arc_vertices')
+		make_sampling_props(self, context, col, ['val_num_vertices', 'val_num_arc_vertices'])
 		col.prop(self, 'val_align_plane')
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		if self.val_elements == CURVE_SPECIFICATION_BY_LA:
 			# 曲線長とクロソイドパラメータで指定する場合
@@ -614,13 +852,16 @@ class ROMLYADDON_OT_add_clothoid_corner_plate(bpy.types.Operator):
 			# 曲線半径と曲線長で指定する場合
 			self.val_clothoid_param = math.sqrt(self.val_curve_radius * self.val_curve_length)
 
-		all_vertices, self.arc_angle, self.corner_width, self.corner_scale = create_clothoid_corner_rectangle(
+		all_vertices, self.arc_angle, self.corner_width, self.corner_scale, sampling_capped = create_clothoid_corner_rectangle(
 			clothoid_param_A=self.val_clothoid_param,
 			curve_length=self.val_curve_length,
 			num_curve_vertices=self.val_num_vertices,
 			num_arc_vertices=self.val_num_arc_vertices,
 			rectangle_width=self.val_size[0],
-			rectangle_height=self.val_size[1])
+			rectangle_height=self.val_size[1],
+			max_deviation=self.val_max_deviation if self.val_sampling == SAMPLING_ADAPTIVE else 0)
+		if sampling_capped:
+			romly_utils.report(self, 'WARNING', msg_key='The number of vertices reached the limit of {limit}, so the edges deviate from the curve by more than Max Deviation', params={'limit': ADAPTIVE_SAMPLING_MAX_VERTICES})
 
 		# 掃引
 		faces = [list(range(len(all_vertices)))]
@@ -631,6 +872,9 @@ class ROMLYADDON_OT_add_clothoid_corner_plate(bpy.types.Operator):
 		obj = romly_utils.cleanup_mesh(obj)
 		bpy.context.collection.objects.link(obj)
 
+		# 重複した頂点を結合した後の、輪郭の頂点数
+		self.num_sampled_vertices = len(obj.data.vertices) // (2 if self.val_thickness > 0 else 1)
+
 
 
 		# 現在の選択を解除
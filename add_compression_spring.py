@@ -1,5 +1,4 @@
 import bpy
-import math
 import bmesh
 from bmesh.types import BMVert
 from bpy.props import *
@@ -163,15 +162,13 @@ class ROMLYADDON_OT_add_compression_spring(bpy.types.Operator):
 		if coils <= 0:
 			return
 
-		full_rotation = math.floor(coils)
-		remain_rotation = coils - full_rotation
+		# 端数の回転も含めて一度に回転させる
 		ccw = self.val_direction == 'left'
-		for _ in range(full_rotation):
-			romly_utils.add_revolved_surface(vertices=vertices, faces=faces, rotation_vertex_count=num_vertices, segments=self.val_outer_diameter_segments, close=True, z_offset=offset, ccw=ccw)
-		romly_utils.add_revolved_surface(vertices=vertices, faces=faces, rotation_vertex_count=num_vertices, segments=self.val_outer_diameter_segments, close=True, z_offset=offset, rotation_degree=remain_rotation * 360, ccw=ccw)
+		romly_utils.add_revolved_surface(vertices=vertices, faces=faces, rotation_vertex_count=num_vertices, segments=self.val_outer_diameter_segments, close=True, z_offset=offset, rotation_degree=coils * 360, ccw=ccw)
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 
 		# 円の頂点群と面を生成
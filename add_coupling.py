@@ -1,10 +1,10 @@
 import bpy
 import math
-import bmesh
 from bmesh.types import BMVert
 from bpy.props import *
-from mathutils import Vector, Matrix, Quaternion
+from mathutils import Vector, Matrix, Quaternion, Euler
 from typing import NamedTuple, Literal
+import numpy as np
 
 
 
@@ -19,38 +19,30 @@ from . import romly_utils
 
 
 
-def is_coupling_bevel_edge(edge: bmesh.types.BMEdge, z1: float, z2: float) -> bool:
+def get_coupling_bevel_edge_mask(index: romly_utils.EdgeAdjacencyIndex, z1: float, z2: float) -> np.ndarray:
 	"""
-	カップリングのオブジェクトの指定された辺がベベルすべき辺ならTrueを返す。
+	カップリングのオブジェクトのベベルすべき辺のマスクを返す。
 	カップリングの上面または底面にある辺で、90度の角度にある（平面上にある辺ではない）辺。
 
 	Parameters
 	----------
-	edge : bmesh.types.BMEdge
-		判定対象の辺を指定。
+	index : romly_utils.EdgeAdjacencyIndex
+		カップリングのメッシュのインデックス。
 	z1, z2 : float
 		カップリングの上面Z座標と底面Z座標を指定。この座標にある辺が対象となる。
 
 	Returns
 	-------
-	bool
-		ベベルすべき辺ならTrueを返す。
+	np.ndarray
+		辺ごとの、ベベルすべき辺ならTrueのboolの配列。
 	"""
-	edge_z1 = edge.verts[0].co[2]
-	edge_z2 = edge.verts[1].co[2]
+	edge_z = index.edge_coords[:, :, 2]
 	TOL = 0.01
-	if ((math.isclose(edge_z1, z1, abs_tol=TOL) and math.isclose(edge_z2, z1, abs_tol=TOL)) or
-		(math.isclose(edge_z1, z2, abs_tol=TOL) and math.isclose(edge_z2, z2, abs_tol=TOL))):
-		# 閾値値の角度を内積の値に変換
-		threshold_radian = math.radians(0.1)
-		cos_value = math.cos(threshold_radian)
+	on_z1 = np.all(np.abs(edge_z - z1) <= TOL, axis=1)
+	on_z2 = np.all(np.abs(edge_z - z2) <= TOL, axis=1)
 
-		# 内積が閾値以下なら、その辺を選択
-		dot = romly_utils.calc_linked_face_dot(edge)
-		if dot < cos_value:
-			return True
-
-	return False
+	# 内積が閾値以下なら、その辺を選択
+	return (on_z1 | on_z2) & index.sharp_edges(threshold_degree=0.1)
 
 
 
@@ -105,7 +97,7 @@ def create_coupling(diameter: float, length: float, d1: float, d2: float, d_midd
 
 	# ベベルを作る
 	if bevel > 0:
-		romly_utils.apply_bevel_modifier_to_edges(cylinder, bevel, lambda edge: is_coupling_bevel_edge(edge, z1=0, z2=length))
+		romly_utils.apply_bevel_modifier_to_edges(cylinder, bevel, edge_mask_func=lambda index: get_coupling_bevel_edge_mask(index, z1=0, z2=length))
 
 	# D1とD2の中間の穴を作る
 	if length - insertion_length * 2 > 0:
@@ -161,23 +153,17 @@ def make_setscrew_holes(obj: bpy.types.Object, coupling_diameter: float, couplin
 	else:
 		cutter = romly_utils.create_cylinder(radius=diameter / 2, length_z_plus=coupling_diameter * 2, length_z_minus=0, segments=segments)
 
-	cutter.rotation_euler = Vector((math.radians(x_rotation), 0, 0))
-	cutter.location = Vector((0, 0, position))
-	romly_utils.apply_boolean_object(obj, cutter, unlink=False)
-
-	if not math.isclose(angle, 0, abs_tol=0.01):
-		cutter.rotation_euler = Vector((math.radians(x_rotation), 0, angle))
-		romly_utils.apply_boolean_object(obj, cutter, unlink=False)
-
-	cutter.rotation_euler = Vector((math.radians(x_rotation), 0, 0))
-	cutter.location = Vector((0, 0, coupling_length - position))
-	romly_utils.apply_boolean_object(obj, cutter, unlink=False)
-
+	# 上下それぞれの高さに、指定の角度で穴を配置する
+	rotations = [0]
 	if not math.isclose(angle, 0, abs_tol=0.01):
-		cutter.rotation_euler = Vector((math.radians(x_rotation), 0, angle))
-		romly_utils.apply_boolean_object(obj, cutter, unlink=False)
+		rotations.append(angle)
+	heights = [position, coupling_length - position]
 
-	bpy.context.collection.objects.unlink(cutter)
+	# 角度の異なる穴は中心で重なり、セルフ交差を有効にするとネジ切りした穴では極端に遅くなるので、
+	# 重ならない上下の穴だけをまとめて角度ごとにブーリアンする
+	for index, z_rotation in enumerate(rotations):
+		matrices = [Matrix.LocRotScale(Vector((0, 0, z)), Euler((math.radians(x_rotation), 0, z_rotation)), None) for z in heights]
+		romly_utils.apply_boolean_objects(obj, [cutter] * len(matrices), matrices=matrices, use_self=abs(heights[1] - heights[0]) < diameter, unlink=index == len(rotations) - 1)
 
 
 
@@ -198,8 +184,7 @@ def make_slit(obj: bpy.types.Object, coupling_diameter: float, coupling_length:
 			Vector((-0.1, 0, z + width / 2)),
 		]
 		faces = []
-		for _ in range(rotation_count):
-			romly_utils.add_revolved_surface(vertices, faces=faces, rotation_vertex_count=4, segments=segments, close=True, z_offset=distance)
+		romly_utils.add_revolved_surface(vertices, faces=faces, rotation_vertex_count=4, segments=segments, close=True, z_offset=distance, rotation_degree=360 * rotation_count)
 
 		# 回転体の断面の蓋
 		faces.append([0, 1, 2, 3])
@@ -345,6 +330,7 @@ class ROMLYADDON_OT_add_coupling(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		middle_diameter = max(self.val_d1, self.val_d2) + self.val_middle_part_clearance
 		obj = create_coupling(diameter=self.val_diameter, length=self.val_length, d1=self.val_d1, d2=self.val_d2, d_middle=middle_diameter, insertion_length=self.val_hole_length, bevel=self.val_bevel, segments=self.val_segments)
@@ -123,6 +123,7 @@ class ROMLYADDON_OT_add_cross_extrusion(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# 選択を解除
 		bpy.ops.object.select_all(action='DESELECT')
@@ -166,6 +166,7 @@ class ROMLYADDON_OT_add_donut_cylinder(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		if self.val_diameterMethod == DONUT_CYLINDER_DIAMETER_METHOD_DIAMETER_AND_HOLE:
 			majorRadius = self.val_majorDiameter / 2
@@ -214,6 +215,7 @@ class ROMLYADDON_OT_add_donut_cylinder(bpy.types.Operator):
 			romly_utils.translate_vertices(object=cylinderObject, vector=mathutils.Vector([0, 0, self.val_height / 2]))
 
 		# 選択
+		bpy.context.view_layer.objects.active = cylinderObject
 		cylinderObject.select_set(state=True)
 
 		cylinderObject.name = f"{bpy.app.translations.pgettext_data('Donut Cylinder')} {romly_utils.units_to_string(value=majorRadius * 2, removeSpace=True)}/{romly_utils.units_to_string(value=holeRadius * 2, removeSpace=True)}"
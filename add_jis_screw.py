@@ -384,26 +384,10 @@ def create_screw_shaft(length: float, unthreaded_length: float, diameter: float,
 
 	# ねじ切り部分のオブジェクトを生成
 	if thread_length > 0:
+		# 上下は螺旋を直接切り取って平らにするので、ブーリアンでカットする必要はない
 		obj = romly_utils.create_threaded_cylinder(diameter=diameter, length=thread_length,
 			pitch=pitch, lead=lead, thread_depth=thread_depth,
-			segments=segments, bevel_segments=thread_bevel_segments)
-
-		# モデファイアを使って上部をカットする
-		# この時、ネジの座標がぴったり0だとブーリアンできないので、ごく僅かにずらす
-		# blenderが2.8になってブーリアンのメソッドが選択できなくなった結果、回転も加えないといけなくなった。
-		tool_obj_size = diameter * 2
-		romly_utils.translate_vertices(obj, [0, 0, 0.001])
-		bpy.ops.mesh.primitive_cube_add(size=tool_obj_size, enter_editmode=False, location=(0, 0, tool_obj_size / 2), rotation=(0, 0, 30))
-		bool_tool_obj = bpy.data.objects[bpy.context.active_object.name]
-
-		# 高速ソルバーにしないとピッチの値によっては正しくカットされない事があるので
-		# 直径が6cmの時に高速ソルバーだとうまくカットできなかったので「正確」と「穴を許容」を追加
-		romly_utils.apply_boolean_object(object=obj, boolObject=bool_tool_obj, unlink=True, fast_solver=False, use_hole_torelant=True)
-
-		# 同様に下部をカット
-		bpy.ops.mesh.primitive_cube_add(size=100, enter_editmode=False, location=(0, 0, -thread_length - 50), rotation=(0, 0, 30))
-		bool_tool_obj = bpy.data.objects[bpy.context.active_object.name]
-		romly_utils.apply_boolean_object(object=obj, boolObject=bool_tool_obj, unlink=True, fast_solver=False, use_hole_torelant=True)
+			segments=segments, bevel_segments=thread_bevel_segments, edge_flat=True)
 
 		# ねじ切りのない部分の長さだけ下に移動
 		if unthreaded_length > 0:
@@ -723,11 +707,54 @@ class ROMLYADDON_OT_add_jis_screw(bpy.types.Operator):
 
 
 
+	def create_head(self) -> bpy.types.Object:
+		"""
+		設定に従ってネジの頭部（十字穴を含む）を作成する。
+
+		Returns
+		-------
+		bpy.types.Object
+			作成された頭部のオブジェクト。シーンにはリンクされていない。
+		"""
+		if self.val_head_shape == self.SCREW_HEAD_SHAPE_FLAT:
+			head = create_flathead(diameter=self.val_flatHeadDiameter, edge_thickness=self.val_flathead_edge_thickness, segments=self.val_segments, r_segments=self.val_head_bevel_segments)
+			bpy.context.collection.objects.link(head)
+		elif self.val_head_shape == self.SCREW_HEAD_SHAPE_BOLT:
+			head = create_nut(diameter=self.val_boltHeadDiameter, thickness=self.val_boltHeadHeight, bevel_segments=self.val_head_bevel_segments)
+			bpy.context.collection.objects.link(head)
+			chamferingObject = create_nut_chamfering_object(diameter=self.val_boltHeadDiameter, segments=self.val_chamferingSegments, z=0, bottom=False)
+			chamferingObject.location = mathutils.Vector([0, 0, 0.001])
+			romly_utils.apply_boolean_object(object=head, boolObject=chamferingObject, unlink=False)
+			head.location.z = self.val_boltHeadHeight
+		else:
+			head = create_panhead(diameter=self.val_head_diameter, height=self.val_panhead_height, segments=self.val_segments, r_segments=self.val_head_bevel_segments)
+			bpy.context.collection.objects.link(head)
+
+		# 十字穴
+		if self.val_phillips_depth > 0:
+			booleanOffset = 0.01
+			phillips = create_phillips_shape(diameter=self.val_phillips_size, depth=self.val_phillips_depth + booleanOffset)
+			if self.val_head_shape == self.SCREW_HEAD_SHAPE_PAN:
+				phillips.location.z = self.val_panhead_height + booleanOffset
+			elif self.val_head_shape == self.SCREW_HEAD_SHAPE_BOLT:
+				phillips.location.z = self.val_boltHeadHeight + booleanOffset
+			else:
+				phillips.location.z = booleanOffset
+			phillips.rotation_euler = [0, 0, self.val_phillips_rotation]
+			bpy.context.collection.objects.link(phillips)
+			romly_utils.apply_boolean_object(object=head, boolObject=phillips, unlink=True)
+
+		bpy.context.collection.objects.unlink(head)
+		return head
+
+
+
 	def invoke(self, context, event):
 		return self.execute(context)
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# 設定に従ってネジ切り無しとあり部分の長さを求める
 		if self.val_thread_type == self.SCREW_THREAD_TYPE_ALLTHREAD:
@@ -745,12 +772,13 @@ class ROMLYADDON_OT_add_jis_screw(bpy.types.Operator):
 			romly_utils.report(self, 'WARNING', msg_key='The length of the unthreaded part cannot be longer than the total length')
 			return {'CANCELLED'}
 
-		# ネジの芯の作成
+		# ネジの芯の作成。リドゥパネルで芯に関係ないプロパティだけを変更した場合はキャッシュから作る。
 		if self.val_length > 0:
 			# 皿ネジの場合、十字穴の深さだけ芯の上部を削る
 			top_extra_cut = self.val_phillips_depth if self.val_head_shape == self.SCREW_HEAD_SHAPE_FLAT else 0
 
-			objects.append(create_screw_shaft(
+			shaft_key = ('jis_screw_shaft', self.val_length, self.val_unthreaded_length, self.val_diameter, self.val_pitch, self.val_lead, self.val_thread_depth, top_extra_cut, self.val_segments, self.val_thread_bevel_segments)
+			objects.append(romly_utils.create_cached_object(shaft_key, lambda: create_screw_shaft(
 				length=self.val_length,
 				unthreaded_length=self.val_unthreaded_length,
 				diameter=self.val_diameter,
@@ -759,40 +787,17 @@ class ROMLYADDON_OT_add_jis_screw(bpy.types.Operator):
 				thread_depth=self.val_thread_depth,
 				top_extra_cut=top_extra_cut,
 				segments=self.val_segments,
-				thread_bevel_segments=self.val_thread_bevel_segments))
+				thread_bevel_segments=self.val_thread_bevel_segments), name='shaft'))
 
 		# 頭部の作成
 		if self.val_head_shape != self.SCREW_HEAD_SHAPE_NONE and self.val_panhead_height > 0:
-			if self.val_head_shape == self.SCREW_HEAD_SHAPE_FLAT:
-				head = create_flathead(diameter=self.val_flatHeadDiameter, edge_thickness=self.val_flathead_edge_thickness, segments=self.val_segments, r_segments=self.val_head_bevel_segments)
-				bpy.context.collection.objects.link(head)
-			elif self.val_head_shape == self.SCREW_HEAD_SHAPE_BOLT:
-				head = create_nut(diameter=self.val_boltHeadDiameter, thickness=self.val_boltHeadHeight, bevel_segments=self.val_head_bevel_segments)
-				bpy.context.collection.objects.link(head)
-				chamferingObject = create_nut_chamfering_object(diameter=self.val_boltHeadDiameter, segments=self.val_chamferingSegments, z=0, bottom=False)
-				chamferingObject.location = mathutils.Vector([0, 0, 0.001])
-				romly_utils.apply_boolean_object(object=head, boolObject=chamferingObject, unlink=False)
-				head.location.z = self.val_boltHeadHeight
-			else:
-				head = create_panhead(diameter=self.val_head_diameter, height=self.val_panhead_height, segments=self.val_segments, r_segments=self.val_head_bevel_segments)
-				bpy.context.collection.objects.link(head)
-
-			# 十字穴
-			if self.val_phillips_depth > 0:
-				booleanOffset = 0.01
-				phillips = create_phillips_shape(diameter=self.val_phillips_size, depth=self.val_phillips_depth + booleanOffset)
-				if self.val_head_shape == self.SCREW_HEAD_SHAPE_PAN:
-					phillips.location.z = self.val_panhead_height + booleanOffset
-				elif self.val_head_shape == self.SCREW_HEAD_SHAPE_BOLT:
-					phillips.location.z = self.val_boltHeadHeight + booleanOffset
-				else:
-					phillips.location.z = booleanOffset
-				phillips.rotation_euler = [0, 0, self.val_phillips_rotation]
-				bpy.context.collection.objects.link(phillips)
-				romly_utils.apply_boolean_object(object=head, boolObject=phillips, unlink=True)
-
-			bpy.context.collection.objects.unlink(head)
-			objects.append(head)
+			head_key = ('jis_screw_head', self.val_head_shape,
+				self.val_head_diameter, self.val_panhead_height,
+				self.val_flatHeadDiameter, self.val_flathead_edge_thickness,
+				self.val_boltHeadDiameter, self.val_boltHeadHeight, self.val_chamferingSegments,
+				self.val_phillips_size, self.val_phillips_depth, self.val_phillips_rotation,
+				self.val_segments, self.val_head_bevel_segments)
+			objects.append(romly_utils.create_cached_object(head_key, self.create_head, name='head'))
 
 		# 芯と頭部をひとつのオブジェクトに統合する
 		if len(objects) > 0:
@@ -907,31 +912,44 @@ class ROMLYADDON_OT_add_jis_nut(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# 穴の直径の方が大きい場合は警告してキャンセル
 		if self.val_diameter >= self.val_nutDiameter:
 			romly_utils.report(self, 'WARNING', msg_key='The nut hole diameter must be smaller than the diameter')
 			return {'CANCELLED'}
 
-		nutObject = create_nut(diameter=self.val_nutDiameter, thickness=self.val_nutHeight, bevel_segments=self.val_bevelSegments)
-		bpy.context.collection.objects.link(nutObject)
+		def build() -> bpy.types.Object:
+			nutObject = create_nut(diameter=self.val_nutDiameter, thickness=self.val_nutHeight, bevel_segments=self.val_bevelSegments)
+			bpy.context.collection.objects.link(nutObject)
 
-		# ネジ切り
-		if self.val_diameter > 0:
-			threadObject = romly_utils.create_threaded_cylinder(diameter=self.val_diameter, length=self.val_nutHeight,
-				pitch=self.val_pitch, lead=self.val_lead, thread_depth=self.val_thread_depth,
-				segments=self.val_segments, bevel_segments=self.val_thread_bevel_segments)
-			romly_utils.apply_boolean_object(object=nutObject, boolObject=threadObject)
+			# ネジ切り
+			if self.val_diameter > 0:
+				threadObject = romly_utils.create_threaded_cylinder(diameter=self.val_diameter, length=self.val_nutHeight,
+					pitch=self.val_pitch, lead=self.val_lead, thread_depth=self.val_thread_depth,
+					segments=self.val_segments, bevel_segments=self.val_thread_bevel_segments)
+				romly_utils.apply_boolean_object(object=nutObject, boolObject=threadObject)
 
-		# 面取り（ブーリアンできない事があるので、ごく僅かにずらす）
-		if self.val_topChamfering:
-			chamferingObject = create_nut_chamfering_object(diameter=self.val_nutDiameter, segments=self.val_chamferingSegments, z=0, bottom=False)
-			chamferingObject.location = mathutils.Vector([0, 0, 0.001])
-			romly_utils.apply_boolean_object(object=nutObject, boolObject=chamferingObject, unlink=False)
-		if self.val_bottomChamfering:
-			chamferingObject = create_nut_chamfering_object(diameter=self.val_nutDiameter, segments=self.val_chamferingSegments, z=-self.val_nutHeight, bottom=True)
-			chamferingObject.location = mathutils.Vector([0, 0, -0.001])
-			romly_utils.apply_boolean_object(object=nutObject, boolObject=chamferingObject, unlink=False)
+			# 面取り（ブーリアンできない事があるので、ごく僅かにずらす）
+			if self.val_topChamfering:
+				chamferingObject = create_nut_chamfering_object(diameter=self.val_nutDiameter, segments=self.val_chamferingSegments, z=0, bottom=False)
+				chamferingObject.location = mathutils.Vector([0, 0, 0.001])
+				romly_utils.apply_boolean_object(object=nutObject, boolObject=chamferingObject, unlink=False)
+			if self.val_bottomChamfering:
+				chamferingObject = create_nut_chamfering_object(diameter=self.val_nutDiameter, segments=self.val_chamferingSegments, z=-self.val_nutHeight, bottom=True)
+				chamferingObject.location = mathutils.Vector([0, 0, -0.001])
+				romly_utils.apply_boolean_object(object=nutObject, boolObject=chamferingObject, unlink=False)
+
+			bpy.context.collection.objects.unlink(nutObject)
+			return nutObject
+
+		# リドゥパネルで同じ形状に戻した場合などはキャッシュから作る
+		nut_key = ('jis_nut', self.val_nutDiameter, self.val_diameter, self.val_nutHeight,
+			self.val_pitch, self.val_lead, self.val_thread_depth,
+			self.val_topChamfering, self.val_bottomChamfering,
+			self.val_segments, self.val_thread_bevel_segments, self.val_chamferingSegments, self.val_bevelSegments)
+		nutObject = romly_utils.create_cached_object(nut_key, build, name='Nut')
+		bpy.context.collection.objects.link(nutObject)
 
 		# 3Dカーソルの位置へ
 		nutObject.location = bpy.context.scene.cursor.location
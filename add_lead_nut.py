@@ -1,10 +1,10 @@
 import bpy
 import math
-import bmesh
 from bmesh.types import BMVert
 from bpy.props import *
 from mathutils import Vector, Matrix, Quaternion
 from typing import NamedTuple, Literal
+import numpy as np
 
 
 
@@ -19,33 +19,26 @@ from . import romly_utils
 
 
 
-# MARK: is_bevel_edge
-def is_bevel_edge(edge: bmesh.types.BMEdge) -> bool:
+# MARK: get_bevel_edge_mask
+def get_bevel_edge_mask(index: romly_utils.EdgeAdjacencyIndex) -> np.ndarray:
 	"""
-	リードナットのオブジェクトの指定された辺がベベルすべき辺ならTrueを返す。
+	リードナットのオブジェクトのベベルすべき辺のマスクを返す。
 	Z軸に平行な辺で、90度の角度にある（平面上にある辺ではない）辺。
 
 	Parameters
 	----------
-	edge : bmesh.types.BMEdge
-		判定対象の辺を指定。
+	index : romly_utils.EdgeAdjacencyIndex
+		リードナットのメッシュのインデックス。
 
 	Returns
 	-------
-	bool
-		ベベルすべき辺ならTrueを返す。
+	np.ndarray
+		辺ごとの、ベベルすべき辺ならTrueのboolの配列。
 	"""
-	# 閾値値の角度を内積の値に変換
-	threshold_radian = math.radians(0.1)
-	cos_value = math.cos(threshold_radian)
+	edge_z = index.edge_coords[:, :, 2]
 
-	if math.isclose(edge.verts[0].co[2], edge.verts[1].co[2], abs_tol=0.01):
-		# 内積が閾値以下なら、その辺を選択
-		dot = romly_utils.calc_linked_face_dot(edge)
-		if dot < cos_value:
-			return True
-
-	return False
+	# 内積が閾値以下なら、その辺を選択
+	return (np.abs(edge_z[:, 0] - edge_z[:, 1]) <= 0.01) & index.sharp_edges(threshold_degree=0.1)
 
 
 
@@ -220,6 +213,7 @@ class ROMLYADDON_OT_add_lead_nut(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# プレート部分を作成
 		obj = None
@@ -241,7 +235,7 @@ class ROMLYADDON_OT_add_lead_nut(bpy.types.Operator):
 
 		# ベベルを作成
 		if self.val_bevel_width > 0:
-			romly_utils.apply_bevel_modifier_to_edges(obj, self.val_bevel_width, lambda edge: is_bevel_edge(edge))
+			romly_utils.apply_bevel_modifier_to_edges(obj, self.val_bevel_width, edge_mask_func=get_bevel_edge_mask)
 			romly_utils.clear_bevel_weight(obj)
 
 
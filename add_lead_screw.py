@@ -52,8 +52,7 @@ def create_lead_screw(major_diameter: float, minor_diameter: float, pitch: float
 	# 回してスクリューを作る
 	pitch_iteration = math.ceil(length / (lead * pitch)) + 2
 	n = len(vertices)
-	for _ in range(pitch_iteration):
-		romly_utils.add_revolved_surface(vertices=vertices, faces=faces, rotation_vertex_count=n, segments=segments, z_offset=lead * pitch, close=True)
+	romly_utils.add_revolved_surface(vertices=vertices, faces=faces, rotation_vertex_count=n, segments=segments, z_offset=lead * pitch, close=True, rotation_degree=360 * pitch_iteration)
 
 	thread_cutter = romly_utils.cleanup_mesh(romly_utils.create_object(vertices, faces))
 	bpy.context.collection.objects.link(thread_cutter)
@@ -124,6 +123,7 @@ class ROMLYADDON_OT_add_lead_screw(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# 現在の選択を解除
 		bpy.ops.object.select_all(action='DESELECT')
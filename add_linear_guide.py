@@ -1,10 +1,10 @@
 import bpy
 import math
-import bmesh
 from bmesh.types import BMVert
 from bpy.props import *
 from mathutils import Vector, Matrix, Quaternion
 from typing import NamedTuple
+import numpy as np
 
 
 
@@ -186,14 +186,12 @@ BLOCK_SIZE_ITEMS = [
 
 
 
-def create_hole(obj: bpy.types.Object, diameter: float, center: tuple[float, float, float], normal: Vector, extrude_vector: Vector, segments: int, fast_solver: bool = False) -> None:
+def create_hole_cutter(diameter: float, center: tuple[float, float, float], normal: Vector, extrude_vector: Vector, segments: int) -> bpy.types.Object:
 	"""
-	指定したオブジェクトに円柱で穴を開ける。
+	穴を開けるための円柱を作成する。
 
 	Parameters
 	----------
-	obj : bpy.types.Object
-		穴を開ける対象のオブジェクト。
 	diameter : float
 		円柱の直径。
 	center : tuple[float, float, float]
@@ -204,12 +202,43 @@ def create_hole(obj: bpy.types.Object, diameter: float, center: tuple[float, flo
 		円柱の方向と長さを表すベクトル。
 	segments : int
 		円柱のセグメント数。
+
+	Returns
+	-------
+	bpy.types.Object
+		作成された円柱のオブジェクト。シーンにリンクされた状態。
 	"""
 	vertices = romly_utils.make_circle_vertices(radius=diameter / 2, num_vertices=segments, center=center, normal_vector=normal)
 	faces = [list(range(len(vertices)))]
 	romly_utils.extrude_face(vertices, faces=faces, extrude_vertex_indices=list(range(len(vertices))), offset=extrude_vector)
 	hole_obj = romly_utils.cleanup_mesh(romly_utils.create_object(vertices=vertices, faces=faces))
 	bpy.context.collection.objects.link(hole_obj)
+	return hole_obj
+
+
+
+
+
+def create_hole(obj: bpy.types.Object, diameter: float, center: tuple[float, float, float], normal: Vector, extrude_vector: Vector, segments: int, fast_solver: bool = False) -> None:
+	"""
+	指定したオブジェクトに円柱で穴を開ける。
+
+	Parameters
+	----------
+	obj : bpy.types.Object
+		穴を開ける対象のオブジェクト。
+	diameter : float
+		円柱の直径。
+	center : tuple[float, float, float]
+		円柱の底面の中心座標 (x, y, z)。
+	normal : Vector
+		円柱の底面の法線ベクトル。
+	extrude_vector : Vector
+		円柱の方向と長さを表すベクトル。
+	segments : int
+		円柱のセグメント数。
+	"""
+	hole_obj = create_hole_cutter(diameter=diameter, center=center, normal=normal, extrude_vector=extrude_vector, segments=segments)
 
 	# オブジェクトにブーリアンで穴を開ける
 	romly_utils.apply_boolean_object(obj, hole_obj, fast_solver=fast_solver);
@@ -231,23 +260,19 @@ def create_block(width: float, height: float, length: float, y_offset: float, th
 		if diff:
 			bpy.context.view_layer.objects.active = obj
 
-			bm = bmesh.new()
-			bm.from_mesh(obj.data)
-			KEY = 'bevel_weight_edge'
-			bevel_layer = bm.edges.layers.float.get(KEY, bm.edges.layers.float.new(KEY))
-			for edge in bm.edges:
-				if abs((edge.verts[0].co - edge.verts[1].co).dot(Vector((0, 0, 1)))) > 0.999:
-					if edge.verts[0].co[1] < -(y_offset + height / 2):
-						edge[bevel_layer] = 1.0
-					else:
-						edge[bevel_layer] = 0.5
-			bm.to_mesh(obj.data)
-			bm.free()
+			# Z軸方向の辺のうち、外側の辺は1.0、内側の辺は0.5
+			arrays = romly_utils.read_mesh_arrays(obj.data)
+			v0 = arrays.coords[arrays.edge_vertices[:, 0]]
+			v1 = arrays.coords[arrays.edge_vertices[:, 1]]
+			along_z = np.abs((v0 - v1)[:, 2].astype(np.float64)) > 0.999
+			outside = v0[:, 1].astype(np.float64) < -(y_offset + height / 2)
+			romly_utils.set_edge_bevel_weight_by_mask(obj, along_z & outside, bevel_weight=1.0)
+			romly_utils.set_edge_bevel_weight_by_mask(obj, along_z & ~outside, bevel_weight=0.5)
 
 			# ベベルモディファイアを追加、適用
 			romly_utils.apply_bevel_modifier(obj, bevel_width)
 		else:
-			romly_utils.apply_bevel_modifier_to_edges(obj, bevel_width, lambda edge: not romly_utils.is_edge_along_z_axis(edge))
+			romly_utils.apply_bevel_modifier_to_edges(obj, bevel_width, edge_mask_func=lambda index: ~romly_utils.edges_along_z_axis_mask(index))
 
 	# 真ん中を削る
 	if thickness > 0:
@@ -397,6 +422,7 @@ class ROMLYADDON_OT_add_linear_guide_rail(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		obj = romly_utils.create_box(Vector((self.val_rail_width, self.val_rail_height, self.val_rail_length)), offset=Vector((0, -self.val_rail_height / 2, self.val_rail_length / 2)))
 
@@ -409,7 +435,7 @@ class ROMLYADDON_OT_add_linear_guide_rail(bpy.types.Operator):
 
 
 		# ベベルモディファイアを追加、適用
-		romly_utils.apply_bevel_modifier_to_edges(obj, 0.3, lambda edge: not romly_utils.is_edge_along_z_axis(edge))
+		romly_utils.apply_bevel_modifier_to_edges(obj, 0.3, edge_mask_func=lambda index: ~romly_utils.edges_along_z_axis_mask(index))
 
 
 
@@ -604,14 +630,13 @@ class ROMLYADDON_OT_add_linear_guide_block(bpy.types.Operator):
 			pitch = self.val_screw_pitch
 			thread_depth = self.val_screw_thread_depth
 			screw_obj = romly_utils.create_threaded_cylinder(diameter=self.val_screw_hole_diameter, length=l, pitch=pitch, lead=1, thread_depth=thread_depth, segments=self.val_hole_segments, bevel_segments=5, edge_flat=True)
-			screw_obj.rotation_euler = (-math.pi / 2, 0, 0)
-			for index, c in enumerate(centers):
-				screw_obj.location = c
-				is_last = index == len(centers) - 1
-				romly_utils.apply_boolean_object(obj, screw_obj, unlink=is_last)
+
+			# すべてのネジ穴の位置に配置して、一度のブーリアンでまとめて開ける
+			matrices = [Matrix.Translation(c) @ Matrix.Rotation(-math.pi / 2, 4, 'X') for c in centers]
+			romly_utils.apply_boolean_objects(obj, [screw_obj] * len(centers), matrices=matrices)
 		else:
-			for c in centers:
-				create_hole(obj, diameter=self.val_screw_hole_diameter, center=c, normal=Vector((0, 1, 0)), extrude_vector=Vector((0, -l, 0)), segments=self.val_hole_segments, fast_solver=True)
+			cutters = [create_hole_cutter(diameter=self.val_screw_hole_diameter, center=c, normal=Vector((0, 1, 0)), extrude_vector=Vector((0, -l, 0)), segments=self.val_hole_segments) for c in centers]
+			romly_utils.apply_boolean_objects(obj, cutters, fast_solver=True)
 
 		# レール部分を削る
 		h = self.val_rail_height + self.val_rail_clearance
@@ -681,6 +706,7 @@ class ROMLYADDON_OT_add_linear_guide_block(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# 現在の選択を解除
 		bpy.ops.object.select_all(action='DESELECT')
@@ -67,11 +67,10 @@ def create_loadcell(
 	# 中央の細くなっている部分を削る（削る部分にはアールを付ける）
 	if thin_part_size[1] > 0:
 		cutter = romly_utils.create_box_from_corners(corner1=(-thin_part_size[0] / 2, -thin_part_size[1] / 2, -size[2]), corner2=(-size[0], thin_part_size[1] / 2, size[2]))
-		romly_utils.apply_bevel_modifier_to_edges(cutter, 1.5, lambda edge: romly_utils.is_edge_along_z_axis2(edge), segments=10)
-		romly_utils.apply_boolean_object(loadcell_obj, cutter)
-		cutter = romly_utils.create_box_from_corners(corner1=(thin_part_size[0] / 2, -thin_part_size[1] / 2, -size[2]), corner2=(size[0], thin_part_size[1] / 2, size[2]))
-		romly_utils.apply_bevel_modifier_to_edges(cutter, 1.5, lambda edge: romly_utils.is_edge_along_z_axis2(edge), segments=10)
-		romly_utils.apply_boolean_object(loadcell_obj, cutter)
+		romly_utils.apply_bevel_modifier_to_edges(cutter, 1.5, segments=10, edge_mask_func=romly_utils.edges_along_z_axis2_mask)
+		# 左右は同じ形なので、ひとつ作って左右反転した位置に置き、一度のブーリアンで削る
+		matrices = [Matrix.Identity(4), Matrix.Scale(-1, 4, Vector((1, 0, 0)))]
+		romly_utils.apply_boolean_objects(loadcell_obj, [cutter] * 2, matrices=matrices)
 
 
 
@@ -80,14 +79,11 @@ def create_loadcell(
 	if hole_diameter > 0:
 		cylinder = romly_utils.create_cylinder(radius=hole_diameter / 2, length_z_plus=size[0], length_z_minus=size[0], segments=hole_segments)
 		romly_utils.rotate_object(cylinder, degrees=90, axis='Y')
-		cylinder.location = Vector([0, -hole_distance / 2, 0])
-		romly_utils.apply_boolean_object(loadcell_obj, cylinder, unlink=False)
-
+		matrices = [Matrix.Translation((0, -hole_distance / 2, 0))]
 		if hole_distance > 0:
-			cylinder.location = Vector([0, hole_distance / 2, 0])
-			romly_utils.apply_boolean_object(loadcell_obj, cylinder, unlink=False)
-
-		bpy.context.collection.objects.unlink(cylinder)
+			matrices.append(Matrix.Translation((0, hole_distance / 2, 0)))
+		# 穴の距離が直径より小さいと2つの円柱が重なるので、その場合はセルフ交差を有効にする
+		romly_utils.apply_boolean_objects(loadcell_obj, [cylinder] * len(matrices), matrices=matrices, use_self=hole_distance < hole_diameter)
 
 		# 穴の距離が直径より大きい（穴が離れる）場合は間に四角い穴を開ける
 		if hole_bridge_height > 0 and hole_distance > hole_diameter:
@@ -116,18 +112,17 @@ def create_loadcell(
 		else:
 			cylinder = romly_utils.create_cylinder(radius=screw_spec.diameter / 2, length_z_plus=size[2], length_z_minus=size[2], segments=screw_hole_segments)
 
+		matrices = []
 		x = -screw_hole_distance_x / 2
 		for _ in range(2):
-			cylinder.location = Vector([x, screw_hole_distance_a / 2 * y_scale, z_offset])
-			romly_utils.apply_boolean_object(loadcell_obj, cylinder, unlink=False)
+			matrices.append(Matrix.Translation((x, screw_hole_distance_a / 2 * y_scale, z_offset)))
 
 			if screw_hole_distance_b > 0:
-				cylinder.location = Vector([x, (screw_hole_distance_a / 2 + screw_hole_distance_b) * y_scale, z_offset])
-				romly_utils.apply_boolean_object(loadcell_obj, cylinder, unlink=False)
+				matrices.append(Matrix.Translation((x, (screw_hole_distance_a / 2 + screw_hole_distance_b) * y_scale, z_offset)))
 
 			x += screw_hole_distance_x
 
-		bpy.context.collection.objects.unlink(cylinder)
+		romly_utils.apply_boolean_objects(loadcell_obj, [cylinder] * len(matrices), matrices=matrices)
 
 
 
@@ -285,6 +280,7 @@ class ROMLYADDON_OT_add_loadcell(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# 現在の選択を解除
 		bpy.ops.object.select_all(action='DESELECT')
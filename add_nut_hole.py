@@ -391,6 +391,7 @@ class ROMLYADDON_OT_add_nut_hole(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# 現在選択されているオブジェクトを取得
 		# 選択されているオブジェクトがない場合、作成方法は選択できなくなる
@@ -5,6 +5,8 @@ import bmesh
 from bmesh.types import BMVert
 from bpy.props import *
 from mathutils import Vector, Matrix, Quaternion
+from typing import NamedTuple
+import numpy as np
 
 
 
@@ -19,6 +21,27 @@ from . import romly_utils
 
 
 
+# オロイドを以前の方法（凸包、シーム、UV展開をすべてオペレーターで行う）で作成する場合は、環境変数`ROMLY_OLOID_LEGACY_BUILDER`を1にする（比較用）
+OLOID_LEGACY_BUILDER_FLAG = 'OLOID_LEGACY_BUILDER'
+
+# 頂点が凸包の面や辺と同じ平面、直線上にあるとみなす距離（半径に対する割合）
+OLOID_HULL_TOLERANCE = 1e-9
+
+# 三角形の帯をつなぐとき、2本の列の辺の組み合わせがこの数以下ならすべての組み合わせを一度に判定する（多ければ二分探索）
+OLOID_MERGE_ALL_PAIRS_LIMIT = 4096
+
+# UVの余白
+OLOID_UV_MARGIN = 0.001
+
+
+
+
+
+
+
+
+
+
 def on_update_thickness(self, context):
 	""" アンチオロイドの厚みとベベル幅プロパティの更新時の処理 """
 	# ベベルの幅は厚みの半分に制限
@@ -80,6 +103,7 @@ class ROMLYADDON_OT_add_oloid(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# パラメータを取得
 		type = self.val_type
@@ -108,8 +132,10 @@ class ROMLYADDON_OT_add_oloid(bpy.types.Operator):
 
 
 
-		# 重複する頂点を削除
-		obj = romly_utils.cleanup_mesh(theObject, recalc_normals=False)
+		# 重複する頂点を削除（オロイドは重複する頂点を作らずに構築される）
+		obj = theObject
+		if type == self.TYPE_ANTI_OLOID or romly_utils.legacy_flag(OLOID_LEGACY_BUILDER_FLAG):
+			obj = romly_utils.cleanup_mesh(theObject, recalc_normals=False)
 
 		# 生成したオブジェクトを選択
 		obj.select_set(state=True)
@@ -129,6 +155,65 @@ class ROMLYADDON_OT_add_oloid(bpy.types.Operator):
 
 
 
+def make_two_circle_oloid_vertices(radius: float, num_vertices: int) -> tuple[list[tuple[float, float, float]], list[tuple[float, float, float]]]:
+	"""
+	オロイドのベースとなる2つの円の頂点を作成する。
+	1つ目の円はXY平面上で原点が中心、2つ目の円はx軸周りに90度回転させてXZ平面上に置き、半径分右に移動させる。
+
+	Parameters
+	----------
+	radius : float
+		円の半径。
+	num_vertices : int
+		各円に含まれる頂点の数。
+
+	Returns
+	-------
+	tuple[list[tuple[float, float, float]], list[tuple[float, float, float]]]
+		1つ目の円（180度の位置から）と2つ目の円（0度の位置から）の頂点のリスト。
+	"""
+	circle_vertices1 = romly_utils.make_circle_vertices(radius=radius, num_vertices=num_vertices, start_angle_degree=180)
+
+	# 2個目の円はx軸で90度回転させて半径分右に移動
+	circle_vertices2 = romly_utils.make_circle_vertices(radius=radius, num_vertices=num_vertices, start_angle_degree=0)
+	for i in range(len(circle_vertices2)):
+		v = rotate_vertex_90_degrees_x_axis(circle_vertices2[i])
+		circle_vertices2[i] = (v[0] + radius, v[1], v[2])
+
+	return circle_vertices1, circle_vertices2
+
+
+
+
+
+def make_two_circle_oloid_coords(radius: float, num_vertices: int) -> np.ndarray:
+	"""
+	`make_two_circle_oloid_vertices`と同じ2つの円の頂点を、リストを経由せずにNumPyの配列として作成する。
+
+	Parameters
+	----------
+	radius : float
+		円の半径。
+	num_vertices : int
+		各円に含まれる頂点の数。
+
+	Returns
+	-------
+	np.ndarray
+		1つ目の円（180度の位置から）の頂点に2つ目の円（0度の位置から）の頂点が続く、(2 * num_vertices, 3)の配列。
+	"""
+	angles = 2 * math.pi * np.arange(num_vertices) / num_vertices
+	coords = np.zeros((2, num_vertices, 3))
+	coords[0, :, 0] = radius * np.cos(angles + math.pi)
+	coords[0, :, 1] = radius * np.sin(angles + math.pi)
+	coords[1, :, 0] = radius * np.cos(angles) + radius
+	coords[1, :, 2] = radius * np.sin(angles)
+	return coords.reshape(-1, 3)
+
+
+
+
+
 def create_two_circle_oloid_base(radius: float, num_vertices: int, make_edges: bool, name: str) -> bpy.types.Object:
 	"""
 	オロイドのベースとなる2つの円で構成されたオブジェクトを作成する。
@@ -150,14 +235,7 @@ def create_two_circle_oloid_base(radius: float, num_vertices: int, make_edges: b
 	bpy.types.Object
 		作成されたオロイドベースのオブジェクト。
 	"""
-	circle_vertices1 = romly_utils.make_circle_vertices(radius=radius, num_vertices=num_vertices, start_angle_degree=180)
-
-	# 2個目の円はx軸で90度回転させて半径分右に移動
-	circle_vertices2 = romly_utils.make_circle_vertices(radius=radius, num_vertices=num_vertices, start_angle_degree=0)
-	for i in range(len(circle_vertices2)):
-		v = rotate_vertex_90_degrees_x_axis(circle_vertices2[i])
-		circle_vertices2[i] = (v[0] + radius, v[1], v[2])
-
+	circle_vertices1, circle_vertices2 = make_two_circle_oloid_vertices(radius=radius, num_vertices=num_vertices)
 	all_vertices = circle_vertices1 + circle_vertices2
 
 	# edges が True の場合は辺を作成
@@ -185,9 +263,277 @@ def create_two_circle_oloid_base(radius: float, num_vertices: int, make_edges: b
 
 
 
+class OloidMesh(NamedTuple):
+	"""
+	`make_oloid_mesh`の戻り値を格納するNamedTuple。
+
+	Attributes
+	----------
+	vertices : np.ndarray
+		頂点座標の(N, 3)の配列。オロイドの表面上にある円の頂点だけを含む。
+	faces : np.ndarray
+		三角形の頂点インデックスの(F, 3)の配列。外側から見て反時計回り。
+	seam_edges : np.ndarray
+		シームを設定する辺の頂点インデックスの(S, 2)の配列。
+	uvs : np.ndarray
+		各面の角のUV座標の(F, 3, 2)の配列。
+	"""
+	vertices: np.ndarray
+	faces: np.ndarray
+	seam_edges: np.ndarray
+	uvs: np.ndarray
+
+
+
+
+
+def find_polygon_hull_vertices(polygon: np.ndarray, point: np.ndarray, tolerance: float) -> np.ndarray:
+	"""
+	平面上の凸多角形と1つの点の凸包に、多角形のどの頂点が残るかを求める。点から見える（点が辺の外側にある）辺に両側を挟まれた頂点は凸包の内側になる。
+
+	Parameters
+	----------
+	polygon : np.ndarray
+		反時計回りに並んだ凸多角形の頂点の(N, 2)の配列。
+	point : np.ndarray
+		多角形の外側の点。
+	tolerance : float
+		点が辺の延長線上にあるとみなす距離。
+
+	Returns
+	-------
+	np.ndarray
+		凸包に残る頂点はTrueになる、長さNのブール配列。
+	"""
+	edges = np.roll(polygon, -1, axis=0) - polygon
+	to_point = point - polygon
+	visible = edges[:, 0] * to_point[:, 1] - edges[:, 1] * to_point[:, 0] < -tolerance * np.linalg.norm(edges, axis=1)
+	return ~(visible & np.roll(visible, 1))
+
+
+
+
+
+def merge_ruled_strip(coords: np.ndarray, chain1: np.ndarray, chain2: np.ndarray, inside: np.ndarray, tolerance: float) -> np.ndarray:
+	"""
+	凸包の表面上にある2本の頂点の列の間を、凸包の表面になる三角形の帯でつなぐ。
+	両方の列の最初の頂点どうしを結ぶ辺から始めて、1本目の列を1つ進めた三角形の外側にもう一方の列の次の頂点が無ければ1本目の列を、そうでなければ2本目の列を進める。
+	最後は両方の列の最後の頂点どうしを結ぶ辺で終わる。
+	両方の列が凸包の表面上を一方向に進むなら、1本目の列のi番目の辺を2本目の列のj番目の辺より先に進めるかどうかはjについて単調なので、
+	1本目の列の辺ごとに先に進める2本目の列の辺の数を一斉に求め、両方の列の辺を並べ替えるだけで帯が決まる（頂点を1つずつたどらない）。
+
+	Parameters
+	----------
+	coords : np.ndarray
+		頂点座標の(N, 3)の配列。
+	chain1 : np.ndarray
+		1本目の列の頂点インデックスの配列。
+	chain2 : np.ndarray
+		2本目の列の頂点インデックスの配列。
+	inside : np.ndarray
+		凸包の内側の点。三角形の外側を判定するのに使う。
+	tolerance : float
+		同じ平面上にあるとみなす距離。
+
+	Returns
+	-------
+	np.ndarray
+		2本の列の頂点を結ぶ辺（1本目の列の頂点, 2本目の列の頂点）を帯の順番に並べた(K, 2)の配列。隣り合う2本の辺で三角形が1つできる。
+	"""
+	last1 = len(chain1) - 1
+	last2 = len(chain2) - 1
+	starts1 = coords[chain1[:-1]]
+	edges1 = coords[chain1[1:]] - starts1
+	points2 = coords[chain2]
+
+	def advances_chain1(i: np.ndarray, j: np.ndarray) -> np.ndarray:
+		"""1本目の列がi番目、2本目の列がj番目の頂点にいるとき、1本目の列を進めるかどうか。"""
+		# 要素数が少ないと`np.cross`や`np.einsum`の呼び出しの方が重いので、成分ごとに計算する
+		p = starts1[i].T
+		u = edges1[i].T
+		v = points2[j].T - p
+		normals = np.array((u[1] * v[2] - u[2] * v[1], u[2] * v[0] - u[0] * v[2], u[0] * v[1] - u[1] * v[0]))
+		side_inside = (normals * (inside[:, np.newaxis] - p)).sum(axis=0)
+		side_next = (normals * (points2[j + 1].T - p)).sum(axis=0)
+		# 次の頂点が内側の点と同じ側（または三角形と同じ平面上）にあれば、三角形は表面になる
+		return np.copysign(1, side_inside) * side_next >= -tolerance * np.sqrt((normals * normals).sum(axis=0))
+
+	# 1本目の列のi番目の辺より先に進める2本目の列の辺の数。2本目の列が最後まで進んだら必ず1本目の列を進める。
+	# 組み合わせが少なければすべての組み合わせを一度に判定し、多ければ二分探索する
+	if last1 * last2 <= OLOID_MERGE_ALL_PAIRS_LIMIT:
+		indices1, indices2 = np.divmod(np.arange(last1 * last2), max(last2, 1))
+		advance1 = advances_chain1(indices1, indices2).reshape(last1, last2)
+		low = np.where(advance1.any(axis=1), advance1.argmax(axis=1), last2)
+	else:
+		low = np.zeros(last1, dtype=np.int64)
+		high = np.full(last1, last2, dtype=np.int64)
+		searching = np.arange(last1)
+		while len(searching) > 0:
+			middle = (low[searching] + high[searching]) // 2
+			advance1 = advances_chain1(searching, middle)
+			high[searching] = np.where(advance1, middle, high[searching])
+			low[searching] = np.where(advance1, low[searching], middle + 1)
+			searching = searching[low[searching] < high[searching]]
+
+	# 1本目の列の辺は、先に進める2本目の列の辺の後、同じ位置の2本目の列の辺の前に並ぶ
+	keys = np.concatenate((low * 2, np.arange(last2) * 2 + 1))
+	advance1 = np.argsort(keys, kind='stable') < last1
+	positions1 = np.concatenate(([0], np.cumsum(advance1)))
+	positions2 = np.concatenate(([0], np.cumsum(~advance1)))
+	return np.column_stack((chain1[positions1], chain2[positions2]))
+
+
+
+
+
+def unfold_ruled_strip(vertices: np.ndarray, rungs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	2本の頂点の列を結ぶ辺（横木）の並びで表された三角形の帯を、辺の長さを保ったまま平面に展開する。
+	隣り合う横木は片方の端を共有していて、次の横木は共有する端を中心に、2本の横木の間の三角形の角度だけ回転する（1本目の列が進めば左、2本目の列が進めば右回り）。
+	横木の向きは角度の累積和、端の位置は横木の差の累積和で求まるので、三角形を1つずつたどらずに配列の計算だけで展開できる。
+
+	Parameters
+	----------
+	vertices : np.ndarray
+		頂点座標の(N, 3)の配列。
+	rungs : np.ndarray
+		横木の頂点インデックス（1本目の列の頂点, 2本目の列の頂点）を帯の順番に並べた(K, 2)の配列。
+
+	Returns
+	-------
+	tuple[np.ndarray, np.ndarray]
+		三角形の頂点インデックスの(K - 1, 3)の配列と、各面の角の展開後の座標の(K - 1, 3, 2)の配列。
+	"""
+	current = rungs[:-1]
+	following = rungs[1:]
+	advance1 = following[:, 0] != current[:, 0]
+
+	# 横木が回転する角度。中心は動かない方の端
+	pivot = np.where(advance1, current[:, 1], current[:, 0])
+	start = np.where(advance1, current[:, 0], current[:, 1])
+	end = np.where(advance1, following[:, 0], following[:, 1])
+	e1 = vertices[start] - vertices[pivot]
+	e2 = vertices[end] - vertices[pivot]
+	angles = np.arctan2(np.linalg.norm(np.cross(e1, e2), axis=1), np.einsum('ij,ij->i', e1, e2))
+	directions = np.concatenate(([0.0], np.cumsum(np.where(advance1, angles, -angles))))
+
+	# 展開後の横木と、その両端の位置
+	lengths = np.linalg.norm(vertices[rungs[:, 1]] - vertices[rungs[:, 0]], axis=1)
+	rung_vectors = lengths[:, np.newaxis] * np.column_stack((np.cos(directions), np.sin(directions)))
+	steps = rung_vectors[:-1] - rung_vectors[1:]
+	points1 = np.concatenate((np.zeros((1, 2)), np.cumsum(np.where(advance1[:, np.newaxis], steps, 0), axis=0)))
+	points2 = rung_vectors[0] + np.concatenate((np.zeros((1, 2)), np.cumsum(np.where(advance1[:, np.newaxis], 0, -steps), axis=0)))
+
+	# 1本目の列が進めば(a, a', b)、2本目の列が進めば(a, b, b')の三角形になる
+	faces = np.where(advance1[:, np.newaxis], np.column_stack((current[:, 0], following[:, 0], current[:, 1])), np.column_stack((current[:, 0], current[:, 1], following[:, 1])))
+	uvs = np.where(advance1[:, np.newaxis, np.newaxis], np.stack((points1[:-1], points1[1:], points2[:-1]), axis=1), np.stack((points1[:-1], points2[:-1], points2[1:]), axis=1))
+	return faces, uvs
+
+
+
+
+
+def make_oloid_mesh(radius: float, num_vertices: int) -> OloidMesh:
+	"""
+	オロイド（2つの円の凸包）のメッシュを、凸包を計算するオペレーターを使わずに線織面としての構造から直接作成する。
+	オロイドの表面は、1つ目の円の点ともう一方の円の対応する点を結ぶ直線（母線）でできている。円のうち表面上にあるのはもう一方の円に近い側を除いた円弧で、
+	Z = 0の平面で上下に分けると、どちらの半分も1つ目の円弧全体と、2つ目の円弧の半分を往復した列の間を三角形の帯でつないだものになる。
+	円の頂点、帯のつなぎ方、展開図はすべてNumPyの配列の計算で求めるので、頂点をPythonで1つずつたどらない。
+	以前の方法（`create_oloid_legacy`）で使っていた`convex_hull`は同じ平面に近い頂点を結合してしまうので、頂点数が多いと表面上の頂点の大半が失われるが、この方法ではすべて残る。
+
+	Parameters
+	----------
+	radius : float
+		オロイドを構成する2つの円の半径。
+	num_vertices : int
+		円を構成する頂点の数。
+
+	Returns
+	-------
+	OloidMesh
+		頂点、面、シーム、UV。
+	"""
+	coords = make_two_circle_oloid_coords(radius=radius, num_vertices=num_vertices)
+	center = np.array((radius / 2, 0, 0))
+	tolerance = radius * OLOID_HULL_TOLERANCE
+
+	# 円の頂点が表面上にあるか。XY平面とXZ平面はどちらも対称面なので、断面は頂点をその平面に投影した凸包になり、
+	# 1つ目の円は2つ目の円の右端(2r, 0, 0)との、2つ目の円は1つ目の円の左端(-r, 0, 0)との凸包に残る頂点が表面上にある
+	on_surface1 = find_polygon_hull_vertices(coords[:num_vertices][:, (0, 1)], coords[num_vertices][[0, 1]], tolerance)
+	on_surface2 = find_polygon_hull_vertices(coords[num_vertices:][:, (0, 2)], coords[0][[0, 2]], tolerance)
+
+	# 1つ目の円の頂点を、0度の次（60度付近）から180度を通って300度付近まで並べる
+	chain1 = np.arange(num_vertices // 2 + 1, num_vertices // 2 + 1 + num_vertices) % num_vertices
+	chain1 = chain1[on_surface1[chain1]]
+
+	# 2つ目の円の頂点を、0度から上（Z > 0）と下に向かってそれぞれ並べる
+	upper2 = np.arange(0, (num_vertices + 1) // 2)
+	upper2 = upper2[on_surface2[upper2]] + num_vertices
+	lower2 = np.arange(num_vertices - 1, num_vertices // 2, -1)
+	lower2 = np.concatenate(([num_vertices], lower2[on_surface2[lower2]] + num_vertices))
+
+	# 2つ目の円弧の半分を往復する列（Y > 0の側で端まで行き、Y < 0の側で戻ってくる）と、1つ目の円弧の間をつなぐ。
+	# 往復の折り返し点（2つ目の円弧の端）と1つ目の円の180度の頂点を結ぶ辺は対称面（XZ平面）上で表面に沿うので、帯はこの辺で2つに分かれる。
+	# それぞれの側では両方の列が一方向に進むだけなので、別々につないでからつなぎ合わせる。
+	# 1つ目の円と2つ目の円の0度の頂点でできる三角形はZ = 0の平面上にあり、中心もその平面上にあるので、内側の点には反対側に寄せた点を使う
+	middle1 = int(np.flatnonzero(chain1 == 0)[0])
+	strips = []
+	for chain2, opposite_chain2 in ((upper2, lower2), (lower2, upper2)):
+		inside = (center + coords[opposite_chain2].mean(axis=0)) / 2
+		outward = merge_ruled_strip(coords, chain1[:middle1 + 1], chain2, inside, tolerance)
+		backward = merge_ruled_strip(coords, chain1[middle1:], chain2[::-1], inside, tolerance)
+		strips.append(np.concatenate((outward, backward[1:])))
+	upper_rungs, lower_rungs = strips
+
+	# シームは2つの円弧と、展開図が1つにつながるように下側の2つ目の円弧の端と180度の頂点（辺が無ければ一番近い頂点）を結ぶ辺。
+	# 下側の帯をその辺で2つに分け、上側の帯の前後に逆向きにつなぐと、表面全体が切り口に沿った1本の帯になる
+	chain1_order = np.zeros(num_vertices, dtype=np.int64)
+	chain1_order[chain1] = np.arange(len(chain1))
+	candidates = np.flatnonzero(lower_rungs[:, 1] == lower2[-1])
+	cut = candidates[np.argmin(np.abs(chain1_order[lower_rungs[candidates, 0]] - chain1_order[0]))]
+	rungs = np.concatenate((lower_rungs[cut::-1], upper_rungs[1:], lower_rungs[-2:cut - 1 if cut > 0 else None:-1]))
+	faces, uvs = unfold_ruled_strip(coords, rungs)
+
+	seam_edges = np.concatenate([np.column_stack((chain[:-1], chain[1:])) for chain in (chain1, upper2, lower2)] + [lower_rungs[cut][np.newaxis]])
+
+	# 面の向きを外側に揃える（オロイドは凸なので、中心から面へのベクトルと法線の向きで判定できる）
+	triangles = coords[faces]
+	normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+	inward = np.einsum('ij,ij->i', normals, triangles.mean(axis=1) - center) < 0
+	faces[inward] = faces[inward][:, ::-1]
+	uvs[inward] = uvs[inward][:, ::-1]
+
+	# 展開図が裏返っていたら（UVの三角形が時計回りなら）左右を反転する
+	uv_edges1 = uvs[:, 1] - uvs[:, 0]
+	uv_edges2 = uvs[:, 2] - uvs[:, 0]
+	if np.sum(uv_edges1[:, 0] * uv_edges2[:, 1] - uv_edges1[:, 1] * uv_edges2[:, 0]) < 0:
+		uvs[:, :, 0] *= -1
+
+	# 0～1の範囲に縦横同じ比率で収める
+	uv_min = uvs.reshape(-1, 2).min(axis=0)
+	uv_size = (uvs.reshape(-1, 2).max(axis=0) - uv_min).max()
+	uvs = (uvs - uv_min) * ((1 - OLOID_UV_MARGIN * 2) / uv_size) + OLOID_UV_MARGIN
+
+	# 表面上に無い頂点を除いてインデックスを詰める
+	used = np.unique(faces)
+	remap = np.full(len(coords), -1, dtype=np.int64)
+	remap[used] = np.arange(len(used))
+
+	return OloidMesh(vertices=coords[used], faces=remap[faces], seam_edges=remap[seam_edges], uvs=uvs)
+
+
+
+
+
+
+
+
+
+
 def create_oloid(radius: float, num_vertices: int) -> bpy.types.Object:
 	"""
 	オロイド形状のオブジェクトを生成する。
+	`make_oloid_mesh`で頂点、面、シーム、UVを計算してから直接メッシュを作るので、オペレーターを使わずに作成できる。
 
 	Parameters
 	----------
@@ -201,6 +547,34 @@ def create_oloid(radius: float, num_vertices: int) -> bpy.types.Object:
 	bpy.types.Object
 		作成されたオロイドオブジェクト。
 	"""
+	if romly_utils.legacy_flag(OLOID_LEGACY_BUILDER_FLAG):
+		return create_oloid_legacy(radius=radius, num_vertices=num_vertices)
+
+	oloid = make_oloid_mesh(radius=radius, num_vertices=num_vertices)
+	obj = romly_utils.create_object(oloid.vertices, faces=oloid.faces, name=bpy.app.translations.pgettext_data('Oloid'))
+	mesh = obj.data
+
+	# シームを設定
+	edge_vertices = romly_utils.read_mesh_attribute(mesh, '.edge_verts', len(mesh.edges), 2, np.int32).astype(np.int64)
+	edge_keys = edge_vertices.min(axis=1) * len(mesh.vertices) + edge_vertices.max(axis=1)
+	seam_keys = oloid.seam_edges.min(axis=1) * len(mesh.vertices) + oloid.seam_edges.max(axis=1)
+	mesh.edges.foreach_set('use_seam', np.isin(edge_keys, seam_keys))
+
+	# UVを設定
+	uv_layer = mesh.uv_layers.new(name='UVMap')
+	uv_layer.data.foreach_set('uv', oloid.uvs.astype(np.float32).ravel())
+
+	bpy.context.collection.objects.link(obj)
+	return obj
+
+
+
+
+
+def create_oloid_legacy(radius: float, num_vertices: int) -> bpy.types.Object:
+	"""
+	以前の`create_oloid`。編集モードで凸包を作り、辺を総当たりで調べてシームを設定し、UV展開する。比較用。
+	"""
 	# オロイドの基礎となる2つの円で構成されるオブジェクトを作成
 	obj = create_two_circle_oloid_base(radius=radius, num_vertices=num_vertices, make_edges=False, name=bpy.app.translations.pgettext_data('Oloid'))
 
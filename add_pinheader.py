@@ -147,6 +147,7 @@ class ROMLYADDON_OT_add_pinheader(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# ピンヘッダのプラスチック部分のサイズ
 		pin_pitch = pin_pitch_to_value(self.val_pitch)
@@ -158,7 +159,7 @@ class ROMLYADDON_OT_add_pinheader(bpy.types.Operator):
 		obj_plastic = romly_utils.create_box(size=self.val_block_size, offset=mathutils.Vector([0, 0, self.val_block_size[2] / 2]))
 
 		# ベベルモディファイアを追加、適用
-		romly_utils.apply_bevel_modifier_to_edges(obj_plastic, self.val_block_size[1] * 0.15, lambda edge: not romly_utils.is_edge_along_z_axis(edge))
+		romly_utils.apply_bevel_modifier_to_edges(obj_plastic, self.val_block_size[1] * 0.15, edge_mask_func=lambda index: ~romly_utils.edges_along_z_axis_mask(index))
 
 		# ----------------------------------------
 		# プラスチックの下部を削る
@@ -178,7 +179,7 @@ class ROMLYADDON_OT_add_pinheader(bpy.types.Operator):
 		obj_pin = romly_utils.create_box(size=pin_scale, offset=mathutils.Vector([0, 0, pin_length / 2 - self.val_pin_length_bottom]))
 
 		# ベベルモディファイアを追加、適用
-		romly_utils.apply_bevel_modifier_to_edges(obj_pin, self.val_pin_thickness * 0.3, romly_utils.is_edge_along_z_axis)
+		romly_utils.apply_bevel_modifier_to_edges(obj_pin, self.val_pin_thickness * 0.3, edge_mask_func=romly_utils.edges_along_z_axis_mask)
 
 		# ----------------------------------------
 		# プラスチック部分とピン部分の結合、配列作成
@@ -4,6 +4,7 @@ import mathutils
 import bmesh
 from bpy.props import *
 from mathutils import Vector
+import numpy as np
 
 
 
@@ -13,6 +14,16 @@ from . import romly_utils
 
 
 
+# 回転体を以前の方法（ブーリアンで半分に切り、Screwモデファイアを適用して、残った辺を削除する）で作成する場合は、環境変数`ROMLY_REULEAUX_POLYGON_LEGACY_REVOLVE`を1にする（比較用）
+REULEAUX_POLYGON_LEGACY_REVOLVE_FLAG = 'REULEAUX_POLYGON_LEGACY_REVOLVE'
+
+# 頂点がY軸上にあるとみなす距離（外接円の半径に対する割合）
+REULEAUX_POLYGON_AXIS_TOLERANCE = 1e-6
+
+
+
+
+
 
 
 
@@ -72,6 +83,7 @@ class ROMLYADDON_OT_add_reuleaux_polygon(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# パラメータを取得
 		num_sides = self.val_num_sides
@@ -108,39 +120,12 @@ class ROMLYADDON_OT_add_reuleaux_polygon(bpy.types.Operator):
 		obj = None
 		if self.val_solidify == 'revolve':
 			# 回転体を作る場合
-
-			obj = romly_utils.create_object(reuleaux_polygon_vertices, faces, name=get_polygon_name(num_sides=num_sides))
-			bpy.context.collection.objects.link(obj)
-
-			# 半分をカット
-			cutter = romly_utils.create_box_from_corners(corner1=(0, -radius * 2, -1), corner2=(radius * 2, radius * 2, 1))
-			romly_utils.apply_boolean_object(obj, cutter)
-
-			# スクリューを追加
-			bpy.context.view_layer.objects.active = obj
-			mod = bpy.context.object.modifiers.new(type='SCREW', name='Screw')
-			mod.angle = self.val_revolution_angle
-			mod.screw_offset = 0
-			mod.axis = 'Y'
-			mod.steps = self.val_revolve_segments
-			mod.render_steps = self.val_revolve_segments
-			mod.use_merge_vertices = True
-			mod.use_smooth_shade = False	# これを忘れるとスムーズシェーディングになってしまうのだ
-			bpy.ops.object.modifier_apply(modifier=mod.name)
-
-			# 真ん中に辺が残ってしまうので削除
-			# 面を一つも持っていない辺は is_wire が True になっているので、それらを削除する
-			bm = bmesh.new()
-			bm.from_mesh(obj.data)
-			edges_to_delete = []
-			for edge in bm.edges:
-				if edge.is_wire:
-					edges_to_delete.append(edge)
-			bmesh.ops.delete(bm, geom=edges_to_delete, context='EDGES')
-			bm.to_mesh(obj.data)
-			bm.free()
-
-			obj = romly_utils.cleanup_mesh(obj)
+			if romly_utils.legacy_flag(REULEAUX_POLYGON_LEGACY_REVOLVE_FLAG):
+				obj = create_revolved_object_legacy(vertices=reuleaux_polygon_vertices, faces=faces, radius=radius, revolution_angle=self.val_revolution_angle, revolve_segments=self.val_revolve_segments, name=get_polygon_name(num_sides=num_sides))
+			else:
+				profile = clip_profile_at_axis(vertices=reuleaux_polygon_vertices, tolerance=radius * REULEAUX_POLYGON_AXIS_TOLERANCE)
+				obj = create_revolved_object(profile=profile, revolution_angle=self.val_revolution_angle, revolve_segments=self.val_revolve_segments, name=get_polygon_name(num_sides=num_sides))
+				bpy.context.collection.objects.link(obj)
 
 		else:
 
@@ -230,6 +215,147 @@ def get_polygon_name(num_sides):
 
 
 
+def clip_profile_at_axis(vertices: list[tuple[float, float, float]], tolerance: float) -> np.ndarray:
+	"""
+	Y軸に対して左右対称な閉じた輪郭をY軸（X = 0）で切り、左半分（X < 0）を上端から下端までの折れ線にする。
+	Y軸をまたぐ辺はY軸との交点で切るので、ブーリアンで半分をカットした場合と同じ形状になる。
+
+	Parameters
+	----------
+	vertices : list[tuple[float, float, float]]
+		XY平面上の輪郭の頂点のリスト。上端の頂点はY軸上にあること。円弧のつなぎ目で重なっている頂点は1つにまとめられる。
+	tolerance : float
+		頂点がY軸上にあるとみなす距離。
+
+	Returns
+	-------
+	np.ndarray
+		(X, Y)座標の(K, 2)の配列。最初（上端）と最後（下端）の頂点はX = 0。
+	"""
+	points = np.asarray(vertices, dtype=np.float64)[:, :2]
+
+	# 円弧のつなぎ目で重なっている頂点を除く
+	points = points[np.linalg.norm(points - np.roll(points, 1, axis=0), axis=1) > tolerance]
+
+	# Y軸上で一番上の頂点から、左側（X < 0）に向かう順番に並べ替える
+	on_axis = np.flatnonzero(np.abs(points[:, 0]) <= tolerance)
+	top = on_axis[np.argmax(points[on_axis, 1])]
+	points = np.roll(points, -top, axis=0)
+	if points[1, 0] > 0:
+		points = np.concatenate((points[:1], points[:0:-1]))
+
+	# 左側から外れる最初の頂点がY軸上になければ、手前の頂点との間の辺とY軸の交点を下端にする
+	outside = np.flatnonzero(points[1:, 0] >= -tolerance)[0] + 1
+	bottom = points[outside]
+	if bottom[0] > tolerance:
+		previous = points[outside - 1]
+		bottom = previous + (bottom - previous) * (previous[0] / (previous[0] - bottom[0]))
+
+	return np.vstack(((0, points[0, 1]), points[1:outside], (0, bottom[1])))
+
+
+
+
+
+def create_revolved_object(profile: np.ndarray, revolution_angle: float, revolve_segments: int, name: str) -> bpy.types.Object:
+	"""
+	`clip_profile_at_axis`で作った折れ線をY軸周りに回転させた回転体のオブジェクトを作成する。
+	Y軸上の上端と下端は1つの頂点にして、それに接する面を三角形にするので、重複する頂点や面の無い辺は作られない。
+
+	Parameters
+	----------
+	profile : np.ndarray
+		(X, Y)座標の(K, 2)の配列。最初と最後の頂点はY軸上にあること。
+	revolution_angle : float
+		回転させる角度（ラジアン）。360度の場合は最初と最後の列をつなげる。
+	revolve_segments : int
+		回転方向のセグメント数。
+	name : str
+		作成されるオブジェクトの名前。
+
+	Returns
+	-------
+	bpy.types.Object
+		作成されたオブジェクト。シーンにはリンクされていない。
+	"""
+	closed = math.isclose(revolution_angle, 2 * math.pi, abs_tol=1e-5)
+	num_columns = revolve_segments if closed else revolve_segments + 1
+	num_inner = len(profile) - 2
+
+	# Y軸周りに回転させた頂点。Y軸上の上端と下端が最初の2つ
+	angles = np.arange(num_columns) * (revolution_angle / revolve_segments)
+	rings = np.empty((num_columns, num_inner, 3))
+	rings[:, :, 0] = np.cos(angles)[:, np.newaxis] * profile[1:-1, 0]
+	rings[:, :, 1] = profile[1:-1, 1]
+	rings[:, :, 2] = -np.sin(angles)[:, np.newaxis] * profile[1:-1, 0]
+	coords = np.vstack(((0, profile[0, 1], 0), (0, profile[-1, 1], 0), rings.reshape(-1, 3)))
+
+	# 折れ線の頂点（行）と回転方向の位置（列）ごとの頂点インデックス。360度の場合は最後の列が最初の列に戻る
+	grid = np.empty((num_inner + 2, revolve_segments + 1), dtype=np.int64)
+	grid[0] = 0
+	grid[-1] = 1
+	grid[1:-1] = 2 + (np.arange(revolve_segments + 1) % num_columns) * num_inner + np.arange(num_inner)[:, np.newaxis]
+
+	# 上端と下端に接する面は三角形、それ以外は四角形
+	current = grid[:, :-1]
+	following = grid[:, 1:]
+	triangles = np.concatenate((np.stack((current[0], current[1], following[1]), axis=-1), np.stack((current[-2], current[-1], following[-2]), axis=-1)))
+	quads = np.stack((current[1:-2], current[2:-1], following[2:-1], following[1:-2]), axis=-1).reshape(-1, 4)
+
+	loop_vertex_indices = np.concatenate((triangles.ravel(), quads.ravel()))
+	loop_starts = np.concatenate((np.arange(len(triangles)) * 3, len(triangles) * 3 + np.arange(len(quads)) * 4))
+	return romly_utils.create_object_from_buffers(coords, loop_vertex_indices, loop_starts, name=name)
+
+
+
+
+
+def create_revolved_object_legacy(vertices: list[tuple[float, float, float]], faces: list[list[int]], radius: float, revolution_angle: float, revolve_segments: int, name: str) -> bpy.types.Object:
+	"""
+	以前の回転体の作成方法。ブーリアンで半分をカットし、Screwモデファイアを適用してから、面の無い辺を削除する。比較用。
+	"""
+	obj = romly_utils.create_object(vertices, faces, name=name)
+	bpy.context.collection.objects.link(obj)
+
+	# 半分をカット
+	cutter = romly_utils.create_box_from_corners(corner1=(0, -radius * 2, -1), corner2=(radius * 2, radius * 2, 1))
+	romly_utils.apply_boolean_object(obj, cutter)
+
+	# スクリューを追加
+	bpy.context.view_layer.objects.active = obj
+	mod = bpy.context.object.modifiers.new(type='SCREW', name='Screw')
+	mod.angle = revolution_angle
+	mod.screw_offset = 0
+	mod.axis = 'Y'
+	mod.steps = revolve_segments
+	mod.render_steps = revolve_segments
+	mod.use_merge_vertices = True
+	mod.use_smooth_shade = False	# これを忘れるとスムーズシェーディングになってしまうのだ
+	bpy.ops.object.modifier_apply(modifier=mod.name)
+
+	# 真ん中に辺が残ってしまうので削除
+	# 面を一つも持っていない辺は is_wire が True になっているので、それらを削除する
+	bm = bmesh.new()
+	bm.from_mesh(obj.data)
+	edges_to_delete = []
+	for edge in bm.edges:
+		if edge.is_wire:
+			edges_to_delete.append(edge)
+	bmesh.ops.delete(bm, geom=edges_to_delete, context='EDGES')
+	bm.to_mesh(obj.data)
+	bm.free()
+
+	return romly_utils.cleanup_mesh(obj)
+
+
+
+
+
+
+
+
+
+
 # 新規作成メニューに登録
 def menu_func(self, context):
 	self.layout.separator()
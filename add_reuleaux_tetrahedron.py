@@ -19,6 +19,18 @@ from . import romly_utils
 
 
 
+# 稜線と面の間をつなぐ頂点を`find_nearest_vertex`で探す以前の構築方法を使う場合は、環境変数`ROMLY_REULEAUX_TETRAHEDRON_LEGACY_BUILDER`を1にする（比較用）
+REULEAUX_TETRAHEDRON_LEGACY_BUILDER_FLAG = 'REULEAUX_TETRAHEDRON_LEGACY_BUILDER'
+
+
+
+
+
+
+
+
+
+
 class TetrahedronIndices(NamedTuple):
 	"""
 	正四面体の頂点と各要素のインデックスを格納するためのNamedTuple。create_regular_tetrahedronメソッドが返す。
@@ -126,6 +138,7 @@ class ROMLYADDON_OT_add_reuleaux_tetrahedron(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		# パラメータを取得
 		radius = self.val_radius
@@ -182,8 +195,8 @@ class ROMLYADDON_OT_add_reuleaux_tetrahedron(bpy.types.Operator):
 			bpy.context.view_layer.objects.active = sphere
 			obj = bpy.context.active_object
 
-		# 重複する頂点を削除
-		obj = romly_utils.cleanup_mesh(obj)
+		# 重複する頂点を削除（頂点を計算する方法では重複する頂点は作られない）
+		obj = romly_utils.cleanup_mesh(obj, remove_doubles=build_method != self.BUILD_METHOD_VERTICES or romly_utils.legacy_flag(REULEAUX_TETRAHEDRON_LEGACY_BUILDER_FLAG))
 
 		# 現在の選択を解除
 		bpy.ops.object.select_all(action='DESELECT')
@@ -269,6 +282,100 @@ def subdivide_triangle(vertices: list[Vector], face: tuple[int, int, int]) -> tu
 
 
 
+def get_midpoint_vertex_index(vertices: list[Vector], index1: int, index2: int, midpoint_cache: dict[tuple[int, int], int]) -> int:
+	"""
+	2つの頂点の中点のインデックスを返す。まだ中点が無ければ頂点リストに追加し、辺（インデックスのペア）をキーにしてキャッシュしておく。
+
+	Parameters
+	----------
+	vertices : list[Vector]
+		頂点リスト。新しい中点はこのリストに追加される。
+	index1 : int
+		辺の一方の頂点のインデックス。
+	index2 : int
+		辺のもう一方の頂点のインデックス。
+	midpoint_cache : dict[tuple[int, int], int]
+		辺（小さい方のインデックス, 大きい方のインデックス）から中点のインデックスへの辞書。
+
+	Returns
+	-------
+	int
+		中点のインデックス。
+	"""
+	key = (index1, index2) if index1 < index2 else (index2, index1)
+	index = midpoint_cache.get(key)
+	if index is None:
+		vertices.append((vertices[index1] + vertices[index2]) / 2)
+		index = len(vertices) - 1
+		midpoint_cache[key] = index
+	return index
+
+
+
+
+
+def subdivide_triangle_shared(vertices: list[Vector], face: tuple[int, int, int], midpoint_cache: dict[tuple[int, int], int]) -> list[tuple[int, int, int]]:
+	"""
+	`subdivide_triangle`と同じように三角形を4つに分割するが、辺の中点をキャッシュして隣り合う三角形で共有するので、重複する頂点を作らない。
+
+	Parameters
+	----------
+	vertices : list[Vector]
+		三角形を含む頂点リスト。分割時にできた新しい頂点はこのリストに追加される。
+	face : tuple[int, int, int]
+		分割元の三角形を形成する頂点のインデックス。
+	midpoint_cache : dict[tuple[int, int], int]
+		辺の中点のキャッシュ。`get_midpoint_vertex_index`を参照。
+
+	Returns
+	-------
+	list[tuple[int, int, int]]
+		新しい面のリスト。
+	"""
+	i0 = get_midpoint_vertex_index(vertices, face[0], face[1], midpoint_cache)
+	i1 = get_midpoint_vertex_index(vertices, face[1], face[2], midpoint_cache)
+	i2 = get_midpoint_vertex_index(vertices, face[2], face[0], midpoint_cache)
+	return [(i0, i1, i2), (face[0], i0, i2), (i0, face[1], i1), (i2, i1, face[2])]
+
+
+
+
+
+def get_subdivided_edge_vertex_indices(midpoint_cache: dict[tuple[int, int], int], start: int, end: int, subdivisions: int) -> list[int]:
+	"""
+	`subdivide_triangle_shared`で分割した三角形の辺上にある頂点のインデックスを、始点から終点の順に返す。
+	分割するたびに辺の中点が1つずつ増えるので、中点のキャッシュをたどるだけで求まる。
+
+	Parameters
+	----------
+	midpoint_cache : dict[tuple[int, int], int]
+		分割に使った辺の中点のキャッシュ。
+	start : int
+		分割前の辺の始点のインデックス。
+	end : int
+		分割前の辺の終点のインデックス。
+	subdivisions : int
+		分割回数。
+
+	Returns
+	-------
+	list[int]
+		辺上の 2^subdivisions + 1 個の頂点のインデックス。
+	"""
+	indices = [start, end]
+	for _ in range(subdivisions):
+		new_indices = []
+		for index1, index2 in zip(indices[:-1], indices[1:]):
+			new_indices.append(index1)
+			new_indices.append(midpoint_cache[(index1, index2) if index1 < index2 else (index2, index1)])
+		new_indices.append(end)
+		indices = new_indices
+	return indices
+
+
+
+
+
 
 
 
@@ -338,7 +445,92 @@ def create_regular_tetrahedron(radius: float, origin: str) -> int:
 
 
 
-def create_reuleaux_tetrahedron(radius, origin, subdivisions):
+def create_reuleaux_tetrahedron(radius: float, origin: str, subdivisions: int, legacy: bool = None) -> tuple[list[Vector], list[tuple[int, ...]]]:
+	"""
+	頂点を計算してルーローの四面体のメッシュを作成する。
+	正四面体の各面を分割して反対側の頂点を中心とする球の表面上に移動し、隣り合う面の間を2つの球の交線（稜線）の円弧とつなぐ。
+	辺の中点を共有しながら分割し、稜線とつなぐ面の辺上の頂点は中点のキャッシュから求めるので、頂点数に比例した時間で重複する頂点の無いメッシュができる。
+
+	Parameters
+	----------
+	radius : float
+		ルーローの四面体を構成する球の半径（正四面体の辺の長さ）。
+	origin : str
+		原点の位置。'center'、'bottom'、または 'apex' のいずれか。
+	subdivisions : int
+		正四面体の各面の分割回数。1以上。
+	legacy : bool, optional
+		Trueの場合は以前の構築方法（`create_reuleaux_tetrahedron_legacy`）を使う。指定しない場合は環境変数`ROMLY_REULEAUX_TETRAHEDRON_LEGACY_BUILDER`に従う。
+
+	Returns
+	-------
+	tuple[list[Vector], list[tuple[int, ...]]]
+		頂点のリストと面のリスト。
+	"""
+	if legacy is None:
+		legacy = romly_utils.legacy_flag(REULEAUX_TETRAHEDRON_LEGACY_BUILDER_FLAG)
+	if legacy:
+		return create_reuleaux_tetrahedron_legacy(radius, origin, subdivisions)
+
+	# 四面体の頂点を計算する
+	tetrahedron = create_regular_tetrahedron(radius, origin=origin)
+	vertices = tetrahedron.vertices
+
+	total_faces = []
+	midpoint_caches = []
+
+	# 四面体の各面について…
+	for i in range(4):
+		first_vertex_index = len(vertices)
+		midpoint_cache = {}
+
+		current_faces = [tetrahedron.faces[i]]
+		for _ in range(subdivisions):
+			temp_faces = []
+			for face in current_faces:
+				temp_faces.extend(subdivide_triangle_shared(vertices, face, midpoint_cache))
+			current_faces = temp_faces
+
+		# この面で追加した頂点を球の表面上に移動（正四面体の頂点は最初からすべての球の表面上にある）
+		sphere_center = vertices[tetrahedron.opposite_vertex_indices[i]]
+		for index in range(first_vertex_index, len(vertices)):
+			vertices[index] = sphere_center + (vertices[index] - sphere_center).normalized() * radius
+
+		midpoint_caches.append(midpoint_cache)
+		total_faces.extend(current_faces)
+
+
+
+	# 稜線となる頂点を追加していく
+	segments = 2 ** subdivisions
+	for i, (center_index1, center_index2) in enumerate(tetrahedron.sphere_center_vertex_index_pairs):
+		start_index, end_index = tetrahedron.edge_arc_start_end_vertex_indices[i]
+		vertices_on_arc = sphere_intersection(vertices[center_index1], radius, vertices[center_index2], radius, start=vertices[start_index], end=vertices[end_index], segments=segments)
+
+		# 円弧の両端は正四面体の頂点と同じ位置なので、間の頂点だけを追加する
+		arc_indices = [start_index] + list(range(len(vertices), len(vertices) + segments - 1)) + [end_index]
+		vertices.extend(vertices_on_arc[1:-1])
+
+		# 稜線と三角形部分を繋ぐ面を追加する。面の辺上の頂点は、円弧の頂点と同じ順番に並んでいる
+		for face_index in tetrahedron.adjoin_face_index_pairs[i]:
+			edge_indices = get_subdivided_edge_vertex_indices(midpoint_caches[face_index], start_index, end_index, subdivisions)
+
+			total_faces.append((arc_indices[0], arc_indices[1], edge_indices[1]))
+			for j in range(1, segments - 1):
+				total_faces.append((arc_indices[j], edge_indices[j], edge_indices[j + 1], arc_indices[j + 1]))
+			total_faces.append((arc_indices[-2], edge_indices[-2], arc_indices[-1]))
+
+	return vertices, total_faces
+
+
+
+
+
+
+def create_reuleaux_tetrahedron_legacy(radius, origin, subdivisions):
+	"""
+	以前の`create_reuleaux_tetrahedron`。分割した面の頂点は重複し、稜線とつなぐ頂点を`find_nearest_vertex`で総当たりで探す。比較用。
+	"""
 	# 四面体の頂点を計算する
 	tetrahedron = create_regular_tetrahedron(radius, origin=origin)
 
@@ -5,6 +5,7 @@ import bmesh
 from bmesh.types import BMVert
 from bpy.props import *
 from mathutils import Vector, Matrix, Quaternion
+import numpy as np
 
 
 
@@ -14,6 +15,13 @@ from . import romly_utils
 
 
 
+# スフェリコンを以前の方法（Screwモデファイアの適用、複製、回転、結合をオペレーターで行う）で作成する場合は、環境変数`ROMLY_SPHERICON_LEGACY_BUILDER`を1にする（比較用）
+SPHERICON_LEGACY_BUILDER_FLAG = 'SPHERICON_LEGACY_BUILDER'
+
+
+
+
+
 
 
 
@@ -121,6 +129,187 @@ def create_rotation_base_object(radius: float, num_vertices: int) -> bpy.types.O
 
 
 
+
+def make_sphericon_profile(radius: float, num_vertices: int, add_midpoints: bool) -> np.ndarray:
+	"""
+	`create_rotation_base_object`と同じ、YZ平面上の多角形をY=0でカットした形状の頂点を、上端（Z軸上）から下端（Z軸上）まで順番に計算する。
+	多角形の頂点はZ軸の真上から始まるので、上端は常に頂点になる。下端は頂点数が偶数なら頂点、奇数なら辺の中点になる。
+
+	Parameters
+	----------
+	radius : float
+		多角形の外接円の半径。
+	num_vertices : int
+		多角形の頂点数。
+	add_midpoints : bool
+		Trueの場合、多角形の各辺の中点も頂点に含める。
+
+	Returns
+	-------
+	np.ndarray
+		(Y, Z)座標の(K, 2)の配列。最初と最後の頂点はY = 0。
+	"""
+	# 辺の中点は外接円の内側（半径 * cos(180° / 頂点数)）にある
+	apothem = radius * math.cos(math.pi / num_vertices)
+	if add_midpoints:
+		# 頂点と辺の中点を交互に並べる
+		steps = np.arange(num_vertices + 1)
+		angles = steps * (math.pi / num_vertices)
+		radii = np.where(steps % 2 == 0, radius, apothem)
+	else:
+		angles = np.arange(num_vertices // 2 + 1) * (2 * math.pi / num_vertices)
+		radii = np.full(len(angles), radius)
+		if num_vertices % 2 == 1:
+			# 下端は一番下の辺とZ軸の交点
+			angles = np.append(angles, math.pi)
+			radii = np.append(radii, apothem)
+
+	points = radii[:, np.newaxis] * np.column_stack((np.sin(angles), np.cos(angles)))
+	points[-1, 0] = 0
+	return points
+
+
+
+
+
+def create_sphericon(radius: float, num_vertices: int, num_rotation: int, segments: int) -> bpy.types.Object:
+	"""
+	スフェリコン形状のオブジェクトを生成する。
+	`make_sphericon_profile`の輪郭をZ軸周りに180度回転させた回転体を左半分とし、それをZ軸周りに180度、X軸周りに多角形の頂点`num_rotation`個分回転させたものを右半分とする。
+	回転体の頂点と面は配列の計算で作り、右半分の切り口の頂点は重なる左半分の頂点のインデックスに置き換えるので、オペレーターも重複する頂点の削除も使わない。
+
+	Parameters
+	----------
+	radius : float
+		多角形の外接円の半径（対角線の長さの半分）。
+	num_vertices : int
+		多角形の頂点数。
+	num_rotation : int
+		右半分をX軸周りに多角形の頂点何個分回転させるか。
+	segments : int
+		円錐部分の回転方向のセグメント数。
+
+	Returns
+	-------
+	bpy.types.Object
+		作成されたスフェリコンのオブジェクト。
+	"""
+	if romly_utils.legacy_flag(SPHERICON_LEGACY_BUILDER_FLAG):
+		return create_sphericon_legacy(radius=radius, num_vertices=num_vertices, num_rotation=num_rotation, segments=segments)
+
+	# 頂点数が奇数の場合、輪郭の下端（辺の中点）は回転すると別の辺の中点に移るので、すべての辺の中点を頂点に加えて切り口の頂点を重ねる
+	rotation_steps = num_rotation % num_vertices
+	profile = make_sphericon_profile(radius=radius, num_vertices=num_vertices, add_midpoints=num_vertices % 2 == 1 and rotation_steps != 0)
+	num_inner = len(profile) - 2
+
+	# 左半分の頂点。Z軸上の上端と下端は1つずつにして、残りの輪郭の頂点を回転方向に並べる
+	angles = np.linspace(0, math.pi, segments + 1)
+	left = np.empty((segments + 1, num_inner, 3))
+	left[:, :, 0] = -np.sin(angles)[:, np.newaxis] * profile[1:-1, 0]
+	left[:, :, 1] = np.cos(angles)[:, np.newaxis] * profile[1:-1, 0]
+	left[:, :, 2] = profile[1:-1, 1]
+
+	# 右半分の頂点。両端の列（切り口）は左半分の頂点と重なるので作らない。回転の向きは以前の`bpy.ops.transform.rotate`に合わせている
+	x_rot = math.radians(360.0 / num_vertices * num_rotation)
+	matrix = np.array(Matrix.Rotation(-x_rot, 3, 'X') @ Matrix.Rotation(math.pi, 3, 'Z'))
+	right = left[1:-1] @ matrix.T
+
+	coords = np.vstack(((0, 0, profile[0, 1]), (0, 0, profile[-1, 1]), left.reshape(-1, 3), right.reshape(-1, 3)))
+
+	# 輪郭の頂点（行）と回転方向の位置（列）ごとの頂点インデックス。上端は0、下端は1
+	rows = np.arange(num_inner)[:, np.newaxis]
+	left_grid = np.empty((num_inner + 2, segments + 1), dtype=np.int64)
+	left_grid[0] = 0
+	left_grid[-1] = 1
+	left_grid[1:-1] = 2 + np.arange(segments + 1) * num_inner + rows
+
+	# 切り口の多角形を上端から+Y側を通って一周する順番に並べた頂点インデックス。X軸周りの回転はこの順番をずらすことになる
+	cycle = np.concatenate((left_grid[:-1, 0], left_grid[:0:-1, segments]))
+	shift = rotation_steps * len(cycle) // num_vertices
+	steps = np.arange(num_inner + 2)
+
+	right_grid = np.empty_like(left_grid)
+	right_grid[:, 0] = cycle[(shift - steps) % len(cycle)]
+	right_grid[:, segments] = cycle[(shift + steps) % len(cycle)]
+	right_grid[0, 1:-1] = right_grid[0, 0]
+	right_grid[-1, 1:-1] = right_grid[-1, 0]
+	right_grid[1:-1, 1:-1] = 2 + (segments + 1) * num_inner + np.arange(segments - 1) * num_inner + rows
+
+	# 上端と下端に接する面は三角形、それ以外は四角形
+	triangles = []
+	quads = []
+	for grid in (left_grid, right_grid):
+		current = grid[:, :-1]
+		following = grid[:, 1:]
+		triangles.append(np.stack((current[0], current[1], following[1]), axis=-1))
+		triangles.append(np.stack((current[-2], current[-1], following[-2]), axis=-1))
+		quads.append(np.stack((current[1:-2], current[2:-1], following[2:-1], following[1:-2]), axis=-1).reshape(-1, 4))
+	triangles = np.concatenate(triangles)
+	quads = np.concatenate(quads)
+
+	loop_vertex_indices = np.concatenate((triangles.ravel(), quads.ravel()))
+	loop_starts = np.concatenate((np.arange(len(triangles)) * 3, len(triangles) * 3 + np.arange(len(quads)) * 4))
+	obj = romly_utils.create_object_from_buffers(coords, loop_vertex_indices, loop_starts, name='Sphericon')
+	bpy.context.collection.objects.link(obj)
+	return obj
+
+
+
+
+
+def create_sphericon_legacy(radius: float, num_vertices: int, num_rotation: int, segments: int) -> bpy.types.Object:
+	"""
+	以前の`create_sphericon`。Screwモデファイアを適用した回転体を複製、回転して結合し、重複する頂点を削除する。比較用。
+	"""
+	bpy.ops.object.select_all(action='DESELECT')
+
+	# まず回転体の元になる形状（正四角形の半分）を作成
+	left_obj = create_rotation_base_object(radius=radius, num_vertices=num_vertices)
+	bpy.context.collection.objects.link(left_obj)
+
+	bpy.context.view_layer.objects.active = left_obj
+
+	# Screwモデファイアで回転体にする
+	mod = bpy.context.object.modifiers.new(type='SCREW', name='Screw')
+	mod.angle = math.pi
+	mod.screw_offset = 0
+	mod.axis = 'Z'
+	mod.steps = segments
+	mod.render_steps = segments
+	mod.use_merge_vertices = False
+	mod.use_smooth_shade = False	# これを忘れるとスムーズシェーディングになってしまうのだ
+	bpy.ops.object.modifier_apply(modifier=mod.name)
+
+	# 右側用に複製
+	left_obj.select_set(state=True)
+	bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={"linked":False, "mode":'TRANSLATION'}, TRANSFORM_OT_translate={"value":(0, 0, 0), "orient_type":'GLOBAL', "orient_matrix":((1, 0, 0), (0, 1, 0), (0, 0, 1)), "orient_matrix_type":'GLOBAL', "mirror":False, "use_proportional_edit":False, "proportional_edit_falloff":'SMOOTH', "proportional_size":1, "use_proportional_connected":False, "use_proportional_projected":False})
+
+	# 右側を回転
+	bpy.ops.transform.rotate(value=math.pi, orient_axis='Z', orient_type='GLOBAL', orient_matrix=((1, 0, 0), (0, 1, 0), (0, 0, 1)), orient_matrix_type='GLOBAL')
+
+	# X軸で回転してスフェリコンに
+	x_rot_degree = 360.0 / num_vertices * num_rotation
+	bpy.ops.transform.rotate(value=math.radians(x_rot_degree), orient_axis='X', orient_type='GLOBAL', orient_matrix=((1, 0, 0), (0, 1, 0), (0, 0, 1)), orient_matrix_type='GLOBAL')
+
+	right_obj = bpy.context.view_layer.objects.active
+
+	# 2つのオブジェクトを合成
+	left_obj.select_set(state=True)
+	right_obj.select_set(state=True)
+	bpy.context.view_layer.objects.active = left_obj
+	bpy.ops.object.join()
+
+	return romly_utils.cleanup_mesh(left_obj)
+
+
+
+
+
+
+
+
+
+
 class ROMLYADDON_OT_add_sphericon(bpy.types.Operator):
 	bl_idname = "romlyaddon.add_sphericon"
 	bl_label = bpy.app.translations.pgettext_iface('Add Sphericon')
@@ -154,49 +343,18 @@ class ROMLYADDON_OT_add_sphericon(bpy.types.Operator):
 
 
 
+	@romly_utils.profile_execute
 	def execute(self, context):
 		bpy.ops.object.select_all(action='DESELECT')
 
-		# まず回転体の元になる形状（正四角形の半分）を作成
-		left_obj = create_rotation_base_object(radius=self.val_diagonal_length / 2, num_vertices=self.val_vertices)
-		bpy.context.collection.objects.link(left_obj)
-
-		bpy.context.view_layer.objects.active = left_obj
-
-		# Screwモデファイアで回転体にする
-		mod = bpy.context.object.modifiers.new(type='SCREW', name='Screw')
-		mod.angle = math.pi
-		mod.screw_offset = 0
-		mod.axis = 'Z'
-		mod.steps = self.val_segments
-		mod.render_steps = self.val_segments
-		mod.use_merge_vertices = False
-		mod.use_smooth_shade = False	# これを忘れるとスムーズシェーディングになってしまうのだ
-		bpy.ops.object.modifier_apply(modifier=mod.name)
-
-		# 右側用に複製
-		left_obj.select_set(state=True)
-		bpy.ops.object.duplicate_move(OBJECT_OT_duplicate={"linked":False, "mode":'TRANSLATION'}, TRANSFORM_OT_translate={"value":(0, 0, 0), "orient_type":'GLOBAL', "orient_matrix":((1, 0, 0), (0, 1, 0), (0, 0, 1)), "orient_matrix_type":'GLOBAL', "mirror":False, "use_proportional_edit":False, "proportional_edit_falloff":'SMOOTH', "proportional_size":1, "use_proportional_connected":False, "use_proportional_projected":False})
-
-		# 右側を回転
-		bpy.ops.transform.rotate(value=math.pi, orient_axis='Z', orient_type='GLOBAL', orient_matrix=((1, 0, 0), (0, 1, 0), (0, 0, 1)), orient_matrix_type='GLOBAL')
-
-		# X軸で回転してスフェリコンに
-		x_rot_degree = 360.0 / self.val_vertices * self.val_num_rotation
-		bpy.ops.transform.rotate(value=math.radians(x_rot_degree), orient_axis='X', orient_type='GLOBAL', orient_matrix=((1, 0, 0), (0, 1, 0), (0, 0, 1)), orient_matrix_type='GLOBAL')
-
-		right_obj = bpy.context.view_layer.objects.active
-
-		# 2つのオブジェクトを合成
-		left_obj.select_set(state=True)
-		right_obj.select_set(state=True)
-		bpy.context.view_layer.objects.active = left_obj
-		bpy.ops.object.join()
+		obj = create_sphericon(radius=self.val_diagonal_length / 2, num_vertices=self.val_vertices, num_rotation=self.val_num_rotation, segments=self.val_segments)
 
-		left_obj = romly_utils.cleanup_mesh(left_obj)
+		# 生成したオブジェクトを選択
+		obj.select_set(state=True)
+		bpy.context.view_layer.objects.active = obj
 
 		# オブジェクトを3Dカーソル位置へ移動
-		left_obj.location = bpy.context.scene.cursor.location
+		obj.location = bpy.context.scene.cursor.location
 
 		return {'FINISHED'}
 
@@ -0,0 +1,31 @@
+import bpy
+
+
+
+from . import romly_utils
+
+
+
+
+
+
+
+
+
+
+class ROMLYADDON_OT_clear_mesh_cache(bpy.types.Operator):
+	"""
+	部品の生成で使うメッシュキャッシュ（メモリとディスクの両方）を削除するオペレーター。
+	生成結果がおかしい場合や、ディスクの容量を空けたい場合に使う。
+	"""
+	bl_idname = 'romlyaddon.clear_mesh_cache'
+	bl_label = bpy.app.translations.pgettext_iface('Clear Mesh Cache')
+	bl_description = 'Delete all cached meshes of the generated parts from memory and disk'
+	bl_options = {'REGISTER'}
+
+
+
+	def execute(self, context):
+		count = romly_utils.clear_mesh_caches()
+		romly_utils.report(self, 'INFO', msg_key='{count} cached meshes were deleted', params={'count': str(count)})
+		return {'FINISHED'}
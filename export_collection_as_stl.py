@@ -1,9 +1,21 @@
 import bpy
 import os
+import sys
+import json
+import time
+import hashlib
+import importlib
+import multiprocessing
+import numpy as np
+from collections import deque
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from bpy.props import *
 
 
 
 from . import romly_utils
+from . import stl_writer
 
 
 
@@ -14,22 +26,323 @@ from . import romly_utils
 
 
 
-def selectObjectsInChildren(layerCollection):
+def get_mesh_objects_in_children(layerCollection, objects: list[bpy.types.Object] = None) -> list[bpy.types.Object]:
 	"""
-	コレクション内のメッシュを再帰的に選択する。
+	コレクション内のメッシュを再帰的に集める。レイヤービューから除外されたコレクションの中身は含まない。
+
+	Parameters
+	----------
+	layerCollection : bpy.types.LayerCollection
+		対象のレイヤーコレクション。
+	objects : list[bpy.types.Object], optional
+		見つかったメッシュを追加するリスト。省略した場合は新しいリストを作る。
+
+	Returns
+	-------
+	list[bpy.types.Object]
+		見つかったメッシュのリスト。複数のコレクションにリンクされているオブジェクトも1回だけ含まれる。
 	"""
+	if objects is None:
+		objects = []
 	if not layerCollection.exclude:
 		for obj in layerCollection.collection.objects:
 			# 最初は len(obj.data.polygons) > 0 という条件で面がないメッシュを弾いてたんだけど、モデファイアで作ったメッシュやパーティクルが選択されないので辞めた。
-			if obj.type == 'MESH':
-				obj.select_set(state=True)
+			if obj.type == 'MESH' and obj not in objects:
+				objects.append(obj)
 		for child in layerCollection.children:
-			selectObjectsInChildren(child)
+			get_mesh_objects_in_children(child, objects)
+	return objects
+
+
+
+
+
+def selectObjectsInChildren(layerCollection):
+	"""
+	コレクション内のメッシュを再帰的に選択する。
+	"""
+	for obj in get_mesh_objects_in_children(layerCollection):
+		obj.select_set(state=True)
+
+
+
+
+
+def get_stl_filepath(name: str) -> str:
+	"""
+	エクスポートするSTLのファイル名を作る。blendファイル名 + " - " + 名前 + ".stl"
+
+	Parameters
+	----------
+	name : str
+		コレクション名やオブジェクト名。
+	"""
+	return os.path.splitext(bpy.data.filepath)[0] + " - " + name + ".stl"
+
+
+
+
+
+
+
+
+
+
+
+def iter_stl_arrays(objects: list[bpy.types.Object], depsgraph: bpy.types.Depsgraph):
+	"""
+	オブジェクトのモデファイア適用後のメッシュを、`calc_loop_triangles`で三角形に分割して配列として1つずつ取り出すジェネレーター。
+
+	Parameters
+	----------
+	objects : list[bpy.types.Object]
+		対象のオブジェクトのリスト。メッシュに変換できないオブジェクトは無視される。
+	depsgraph : bpy.types.Depsgraph
+		モデファイアを評価するための依存グラフ。
+
+	Yields
+	------
+	tuple[np.ndarray, np.ndarray, np.ndarray]
+		(ローカル座標の頂点の(N, 3)の配列, 三角形の頂点インデックスの(T, 3)の配列, ワールド行列)
+	"""
+	for obj in objects:
+		evaluated = obj.evaluated_get(depsgraph)
+		mesh = evaluated.to_mesh()
+		if mesh is None:
+			continue
+		try:
+			mesh.calc_loop_triangles()
+			if len(mesh.loop_triangles) == 0:
+				continue
+
+			coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+			mesh.vertices.foreach_get('co', coords)
+			triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+			mesh.loop_triangles.foreach_get('vertices', triangles)
+			matrix = np.array(evaluated.matrix_world, dtype=np.float64)
+		finally:
+			evaluated.to_mesh_clear()
+		yield coords.reshape(-1, 3), triangles.reshape(-1, 3), matrix
 
 
 
 
 
+def write_binary_stl(filepath: str, objects: list[bpy.types.Object], depsgraph: bpy.types.Depsgraph = None, chunk_triangles: int = stl_writer.STL_CHUNK_TRIANGLES) -> int:
+	"""
+	オブジェクトのモデファイア適用後のメッシュをバイナリSTLとして書き込む。
+	エクスポートのオペレーターを使わないので、選択状態やBlenderのバージョンに関係なく使える。
+	三角形は`calc_loop_triangles`と`foreach_get`で配列として取り出し、`chunk_triangles`個ずつレコードにまとめて書き込むので、大きなメッシュでも書き込み用のバッファは一定の大きさで済む。
+
+	Parameters
+	----------
+	filepath : str
+		書き込むファイルのパス。
+	objects : list[bpy.types.Object]
+		書き込むオブジェクトのリスト。メッシュに変換できないオブジェクトは無視される。
+	depsgraph : bpy.types.Depsgraph, optional
+		モデファイアを評価するための依存グラフ。省略した場合は現在のものを使う。
+	chunk_triangles : int, optional
+		一度に書き込む三角形の数。
+
+	Returns
+	-------
+	int
+		書き込んだ三角形の数。
+	"""
+	if depsgraph is None:
+		depsgraph = bpy.context.evaluated_depsgraph_get()
+	return stl_writer.write_binary_stl_arrays(filepath, iter_stl_arrays(objects, depsgraph), chunk_triangles)[1]
+
+
+
+
+
+def write_binary_stl_files_parallel(jobs: list[tuple[str, list[bpy.types.Object]]], depsgraph: bpy.types.Depsgraph = None, max_workers: int = None) -> list[tuple[str, int, int, float]]:
+	"""
+	複数のバイナリSTLファイルを、複数のプロセスで並列に書き込む。
+	モデファイアの評価と三角形分割、配列の取り出しはBlenderのデータを扱うのでこのプロセスで行い、ワールド座標への変換、法線の計算、書き込みを別プロセスで行う。
+
+	Parameters
+	----------
+	jobs : list[tuple[str, list[bpy.types.Object]]]
+		(書き込むファイルのパス, オブジェクトのリスト)のリスト。
+	depsgraph : bpy.types.Depsgraph, optional
+		モデファイアを評価するための依存グラフ。省略した場合は現在のものを使う。
+	max_workers : int, optional
+		プロセス数。省略した場合はCPUのコア数。
+
+	Returns
+	-------
+	list[tuple[str, int, int, float] | Exception]
+		`jobs`の順番で、(ファイルのパス, 書き込んだ三角形の数, ファイルサイズ, 書き込みにかかった時間（秒）)のリスト。書き込みに失敗したファイルはその例外。
+	"""
+	if depsgraph is None:
+		depsgraph = bpy.context.evaluated_depsgraph_get()
+
+	# 配列はファイルごとに取り出しながら渡すので、同時に保持するのは書き込み中のファイルの分だけ
+	max_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+	return write_stl_arrays_parallel(((filepath, list(iter_stl_arrays(objects, depsgraph))) for filepath, objects in jobs), max_workers=max_workers)
+
+
+
+
+
+def write_stl_arrays_parallel(arrays: Iterable[tuple[str, list[tuple[np.ndarray, np.ndarray, np.ndarray]]]], max_workers: int = None, max_in_flight: int = None) -> list[tuple[str, int, int, float] | Exception]:
+	"""
+	`iter_stl_arrays`で取り出した配列を、複数のプロセスで並列にバイナリSTLファイルとして書き込む。
+	`arrays`はジェネレーターでもよく、1つ取り出すたびにすぐプロセスに渡す。書き込み中のファイルが`max_in_flight`個になったら、
+	一番古いものが終わるまで次を取り出さないので、同時にメモリに載る配列はその数のファイル分までになる。
+
+	Parameters
+	----------
+	arrays : Iterable[tuple[str, list[tuple[np.ndarray, np.ndarray, np.ndarray]]]]
+		(書き込むファイルのパス, `iter_stl_arrays`で取り出した配列のリスト)を順に返すもの。
+	max_workers : int, optional
+		プロセス数。省略した場合はCPUのコア数。
+	max_in_flight : int, optional
+		同時に書き込み中にするファイルの数の上限。省略した場合はプロセス数の2倍。
+
+	Returns
+	-------
+	list[tuple[str, int, int, float] | Exception]
+		`arrays`の順番で、(ファイルのパス, 書き込んだ三角形の数, ファイルサイズ, 書き込みにかかった時間（秒）)のリスト。
+		書き込みに失敗したファイルは、そのときの例外が入る（1つ失敗しても他のファイルの書き込みは続ける）。
+	"""
+	# 別プロセスではアドオンのパッケージ（bpyが必要）を読み込めないので、stl_writerを単独のモジュールとして読み込ませる。
+	# Blenderの中ではforkが安全ではないので、どのOSでもspawnでプロセスを作る
+	addon_dir = os.path.dirname(os.path.abspath(__file__))
+	if addon_dir not in sys.path:
+		sys.path.append(addon_dir)
+	worker_module = importlib.import_module('stl_writer')
+
+	max_workers = max_workers or os.cpu_count() or 1
+	if isinstance(arrays, list):
+		max_workers = min(max_workers, len(arrays))
+	results = []
+	if max_workers <= 1:
+		for filepath, parts in arrays:
+			try:
+				results.append(worker_module.write_binary_stl_arrays(filepath, parts))
+			except Exception as e:
+				results.append(e)
+		return results
+
+	def collect(future) -> None:
+		try:
+			results.append(future.result())
+		except Exception as e:
+			results.append(e)
+
+	max_in_flight = max(max_in_flight or max_workers * 2, 1)
+	with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+		# 結果を`arrays`の順番に並べるため、古いものから順に待つ
+		in_flight = deque()
+		for filepath, parts in arrays:
+			if len(in_flight) >= max_in_flight:
+				collect(in_flight.popleft())
+			in_flight.append(executor.submit(worker_module.write_binary_stl_arrays, filepath, parts))
+		while in_flight:
+			collect(in_flight.popleft())
+	return results
+
+
+
+
+
+
+
+
+
+
+# MARK: Incremental
+def get_stl_fingerprint(parts: list[tuple[np.ndarray, np.ndarray, np.ndarray]], objects: list[bpy.types.Object], binary: bool) -> str:
+	"""
+	STLファイルに書き込まれる内容のフィンガープリントを作る。
+	モデファイア適用後の頂点と三角形の配列、ワールド行列に加えて、オブジェクト名とモデファイアの構成、出力形式も含める。
+
+	Parameters
+	----------
+	parts : list[tuple[np.ndarray, np.ndarray, np.ndarray]]
+		`iter_stl_arrays`で取り出した配列のリスト。
+	objects : list[bpy.types.Object]
+		STLファイルに含めるオブジェクトのリスト。
+	binary : bool
+		バイナリ形式で出力するかどうか。
+
+	Returns
+	-------
+	str
+		フィンガープリントの16進数の文字列。
+	"""
+	digest = hashlib.blake2b(digest_size=16)
+	digest.update(b'binary' if binary else b'ascii')
+	for coords, triangles, matrix in parts:
+		for array in (coords, triangles, matrix):
+			digest.update(str(array.shape).encode())
+			digest.update(np.ascontiguousarray(array).tobytes())
+	for obj in objects:
+		digest.update(obj.name.encode())
+		for modifier in obj.modifiers:
+			digest.update(f'{modifier.name}:{modifier.type}:{modifier.show_viewport}:{modifier.show_render}'.encode())
+	return digest.hexdigest()
+
+
+
+
+
+def get_stl_manifest_filepath() -> str:
+	"""差分エクスポートのフィンガープリントを保存するファイルのパス。blendファイルと同じフォルダに置く。"""
+	return os.path.splitext(bpy.data.filepath)[0] + '.stl_manifest.json'
+
+
+
+
+
+def load_stl_manifest() -> dict[str, str]:
+	"""
+	差分エクスポートのフィンガープリントを読み込む。ファイルが無い、または壊れている場合は空の辞書を返す。
+
+	Returns
+	-------
+	dict[str, str]
+		STLファイル名（フォルダを含まない）とフィンガープリントの辞書。
+	"""
+	try:
+		with open(get_stl_manifest_filepath(), encoding='utf-8') as f:
+			manifest = json.load(f)
+		files = manifest.get('files', {})
+		return files if isinstance(files, dict) else {}
+	except (OSError, ValueError, AttributeError):
+		return {}
+
+
+
+
+
+def save_stl_manifest(files: dict[str, str]) -> None:
+	"""
+	差分エクスポートのフィンガープリントを保存する。
+
+	Parameters
+	----------
+	files : dict[str, str]
+		STLファイル名（フォルダを含まない）とフィンガープリントの辞書。
+	"""
+	with open(get_stl_manifest_filepath(), 'w', encoding='utf-8') as f:
+		json.dump({'version': 1, 'files': files}, f, indent='\t', ensure_ascii=False, sort_keys=True)
+
+
+
+
+
+def is_stl_unchanged(manifest: dict[str, str], stl_filepath: str, fingerprint: str) -> bool:
+	"""STLファイルが存在し、前回出力した時からフィンガープリントが変わっていないかどうか。"""
+	return manifest.get(os.path.basename(stl_filepath)) == fingerprint and os.path.exists(stl_filepath)
+
+
+
+
 
 
 
@@ -88,6 +401,9 @@ class ROMLYADDON_OT_export_collection_as_stl(bpy.types.Operator):
 	bl_description = 'Export all meshes in this collection as an STL file. The sub collections that were excluded from the layer view will be excluded.'
 	bl_options = {'REGISTER', 'UNDO'}
 
+	val_binary: BoolProperty(name='Binary', description='Write a binary STL file instead of an ASCII one. Binary files are much smaller and faster to write', default=False)
+	val_incremental: BoolProperty(name='Incremental', description='Skip the collections whose geometry has not changed since the last export. The fingerprints are saved next to the .blend file', default=False)
+
 
 
 	def invoke(self, context, event):
@@ -110,9 +426,31 @@ class ROMLYADDON_OT_export_collection_as_stl(bpy.types.Operator):
 			return {'CANCELLED'}
 
 		# エクスポートするSTLのファイル名を作る。
-		# blendファイル名 + " - " + コレクション名 + ".stl"
-		stl_filepath = os.path.splitext(filepath)[0] + " - " + bpy.context.collection.name + ".stl"
-		export_stl_compatible(filepath=stl_filepath)
+		stl_filepath = get_stl_filepath(bpy.context.collection.name)
+		objects = get_mesh_objects_in_children(bpy.context.view_layer.active_layer_collection)
+
+		# 差分エクスポートの場合、前回から変わっていなければ書き込まない
+		if self.val_incremental:
+			manifest = load_stl_manifest()
+			parts = list(iter_stl_arrays(objects, bpy.context.evaluated_depsgraph_get()))
+			fingerprint = get_stl_fingerprint(parts, objects, binary=self.val_binary)
+			if is_stl_unchanged(manifest, stl_filepath, fingerprint):
+				romly_utils.report(self, 'INFO', msg_key='The collection {collection} is unchanged: {filename}', params={'collection': bpy.context.view_layer.active_layer_collection.name, 'filename': stl_filepath})
+				return {'FINISHED'}
+
+		if self.val_binary:
+			if self.val_incremental:
+				stl_writer.write_binary_stl_arrays(stl_filepath, parts)
+			else:
+				write_binary_stl(stl_filepath, objects)
+		elif not export_stl_compatible(filepath=stl_filepath):
+			# 書き込めなかった場合はフィンガープリントを記録しない（次回の差分エクスポートで飛ばされてしまうため）
+			romly_utils.report(self, 'ERROR', msg_key='Failed to export the collection {collection}', params={'collection': bpy.context.view_layer.active_layer_collection.name})
+			return {'CANCELLED'}
+
+		if self.val_incremental:
+			manifest[os.path.basename(stl_filepath)] = fingerprint
+			save_stl_manifest(manifest)
 
 		msg_key = 'The collection {collection} is exported to: {filename}'
 		params = {'collection': bpy.context.view_layer.active_layer_collection.name, 'filename': stl_filepath}
@@ -136,6 +474,177 @@ class ROMLYADDON_OT_export_collection_as_stl(bpy.types.Operator):
 
 
 
+# MARK: Class
+class ROMLYADDON_OT_export_all_collections_as_stl(bpy.types.Operator):
+	"""
+	シーン直下の、レイヤービューから除外されていないすべてのコレクションを、コレクションごとに1つのSTLファイルとして出力するオペレーター。
+	選択状態はコレクションが変わるときに差分だけ切り替え、最後に元に戻す。
+	"""
+	bl_idname = 'romlyaddon.export_all_collections_as_stl'
+	bl_label = bpy.app.translations.pgettext_iface('Export All Collections as STL')
+	bl_description = 'Export each top-level collection that is not excluded from the view layer as a separate STL file'
+	bl_options = {'REGISTER', 'UNDO'}
+
+	val_binary: BoolProperty(name='Binary', description='Write a binary STL file instead of an ASCII one. Binary files are much smaller and faster to write', default=False)
+	val_parallel: BoolProperty(name='Parallel', description='Write the binary STL files in multiple processes. Effective when there are many large collections', default=False)
+	val_incremental: BoolProperty(name='Incremental', description='Skip the collections whose geometry has not changed since the last export. The fingerprints are saved next to the .blend file', default=False)
+
+
+
+	def invoke(self, context, event):
+		return self.execute(context)
+
+
+
+	def draw(self, context):
+		layout = self.layout
+		layout.prop(self, 'val_binary')
+		row = layout.row()
+		row.enabled = self.val_binary
+		row.prop(self, 'val_parallel')
+		layout.prop(self, 'val_incremental')
+
+
+
+	def execute(self, context):
+		# 編集中のファイルに名前がついてないとダメ
+		if not bpy.data.filepath:
+			romly_utils.report(self, 'ERROR', msg_key='Please save the active file first')
+			return {'CANCELLED'}
+
+		view_layer = bpy.context.view_layer
+		original_selection = list(bpy.context.selected_objects)
+		original_active = view_layer.objects.active
+
+		# バイナリの場合は選択状態を使わずに書き込むので、選択は変更しない。
+		# ASCIIの場合は最初に一度だけ選択を解除し、以降はコレクションごとに選択の差分だけを切り替える
+		if not self.val_binary:
+			for obj in original_selection:
+				obj.select_set(state=False)
+
+		depsgraph = bpy.context.evaluated_depsgraph_get()
+		manifest = load_stl_manifest() if self.val_incremental else {}
+		results = []
+		selected = set()
+		total_start = time.perf_counter()
+		jobs = []
+		for layer_collection in view_layer.layer_collection.children:
+			if layer_collection.exclude:
+				continue
+			objects = get_mesh_objects_in_children(layer_collection)
+			if objects:
+				jobs.append((layer_collection.name, get_stl_filepath(layer_collection.name), objects))
+
+		def prepare(collection_name: str, stl_filepath: str, objects: list[bpy.types.Object]) -> tuple | None:
+			"""差分エクスポートの場合は配列を取り出してフィンガープリントを作る。変わっていなければ結果に記録してNoneを返す。"""
+			if not self.val_incremental:
+				return None, None
+			parts = list(iter_stl_arrays(objects, depsgraph))
+			fingerprint = get_stl_fingerprint(parts, objects, binary=self.val_binary)
+			if is_stl_unchanged(manifest, stl_filepath, fingerprint):
+				results.append((collection_name, stl_filepath, 'SKIPPED', os.path.getsize(stl_filepath), 0.0))
+				return None
+			return parts, fingerprint
+
+		if self.val_binary and self.val_parallel:
+			# コレクションごとに配列を取り出したらすぐにプロセスへ渡す。書き込み中でないコレクションの配列はメモリに残さない
+			pending = []
+
+			def iter_pending_arrays():
+				for collection_name, stl_filepath, objects in jobs:
+					prepared = prepare(collection_name, stl_filepath, objects)
+					if prepared is None:
+						continue
+					parts, fingerprint = prepared
+					if parts is None:
+						parts = list(iter_stl_arrays(objects, depsgraph))
+					pending.append((collection_name, stl_filepath, fingerprint))
+					yield stl_filepath, parts
+
+			written = write_stl_arrays_parallel(iter_pending_arrays(), max_workers=min(os.cpu_count() or 1, len(jobs)))
+			for (collection_name, stl_filepath, fingerprint), result in zip(pending, written):
+				if isinstance(result, Exception):
+					results.append((collection_name, stl_filepath, 'FAILED', 0, 0.0))
+					continue
+				_, _, size, elapsed = result
+				results.append((collection_name, stl_filepath, 'EXPORTED', size, elapsed))
+				if fingerprint is not None:
+					manifest[os.path.basename(stl_filepath)] = fingerprint
+		else:
+			for collection_name, stl_filepath, objects in jobs:
+				prepared = prepare(collection_name, stl_filepath, objects)
+				if prepared is None:
+					continue
+				parts, fingerprint = prepared
+
+				start = time.perf_counter()
+				if self.val_binary:
+					# 差分エクスポートでなければ、オブジェクトごとに取り出しながら書き込む
+					stl_writer.write_binary_stl_arrays(stl_filepath, parts if parts is not None else iter_stl_arrays(objects, depsgraph))
+					succeeded = True
+				else:
+					objects_set = set(objects)
+					for obj in selected - objects_set:
+						obj.select_set(state=False)
+					for obj in objects_set - selected:
+						obj.select_set(state=True)
+					selected = objects_set
+					succeeded = export_stl_compatible(filepath=stl_filepath)
+				elapsed = time.perf_counter() - start
+				size = os.path.getsize(stl_filepath) if succeeded and os.path.exists(stl_filepath) else 0
+				results.append((collection_name, stl_filepath, 'EXPORTED' if succeeded else 'FAILED', size, elapsed))
+				if succeeded and fingerprint is not None:
+					manifest[os.path.basename(stl_filepath)] = fingerprint
+
+		if self.val_incremental:
+			save_stl_manifest(manifest)
+
+		# 選択を元に戻す
+		if not self.val_binary:
+			for obj in selected:
+				obj.select_set(state=False)
+			for obj in original_selection:
+				obj.select_set(state=True)
+			view_layer.objects.active = original_active
+
+		# ファイルごとの結果をリポートに表示
+		for collection_name, stl_filepath, status, size, elapsed in results:
+			if status == 'EXPORTED':
+				romly_utils.report(self, 'INFO', msg_key='{collection}: {filename} ({size} KB, {time} s)', params={
+					'collection': collection_name, 'filename': stl_filepath, 'size': f'{size / 1024:.1f}', 'time': f'{elapsed:.3f}'})
+			elif status == 'SKIPPED':
+				romly_utils.report(self, 'INFO', msg_key='The collection {collection} is unchanged: {filename}', params={'collection': collection_name, 'filename': stl_filepath})
+			else:
+				romly_utils.report(self, 'WARNING', msg_key='Failed to export the collection {collection}', params={'collection': collection_name})
+
+		exported = [result for result in results if result[2] == 'EXPORTED']
+		skipped = [result for result in results if result[2] == 'SKIPPED']
+		msg_key = '{count} collections were exported ({size} KB, {time} s)'
+		params = {'count': str(len(exported)), 'size': f'{sum(result[3] for result in exported) / 1024:.1f}', 'time': f'{time.perf_counter() - total_start:.3f}'}
+		if skipped:
+			msg_key = '{count} collections were exported, {skipped} unchanged collections were skipped ({size} KB, {time} s)'
+			params['skipped'] = str(len(skipped))
+
+		# ポップアップで表示（コマンドラインからバックグラウンドで実行された場合はウィンドウが無いので表示しない）
+		if not bpy.app.background:
+			msg = bpy.app.translations.pgettext_iface(msg_key).format(**params)
+			bpy.context.window_manager.popup_menu(
+				lambda self, context: self.layout.label(text=msg), title=self.bl_label, icon='INFO')
+
+		# リポートにも表示
+		romly_utils.report(self, 'INFO', msg_key=msg_key, params=params)
+
+		return {'FINISHED'}
+
+
+
+
+
+
+
+
+
+
 # MARK: Class
 class ROMLYADDON_OT_export_selection_as_stl(bpy.types.Operator):
 	"""
@@ -146,6 +655,8 @@ class ROMLYADDON_OT_export_selection_as_stl(bpy.types.Operator):
 	bl_description = 'Export the selected objects as an STL file'
 	bl_options = {'REGISTER', 'UNDO'}
 
+	val_binary: BoolProperty(name='Binary', description='Write a binary STL file instead of an ASCII one. Binary files are much smaller and faster to write', default=False)
+
 
 
 	def invoke(self, context, event):
@@ -162,11 +673,13 @@ class ROMLYADDON_OT_export_selection_as_stl(bpy.types.Operator):
 			return {'CANCELLED'}
 
 		# エクスポートするSTLのファイル名を作る。
-		# blendファイル名 + " - " + オブジェクト名 + ".stl"
-		stl_filepath = os.path.splitext(filepath)[0] + " - " + bpy.context.active_object.name + ".stl"
+		stl_filepath = get_stl_filepath(bpy.context.active_object.name)
 
 		# STLとしてエクスポート
-		export_stl_compatible(filepath=stl_filepath)
+		if self.val_binary:
+			write_binary_stl(stl_filepath, list(bpy.context.selected_objects))
+		else:
+			export_stl_compatible(filepath=stl_filepath)
 
 		msg_key = 'The selection is exported to: {filename}'
 		params = {'filename': stl_filepath}
@@ -199,6 +712,7 @@ class ROMLYADDON_MT_romly_export_collection_as_stl_menu_parent(bpy.types.Menu):
 	def draw(self, context):
 		layout = self.layout
 		layout.operator(ROMLYADDON_OT_export_collection_as_stl.bl_idname, text=bpy.app.translations.pgettext_iface('Export Collection as STL'), icon='EXPORT')
+		layout.operator(ROMLYADDON_OT_export_all_collections_as_stl.bl_idname, text=bpy.app.translations.pgettext_iface('Export All Collections as STL'), icon='EXPORT')
 
 
 
@@ -248,6 +762,7 @@ def outliner_object_menu_func(self, context):
 
 classes = [
 	ROMLYADDON_OT_export_collection_as_stl,
+	ROMLYADDON_OT_export_all_collections_as_stl,
 	ROMLYADDON_OT_export_selection_as_stl,
 	ROMLYADDON_MT_romly_export_collection_as_stl_menu_parent,
 	ROMLYADDON_MT_romly_export_selection_as_stl_menu_parent,
@@ -0,0 +1,471 @@
+import re
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+import subprocess
+import tempfile
+from pathlib import Path
+
+import bpy
+
+
+
+
+
+# このスクリプトのディレクトリ（benchmark.pyの`load_addon`と`clear_scene`を使う）
+EXTRA_DIR = Path(__file__).resolve().parent
+
+# 書き出し形式
+FORMAT_STL = 'stl'
+FORMAT_BLEND = 'blend'
+
+# 表の中で、値ではなく特別な意味を持つ列
+RESERVED_COLUMNS = ('operator', 'name')
+
+
+
+
+
+
+
+
+
+
+def parse_value(text: str):
+	"""
+	CSVのセルの文字列をプロパティの値に変換する。数値や`true`、`[1, 2, 3]`などはJSONとして読み、それ以外は文字列のまま返す。
+	"""
+	try:
+		return json.loads(text)
+	except ValueError:
+		return text
+
+
+
+
+
+def read_table(path: Path) -> list[dict]:
+	"""
+	パラメーターの表を読み込む。
+
+	JSONの場合は、`{"operator": ..., "name": ..., "params": {...}, "matrix": {...}}`のリスト（または`{"items": [...]}`）。
+	`matrix`の各プロパティには値のリストか、列挙型のすべての値を表す`"*"`を指定し、すべての組み合わせに展開される。
+
+	CSVの場合は、`operator`列と省略可能な`name`列以外の列がそのままプロパティになる。空のセルは指定しなかったことになる。
+	セルに`*`を書くと列挙型のすべての値に、`m3|m4|m5`のように`|`で区切ると、それぞれの値に展開される。
+
+	Parameters
+	----------
+	path : Path
+		`.json`または`.csv`のファイル。
+
+	Returns
+	-------
+	list[dict]
+		`operator`, `name`, `params`, `matrix`と、エラー表示用の行の位置`location`を持つ辞書のリスト。
+
+	Raises
+	------
+	ValueError
+		`operator`が指定されていない行がある場合。
+	"""
+	if path.suffix.lower() == '.csv':
+		rows = []
+		with open(path, newline='', encoding='utf-8-sig') as f:
+			reader = csv.DictReader(f)
+			for record in reader:
+				location = f'{path.name} row {reader.line_num}'
+				if not (record.get('operator') or '').strip():
+					raise ValueError(f'{location}: the "operator" column is missing or empty')
+				params = {}
+				matrix = {}
+				for key, text in record.items():
+					if key is None or key in RESERVED_COLUMNS or text is None or text.strip() == '':
+						continue
+					text = text.strip()
+					if text == '*':
+						matrix[key] = '*'
+					elif '|' in text:
+						matrix[key] = [parse_value(value.strip()) for value in text.split('|')]
+					else:
+						params[key] = parse_value(text)
+				rows.append({'operator': record['operator'].strip(), 'name': (record.get('name') or '').strip(), 'params': params, 'matrix': matrix, 'location': location})
+		return rows
+
+	with open(path, encoding='utf-8') as f:
+		data = json.load(f)
+	rows = data['items'] if isinstance(data, dict) else data
+	items = []
+	for number, row in enumerate(rows, start=1):
+		location = f'{path.name} item {number}'
+		if not row.get('operator'):
+			raise ValueError(f'{location}: "operator" is missing or empty')
+		items.append({'operator': row['operator'], 'name': row.get('name', ''), 'params': row.get('params', {}), 'matrix': row.get('matrix', {}), 'location': location})
+	return items
+
+
+
+
+
+
+
+
+
+
+def find_operator_class(addon, operator: str) -> type:
+	"""
+	`romlyaddon.add_jis_screw`のようなIDか`ROMLYADDON_OT_add_jis_screw`のようなクラス名から、オペレーターのクラスを探す。
+	"""
+	for cls in addon.MY_CLASS_LIST:
+		if operator in (cls.__name__, getattr(cls, 'bl_idname', None)):
+			return cls
+	raise ValueError(f'Unknown operator: {operator}')
+
+
+
+
+
+def make_filename(text: str) -> str:
+	"""
+	ファイル名に使えない文字を`_`に置き換える。
+	"""
+	return re.sub(r'[^\w.-]+', '_', text).strip('_') or 'item'
+
+
+
+
+
+def expand_items(addon, rows: list[dict]) -> list[dict]:
+	"""
+	表の行を、`matrix`のすべての組み合わせに展開して、実行する項目のリストにする。
+
+	項目の名前は、行の`name`に`{val_ms}`のようにプロパティ名を書くとその値に置き換えられる。
+	`name`が無い場合はオペレーター名と展開したプロパティの値から作る。同じ名前になった場合は後ろに番号を付ける。
+
+	Returns
+	-------
+	list[dict]
+		`index`, `name`, `operator`（bl_idname）, `params`を持つ辞書のリスト。
+
+	Raises
+	------
+	ValueError
+		オペレーターが見つからない場合や、`*`を列挙型以外のプロパティに指定した場合、`name`に無いプロパティ名を書いた場合。エラーメッセージに行の位置と列が含まれる。
+	"""
+	items = []
+	used_names = set()
+	for row in rows:
+		try:
+			cls = find_operator_class(addon, row['operator'])
+		except ValueError as e:
+			raise ValueError(f'{row["location"]}, column operator: {e}') from e
+
+		keys = list(row['matrix'].keys())
+		choices = []
+		for key in keys:
+			values = row['matrix'][key]
+			if values == '*':
+				module_name, operator_name = cls.bl_idname.split('.')
+				prop = getattr(getattr(bpy.ops, module_name), operator_name).get_rna_type().properties.get(key)
+				if prop is None or prop.type != 'ENUM':
+					raise ValueError(f'{row["location"]}, column {key}: "*" can only be used for enum properties of {cls.bl_idname}')
+				values = [enum_item.identifier for enum_item in prop.enum_items]
+			choices.append(values)
+
+		for combination in itertools.product(*choices):
+			params = dict(row['params'])
+			params.update(zip(keys, combination))
+
+			if row['name']:
+				try:
+					name = row['name'].format(**params)
+				except (KeyError, IndexError) as e:
+					raise ValueError(f'{row["location"]}, column name: unknown placeholder {e} in "{row["name"]}"') from e
+			else:
+				name = '_'.join([cls.bl_idname.split('.')[-1]] + [str(value) for value in combination])
+			name = make_filename(name)
+			unique_name = name
+			for number in itertools.count(2):
+				if unique_name not in used_names:
+					break
+				unique_name = f'{name}-{number}'
+			used_names.add(unique_name)
+
+			items.append({'index': len(items), 'name': unique_name, 'operator': cls.bl_idname, 'params': params})
+	return items
+
+
+
+
+
+
+
+
+
+
+def run_item(addon, benchmark, item: dict, output_dir: Path, file_format: str) -> dict:
+	"""
+	1つの項目のオペレーターを実行して、生成されたオブジェクトをファイルに書き出す。
+
+	Parameters
+	----------
+	addon : module
+		アドオンのモジュール。
+	benchmark : module
+		`clear_scene`を使うためのbenchmark.pyのモジュール。
+	item : dict
+		`expand_items`で作った項目。
+	output_dir : Path
+		書き出すディレクトリ。
+	file_format : str
+		`FORMAT_STL`か`FORMAT_BLEND`。
+
+	Returns
+	-------
+	dict
+		実行結果。
+	"""
+	result = {'index': item['index'], 'name': item['name'], 'operator': item['operator'], 'params': item['params']}
+	module_name, operator_name = item['operator'].split('.')
+	operator = getattr(getattr(bpy.ops, module_name), operator_name)
+
+	benchmark.clear_scene()
+	start = time.perf_counter()
+	try:
+		status = operator(**item['params'])
+	except Exception as e:
+		result['status'] = 'ERROR'
+		result['error'] = str(e).strip().splitlines()[-1] if str(e).strip() else repr(e)
+		return result
+	result['time_generate'] = time.perf_counter() - start
+
+	if 'FINISHED' not in status:
+		result['status'] = ', '.join(sorted(status))
+		return result
+
+	# シーンのオブジェクトはすべてこの項目で生成されたもの
+	objects = list(bpy.context.scene.objects)
+	start = time.perf_counter()
+	filepath = output_dir / f'{item["name"]}.{file_format}'
+	# 書き出しに失敗しても、ワーカーごと止めずにこの項目だけをエラーにする
+	try:
+		if file_format == FORMAT_STL:
+			result['triangles'] = addon.export_collection_as_stl.write_binary_stl(str(filepath), objects)
+		else:
+			bpy.data.libraries.write(str(filepath), set(objects), fake_user=True, compress=True)
+		size = filepath.stat().st_size
+	except Exception as e:
+		result['status'] = 'ERROR'
+		result['error'] = str(e).strip().splitlines()[-1] if str(e).strip() else repr(e)
+		return result
+	result['time_export'] = time.perf_counter() - start
+
+	result['status'] = 'FINISHED'
+	result['file'] = str(filepath)
+	result['size'] = size
+	return result
+
+
+
+
+
+def print_result(result: dict) -> None:
+	if result['status'] == 'FINISHED':
+		triangles = f'  tris={result["triangles"]}' if 'triangles' in result else ''
+		print(f'{result["name"]:<50} {result["time_generate"]:8.3f}s + {result["time_export"]:.3f}s  {result["size"] / 1024:9.1f} KB{triangles}', flush=True)
+	else:
+		print(f'{result["name"]:<50} {result["status"]} {result.get("error", "")}', flush=True)
+
+
+
+
+
+def run_items(addon, benchmark, items: list[dict], output_dir: Path, file_format: str) -> list[dict]:
+	"""
+	このプロセスで項目を順番に実行する。
+	"""
+	results = []
+	for item in items:
+		result = run_item(addon, benchmark, item, output_dir, file_format)
+		print_result(result)
+		results.append(result)
+	return results
+
+
+
+
+
+def get_worker_command(args: list[str]) -> list[str]:
+	"""
+	このスクリプトを別のBlenderプロセスで実行するためのコマンドを作る。
+	モジュール版のbpyで実行している場合は`bpy.app.binary_path`が空なので、同じPythonで実行する。
+	"""
+	if bpy.app.binary_path:
+		return [bpy.app.binary_path, '-b', '--factory-startup', '--python', str(Path(__file__).resolve()), '--'] + args
+	return [sys.executable, str(Path(__file__).resolve()), '--'] + args
+
+
+
+
+
+def run_workers(items: list[dict], output_dir: Path, file_format: str, workers: int) -> list[dict]:
+	"""
+	項目を`workers`個のBlenderプロセスに分けて並列に実行する。
+	重い項目が1つのプロセスに偏らないように、項目は順番に1つずつ各プロセスに配る。
+
+	Returns
+	-------
+	list[dict]
+		実行結果を項目の順番に並べたリスト。
+	"""
+	with tempfile.TemporaryDirectory() as work_dir:
+		processes = []
+		for i in range(workers):
+			chunk = items[i::workers]
+			if not chunk:
+				continue
+			items_path = Path(work_dir) / f'items_{i}.json'
+			results_path = Path(work_dir) / f'results_{i}.json'
+			items_path.write_text(json.dumps(chunk), encoding='utf-8')
+			command = get_worker_command(['--worker', str(items_path), '--worker-results', str(results_path), '-d', str(output_dir), '-f', file_format])
+			processes.append((subprocess.Popen(command), chunk, results_path))
+
+		results = []
+		for process, chunk, results_path in processes:
+			process.wait()
+			if results_path.exists():
+				results.extend(json.loads(results_path.read_text(encoding='utf-8')))
+			else:
+				# プロセスが途中で落ちた場合
+				results.extend({'index': item['index'], 'name': item['name'], 'operator': item['operator'], 'params': item['params'], 'status': 'ERROR', 'error': f'worker exited with code {process.returncode}'} for item in chunk)
+
+	results.sort(key=lambda result: result['index'])
+	return results
+
+
+
+
+
+
+
+
+
+
+def summarize(results: list[dict], wall_time: float) -> dict:
+	"""
+	全体とオペレーターごとの処理件数・時間・スループットを集計する。
+	"""
+	finished = [result for result in results if result['status'] == 'FINISHED']
+	operators = {}
+	for result in finished:
+		summary = operators.setdefault(result['operator'], {'items': 0, 'time_generate': 0.0, 'time_export': 0.0, 'bytes': 0})
+		summary['items'] += 1
+		summary['time_generate'] += result['time_generate']
+		summary['time_export'] += result['time_export']
+		summary['bytes'] += result['size']
+
+	return {
+		'items': len(results),
+		'finished': len(finished),
+		'failed': len(results) - len(finished),
+		'wall_time': wall_time,
+		'items_per_second': len(finished) / wall_time if wall_time > 0 else 0,
+		'time_generate': sum(result['time_generate'] for result in finished),
+		'time_export': sum(result['time_export'] for result in finished),
+		'bytes': sum(result['size'] for result in finished),
+		'operators': operators,
+	}
+
+
+
+
+
+def print_summary(summary: dict, workers: int) -> None:
+	print()
+	for operator, values in summary['operators'].items():
+		print(f'{operator:<50} {values["items"]:5d} items  {values["time_generate"] / values["items"]:8.3f}s/item  {values["bytes"] / 1024 / 1024:8.1f} MiB')
+	print(f'{summary["finished"]}/{summary["items"]} items in {summary["wall_time"]:.2f}s with {workers} worker(s): {summary["items_per_second"]:.2f} items/s')
+	print(f'generate {summary["time_generate"]:.2f}s, export {summary["time_export"]:.2f}s, {summary["bytes"] / 1024 / 1024:.1f} MiB written')
+	if summary['failed']:
+		print(f'{summary["failed"]} item(s) failed')
+
+
+
+
+
+
+
+
+
+
+def main(args: argparse.Namespace) -> int:
+	output_dir = Path(args.output_dir)
+	output_dir.mkdir(parents=True, exist_ok=True)
+
+	sys.path.insert(0, str(EXTRA_DIR))
+	import benchmark
+	addon = benchmark.load_addon()
+	# 生成時間を正しく集計するため、メッシュキャッシュは使わない
+	benchmark.disable_mesh_caches(addon)
+
+	# 別プロセスから呼ばれた場合は、渡された項目を実行して結果をファイルに書くだけ
+	if args.worker:
+		items = json.loads(Path(args.worker).read_text(encoding='utf-8'))
+		results = run_items(addon, benchmark, items, output_dir, args.format)
+		Path(args.worker_results).write_text(json.dumps(results), encoding='utf-8')
+		return 0
+
+	if args.table is None:
+		print('A parameter table (.json or .csv) is required')
+		return 2
+
+	try:
+		items = expand_items(addon, read_table(Path(args.table)))
+	except (ValueError, KeyError) as e:
+		print(f'Invalid parameter table: {e}')
+		return 2
+	workers = max(1, min(args.workers, len(items)))
+	print(f'{len(items)} items, {workers} worker(s), writing {args.format} files to {output_dir}', flush=True)
+
+	start = time.perf_counter()
+	if workers == 1:
+		results = run_items(addon, benchmark, items, output_dir, args.format)
+	else:
+		results = run_workers(items, output_dir, args.format, workers)
+	summary = summarize(results, time.perf_counter() - start)
+	print_summary(summary, workers)
+
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as f:
+			json.dump({'blender_version': bpy.app.version_string, 'workers': workers, 'format': args.format, 'summary': summary, 'results': results}, f, indent='\t', ensure_ascii=False)
+		print(f'Results written to {args.output}')
+
+	return 1 if summary['failed'] else 0
+
+
+
+
+
+
+
+
+
+
+if __name__ == "__main__":
+	# Blenderに渡された引数のうち、`--` 以降がこのスクリプトの引数
+	argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+	parser = argparse.ArgumentParser(prog='blender -b --factory-startup --python extra/batch_generate.py --', description="パラメーターの表に従って部品をまとめて生成し、STLまたは.blendファイルに書き出すスクリプト")
+	parser.add_argument('table', nargs='?', help="パラメーターの表（.jsonまたは.csv）")
+	parser.add_argument('-d', '--output-dir', default='batch_output', help="書き出すディレクトリ（デフォルト: batch_output）")
+	parser.add_argument('-f', '--format', choices=[FORMAT_STL, FORMAT_BLEND], default=FORMAT_STL, help="書き出す形式（デフォルト: stl）")
+	parser.add_argument('-w', '--workers', type=int, default=1, help="並列に実行するBlenderのプロセス数（デフォルト: 1）")
+	parser.add_argument('-o', '--output', help="項目ごとの結果と集計を書き出すJSONファイル")
+	parser.add_argument('--worker', help=argparse.SUPPRESS)
+	parser.add_argument('--worker-results', help=argparse.SUPPRESS)
+	args = parser.parse_args(argv)
+
+	sys.exit(main(args))
@@ -0,0 +1,478 @@
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import importlib.util
+from pathlib import Path
+
+import bpy
+
+# resource モジュールはWindowsには無い
+try:
+	import resource
+except ImportError:
+	resource = None
+
+
+
+
+
+# アドオンのディレクトリ（このスクリプトの一つ上）
+ADDON_DIR = Path(__file__).resolve().parent.parent
+
+# ベンチマーク対象にしないオペレーター。既存のオブジェクトに対して動作するもの。
+EXCLUDED_OPERATORS = {
+	'ROMLYADDON_OT_add_constant_offset_array_modifier',
+	'ROMLYADDON_OT_add_weight_bevel_modifier',
+}
+
+# オペレーターごとのパラメーターの組み合わせ。ここに無いオペレーターはデフォルト値だけで計測する。
+# キーはケース名、値はオペレーターに渡すプロパティ。
+PARAMETER_MATRIX = {
+	'ROMLYADDON_OT_add_reuleaux_polygon': {
+		'default': {},
+		'segments_64': {'val_segments': 64},
+		'pentagon_revolve': {'val_num_sides': 5, 'val_solidify': 'revolve', 'val_revolve_segments': 64},
+		'icosagon_revolve_128': {'val_num_sides': 20, 'val_segments': 128, 'val_solidify': 'revolve', 'val_revolve_segments': 128},
+	},
+	'ROMLYADDON_OT_add_reuleaux_tetrahedron': {
+		'default': {},
+		'uv_spheres': {'val_build_method': 'uv_shperes'},
+		'uv_spheres_96': {'val_build_method': 'uv_shperes', 'val_segments': 96},
+		'subdivisions_6': {'val_ico_subdivisions': 6},
+	},
+	'ROMLYADDON_OT_add_sphericon': {
+		'default': {},
+		'vertices_8': {'val_vertices': 8},
+		'segments_128': {'val_segments': 128},
+		'segments_256': {'val_segments': 256},
+	},
+	'ROMLYADDON_OT_add_oloid': {
+		'default': {},
+		'segments_128': {'val_segments': 128},
+		'segments_4096': {'val_segments': 4096},
+		'anti_oloid': {'val_type': 'anti-oloid'},
+	},
+	'ROMLYADDON_OT_add_clothoid_curve': {
+		'default': {},
+		'vertices_1024': {'val_num_vertices': 1024},
+		'adaptive': {'val_sampling': 'adaptive'},
+	},
+	'ROMLYADDON_OT_add_clothoid_corner_plate': {
+		'default': {},
+		'vertices_128': {'val_num_vertices': 128, 'val_num_arc_vertices': 128},
+		'adaptive': {'val_sampling': 'adaptive'},
+	},
+	'ROMLYADDON_OT_add_jis_screw': {
+		'default': {},
+		'm2': {'val_ms': 'm2'},
+		'm8_l40': {'val_ms': 'm8', 'val_length': 40},
+		'segments_64': {'val_segments': 64},
+	},
+	'ROMLYADDON_OT_add_jis_nut': {
+		'default': {},
+		'm2': {'val_ms': 'm2'},
+		'm8': {'val_ms': 'm8'},
+		'segments_64': {'val_segments': 64},
+	},
+	'ROMLYADDON_OT_add_aluminum_extrusion': {
+		'default': {},
+		'3090': {'val_size': '3090'},
+		'6090': {'val_size': '6090'},
+		'hole_segments_64': {'val_size': '3090', 'val_hole_segments': 64},
+		'6090_length_1000': {'val_size': '6090', 'val_length': 1000, 'val_hole_segments': 64},
+	},
+	'ROMLYADDON_OT_add_linear_guide_rail': {
+		'default': {},
+		'mgn15': {'val_spec': 'mgn15'},
+		'length_500': {'val_rail_length': 500},
+	},
+	'ROMLYADDON_OT_add_linear_guide_block': {
+		'default': {},
+		'hole_segments_64': {'val_hole_segments': 64},
+		'threaded': {'val_threading': True},
+	},
+	'ROMLYADDON_OT_add_coupling': {
+		'default': {},
+		'threaded': {'val_setscrew_thread': True},
+		'segments_128': {'val_segments': 128, 'val_slit_segments': 128},
+	},
+	'ROMLYADDON_OT_add_lead_nut': {
+		'default': {},
+		'segments_64': {'val_segments': 64, 'val_screw_holes_segments': 32},
+	},
+	'ROMLYADDON_OT_add_lead_screw': {
+		'default': {},
+		'length_200': {'val_length': 200},
+		'segments_64': {'val_segments': 64},
+	},
+	'ROMLYADDON_OT_add_compression_spring': {
+		'default': {},
+		'coils_30': {'val_length_specification': 'coils', 'val_coils': 30},
+		'segments_32': {'val_wire_segments': 32, 'val_outer_diameter_segments': 64},
+	},
+	'ROMLYADDON_OT_add_loadcell': {
+		'default': {},
+		'threaded': {'val_screw_hole_threaded': True, 'val_screw_hole_front_threaded': True, 'val_screw_hole_back_threaded': True},
+		'segments_64': {'val_hole_segments': 64, 'val_screw_hole_segments': 64},
+	},
+	'ROMLYADDON_OT_add_nut_hole': {
+		'default': {},
+		'large': {'val_nut_diameter': 10, 'val_screw_hole_diameter': 6.4},
+		'segments_64': {'val_screw_hole_segments': 64},
+	},
+}
+
+# 基準値から何倍遅くなったら退行とみなすか
+DEFAULT_THRESHOLD = 1.25
+
+# これより小さい時間差は計測誤差として無視する（秒）
+MIN_TIME_DIFFERENCE = 0.005
+
+
+
+
+
+
+
+
+
+
+def load_addon():
+	"""
+	アドオンをパッケージとして読み込んで登録する。
+
+	Returns
+	-------
+	module
+		読み込んだアドオンのモジュール。
+	"""
+	# romly_utils が romly_translation を直接 import しているので、アドオンのディレクトリもパスに追加する
+	sys.path.insert(0, str(ADDON_DIR))
+
+	package_name = ADDON_DIR.name if ADDON_DIR.name.isidentifier() else 'romly_blender_addon'
+	spec = importlib.util.spec_from_file_location(package_name, ADDON_DIR / '__init__.py', submodule_search_locations=[str(ADDON_DIR)])
+	addon = importlib.util.module_from_spec(spec)
+	sys.modules[package_name] = addon
+	spec.loader.exec_module(addon)
+	addon.register()
+	return addon
+
+
+
+
+
+def disable_mesh_caches(addon) -> None:
+	"""
+	メモリとディスクのメッシュキャッシュを両方とも使わないようにする。
+
+	キャッシュが効くと2回目以降の実行がキャッシュの読み出しだけになり、メッシュ生成の時間を計測できないため。
+
+	Parameters
+	----------
+	addon : module
+		`load_addon`で読み込んだアドオンのモジュール。
+	"""
+	addon.romly_utils.set_mesh_cache_limit(0)
+	addon.romly_utils.set_disk_mesh_cache_limit(0)
+
+
+
+
+
+
+
+
+
+
+def get_max_rss() -> int:
+	"""
+	プロセスの最大常駐メモリ量をバイト単位で取得する。取得できない環境では0を返す。
+	"""
+	if resource is None:
+		return 0
+
+	# Linuxではキロバイト、macOSではバイト単位
+	max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return max_rss if platform.system() == 'Darwin' else max_rss * 1024
+
+
+
+
+
+
+
+
+
+
+def clear_scene() -> None:
+	"""
+	シーンのオブジェクトと、使われなくなったメッシュなどのデータを削除する。
+	"""
+	for obj in list(bpy.data.objects):
+		bpy.data.objects.remove(obj, do_unlink=True)
+	for mesh in list(bpy.data.meshes):
+		bpy.data.meshes.remove(mesh)
+	for curve in list(bpy.data.curves):
+		bpy.data.curves.remove(curve)
+
+
+
+
+
+
+
+
+
+
+def collect_cases(addon, name_filter: str | None) -> list[tuple[str, type, str, dict]]:
+	"""
+	アドオンに登録されているメッシュ追加オペレーターと、パラメーターの組み合わせを列挙する。
+
+	Parameters
+	----------
+	addon : module
+		アドオンのモジュール。
+	name_filter : str | None
+		ケースIDにこの文字列を含むものだけを対象にする。
+
+	Returns
+	-------
+	list[tuple[str, type, str, dict]]
+		(ケースID, オペレーターのクラス, ケース名, プロパティ) のリスト。
+	"""
+	cases = []
+	for cls in addon.MY_CLASS_LIST:
+		if not cls.__name__.startswith('ROMLYADDON_OT_add_') or cls.__name__ in EXCLUDED_OPERATORS:
+			continue
+
+		for case_name, params in PARAMETER_MATRIX.get(cls.__name__, {'default': {}}).items():
+			case_id = f'{cls.bl_idname}:{case_name}'
+			if name_filter and name_filter not in case_id:
+				continue
+			cases.append((case_id, cls, case_name, params))
+	return cases
+
+
+
+
+
+
+
+
+
+
+def run_case(addon, cls: type, params: dict, repeat: int) -> dict:
+	"""
+	オペレーターを指定回数実行して、時間・メモリ・生成されたメッシュの頂点数と面数を計測する。
+
+	Parameters
+	----------
+	addon : module
+		アドオンのモジュール。
+	cls : type
+		オペレーターのクラス。
+	params : dict
+		オペレーターに渡すプロパティ。
+	repeat : int
+		時間を計測する実行回数。時間は最小値と中央値を記録する。
+		メモリと頂点数・面数は、これとは別にもう一度実行して計測する。
+
+	Returns
+	-------
+	dict
+		計測結果。
+	"""
+	module_name, operator_name = cls.bl_idname.split('.')
+	operator = getattr(getattr(bpy.ops, module_name), operator_name)
+
+	times = []
+	status = None
+	error = None
+	for _ in range(repeat):
+		clear_scene()
+		start = time.perf_counter()
+		try:
+			status = ', '.join(sorted(operator(**params)))
+		except Exception as e:
+			status = 'ERROR'
+			error = str(e).strip().splitlines()[-1] if str(e).strip() else repr(e)
+			break
+		times.append(time.perf_counter() - start)
+
+	# プロファイリングが有効なら、最後に時間を計測した実行の処理段階ごとの内訳を記録する
+	profiler = addon.romly_utils.PROFILER
+	profile = profiler.last_result if profiler.enabled else None
+
+	# tracemallocは実行を遅くするので、メモリは時間とは別にもう一度実行して計測する
+	peak_python_memory = 0
+	vertices = faces = None
+	if status != 'ERROR':
+		clear_scene()
+		tracemalloc.start()
+		operator(**params)
+		peak_python_memory = tracemalloc.get_traced_memory()[1]
+		tracemalloc.stop()
+
+		# 生成されたオブジェクトのメッシュを数える（カーブの場合はメッシュに変換して数える）
+		obj = bpy.context.view_layer.objects.active
+		if obj is not None:
+			evaluated = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+			mesh = evaluated.to_mesh()
+			if mesh is not None:
+				vertices, faces = len(mesh.vertices), len(mesh.polygons)
+			evaluated.to_mesh_clear()
+
+	clear_scene()
+
+	result = {
+		'operator': cls.bl_idname,
+		'params': params,
+		'status': status,
+		'vertices': vertices,
+		'faces': faces,
+		'peak_python_memory': peak_python_memory,
+		'max_rss': get_max_rss(),
+	}
+	if times:
+		times.sort()
+		result['time_min'] = times[0]
+		result['time_median'] = times[len(times) // 2]
+	if error:
+		result['error'] = error
+	if profile is not None:
+		result['profile'] = profile
+	return result
+
+
+
+
+
+
+
+
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float) -> list[str]:
+	"""
+	計測結果を基準値と比較して、問題のあったケースの説明のリストを返す。
+
+	Parameters
+	----------
+	results : dict
+		今回の計測結果。
+	baseline : dict
+		基準となる計測結果。
+	threshold : float
+		基準値の何倍の時間がかかったら退行とみなすか。
+
+	Returns
+	-------
+	list[str]
+		退行や変化のあったケースの説明。空なら問題なし。
+	"""
+	problems = []
+	for case_id, result in results.items():
+		base = baseline.get(case_id)
+		if base is None:
+			continue
+
+		if result['status'] != base['status']:
+			problems.append(f'{case_id}: status {base["status"]} -> {result["status"]}')
+			continue
+
+		if (result['vertices'], result['faces']) != (base['vertices'], base['faces']):
+			problems.append(f'{case_id}: mesh changed, vertices {base["vertices"]} -> {result["vertices"]}, faces {base["faces"]} -> {result["faces"]}')
+
+		if 'time_min' in result and 'time_min' in base:
+			old_time, new_time = base['time_min'], result['time_min']
+			if new_time > old_time * threshold and new_time - old_time > MIN_TIME_DIFFERENCE:
+				problems.append(f'{case_id}: slower {old_time:.4f}s -> {new_time:.4f}s (x{new_time / old_time:.2f})')
+
+	for case_id in baseline:
+		if case_id not in results:
+			problems.append(f'{case_id}: missing from this run')
+
+	return problems
+
+
+
+
+
+
+
+
+
+
+def main(args: argparse.Namespace) -> int:
+	addon = load_addon()
+	# 同じ実行内のメモリキャッシュや以前の実行で保存されたディスクキャッシュが使われると計測結果が変わってしまうので、どちらも使わない
+	disable_mesh_caches(addon)
+	if args.profile:
+		addon.romly_utils.enable_profiling()
+	cases = collect_cases(addon, args.filter)
+
+	results = {}
+	for case_id, cls, case_name, params in cases:
+		result = run_case(addon, cls, params, args.repeat)
+		results[case_id] = result
+		if 'time_min' in result:
+			print(f'{case_id:<60} {result["time_min"]:9.4f}s  v={result["vertices"]} f={result["faces"]}  py_peak={result["peak_python_memory"] / 1024 / 1024:.1f}MiB', flush=True)
+		else:
+			print(f'{case_id:<60} {result["status"]} {result.get("error", "")}', flush=True)
+
+	output = {
+		'blender_version': bpy.app.version_string,
+		'addon_version': list(addon.bl_info['version']),
+		'python_version': platform.python_version(),
+		'platform': platform.platform(),
+		'repeat': args.repeat,
+		'results': results,
+	}
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as f:
+			json.dump(output, f, indent='\t', ensure_ascii=False)
+		print(f'Results written to {args.output}')
+
+	if args.baseline:
+		with open(args.baseline, encoding='utf-8') as f:
+			baseline = json.load(f)['results']
+		if args.filter:
+			baseline = {case_id: value for case_id, value in baseline.items() if args.filter in case_id}
+
+		problems = compare_with_baseline(results, baseline, args.threshold)
+		if problems:
+			print(f'{len(problems)} regression(s) against {args.baseline}:')
+			for problem in problems:
+				print('  ' + problem)
+			return 1
+		print(f'No regressions against {args.baseline}')
+
+	failures = [case_id for case_id, result in results.items() if result['status'] == 'ERROR']
+	return 1 if failures else 0
+
+
+
+
+
+
+
+
+
+
+if __name__ == "__main__":
+	# Blenderに渡された引数のうち、`--` 以降がこのスクリプトの引数
+	argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+	parser = argparse.ArgumentParser(prog='blender -b --factory-startup --python extra/benchmark.py --', description="アドオンのメッシュ追加オペレーターの実行時間を計測するスクリプト")
+	parser.add_argument('-o', '--output', help="計測結果を書き出すJSONファイル")
+	parser.add_argument('-b', '--baseline', help="比較する基準のJSONファイル。退行があれば終了コード1で終了する")
+	parser.add_argument('-r', '--repeat', type=int, default=3, help="ケースごとの実行回数（デフォルト: 3）")
+	parser.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD, help=f"基準値の何倍遅くなったら退行とみなすか（デフォルト: {DEFAULT_THRESHOLD}）")
+	parser.add_argument('-p', '--profile', action='store_true', help="処理段階ごとの時間の内訳も記録する")
+	parser.add_argument('-k', '--filter', help="ケースIDにこの文字列を含むものだけを計測する")
+	args = parser.parse_args(argv)
+
+	sys.exit(main(args))
@@ -0,0 +1,226 @@
+import sys
+import math
+import json
+import time
+import argparse
+from decimal import Decimal, getcontext
+from pathlib import Path
+
+import numpy as np
+
+
+
+
+
+# このスクリプトのディレクトリ（benchmark.pyの`load_addon`を使う）
+EXTRA_DIR = Path(__file__).resolve().parent
+
+# フレネル積分の誤差の許容値。これを超えたら終了コード1で終了する
+FRESNEL_TOLERANCE = 1e-13
+
+# 誤差を調べるフレネル積分の引数の範囲と数
+FRESNEL_TEST_RANGE = 10.0
+FRESNEL_TEST_POINTS = 401
+
+# 円周率（Decimalでの参照値の計算用）
+PI_DIGITS = '3.14159265358979323846264338327950288419716939937510582097494459230781640628620899862803482534211706798214808651328230664709384460955058223172535940812848111745028410270193852110555964462294895493038196'
+
+
+
+
+
+
+
+
+
+
+def legacy_euler_spiral(a: float, t: float) -> tuple[float, float]:
+	"""
+	以前の`create_clothoid_curve_vertices`で使っていた、刻み幅0.01の積分でクロソイド曲線の座標を求める関数。比較用。
+	"""
+	x = 0
+	y = 0
+	dt = 0.01
+	for i in range(int(t / dt)):
+		angle = 0.5 * a * dt * dt * (i ** 2)
+		x += math.cos(angle) * dt
+		y += math.sin(angle) * dt
+	return x, y
+
+
+
+
+
+def reference_fresnel(z: float) -> tuple[float, float]:
+	"""
+	フレネル積分C(z), S(z)の参照値を、桁数を十分に増やしたDecimalでべき級数を計算して求める。
+	べき級数は大きなzで桁落ちするので、その分だけ桁数を増やしている。
+	"""
+	getcontext().prec = 50 + int(math.pi * z * z / 2 / math.log(10))
+	pi = Decimal(PI_DIGITS)
+	z = Decimal(repr(z))
+	fact = pi / 2 * z * z
+	term = z
+	c = z
+	s = Decimal(0)
+	k = 1
+	while True:
+		term = term * fact / k
+		sign = -1 if (k // 2) % 2 else 1
+		if k % 2 == 0:
+			c += sign * term / (2 * k + 1)
+		else:
+			s += sign * term / (2 * k + 1)
+		if k > fact and abs(term) < Decimal('1e-40'):
+			break
+		k += 1
+	return float(c), float(s)
+
+
+
+
+
+def reference_euler_spiral(a: float, t: float) -> tuple[float, float]:
+	"""
+	`reference_fresnel`を使った、クロソイド曲線の座標の参照値。
+	"""
+	scale = math.sqrt(math.pi / a)
+	c, s = reference_fresnel(t / scale)
+	return scale * c, scale * s
+
+
+
+
+
+
+
+
+
+
+def check_fresnel(clothoid) -> float:
+	"""
+	`fresnel_integrals`の結果と参照値の差の最大値を求める。
+	"""
+	z = np.linspace(-FRESNEL_TEST_RANGE, FRESNEL_TEST_RANGE, FRESNEL_TEST_POINTS)
+	c, s = clothoid.fresnel_integrals(z)
+	error = 0.0
+	for i, value in enumerate(z.tolist()):
+		ref_c, ref_s = reference_fresnel(value)
+		error = max(error, abs(c[i] - ref_c), abs(s[i] - ref_s))
+	return error
+
+
+
+
+
+def measure_deviation(clothoid, a: float, t_values: np.ndarray, samples: int = 32) -> float:
+	"""
+	頂点を結んだ辺（弦）と、その区間のクロソイド曲線との距離の最大値を求める。
+	"""
+	deviation = 0.0
+	for t0, t1 in zip(t_values[:-1].tolist(), t_values[1:].tolist()):
+		xs, ys = clothoid.euler_spiral(a, np.linspace(t0, t1, samples))
+		dx, dy = xs[-1] - xs[0], ys[-1] - ys[0]
+		length = math.hypot(dx, dy)
+		if length > 0:
+			deviation = max(deviation, float(np.max(np.abs((xs - xs[0]) * dy - (ys - ys[0]) * dx))) / length)
+	return deviation
+
+
+
+
+
+def main(args: argparse.Namespace) -> int:
+	sys.path.insert(0, str(EXTRA_DIR))
+	import benchmark
+	addon = benchmark.load_addon()
+	clothoid = addon.add_clothoid_curve
+
+	a = args.clothoid_param
+	t_max = args.curve_length ** 2 / (a ** 2 * math.pi)
+	t_values = [i * t_max / args.vertices for i in range(args.vertices + 1)]
+
+	# 精度
+	fresnel_error = check_fresnel(clothoid)
+	vertices = clothoid.create_clothoid_curve_vertices(a, args.curve_length, args.vertices).vertices
+	legacy_vertices = [legacy_euler_spiral(a, t) for t in t_values]
+	reference_vertices = [reference_euler_spiral(a, t) for t in t_values]
+	error = max(math.dist(v[:2], r) for v, r in zip(vertices, reference_vertices))
+	legacy_error = max(math.dist(v, r) for v, r in zip(legacy_vertices, reference_vertices))
+
+	# 時間
+	times = []
+	legacy_times = []
+	for _ in range(args.repeat):
+		start = time.perf_counter()
+		clothoid.create_clothoid_curve_vertices(a, args.curve_length, args.vertices)
+		times.append(time.perf_counter() - start)
+
+		start = time.perf_counter()
+		for t in t_values:
+			legacy_euler_spiral(a, t)
+		legacy_times.append(time.perf_counter() - start)
+
+	# 適応サンプリング。同じ頂点数で等間隔に配置した場合とずれを比べる
+	adaptive_t_values, _ = clothoid.calc_adaptive_t_values(a, t_max, args.max_deviation)
+	num_adaptive = len(adaptive_t_values) - 1
+	adaptive_deviation = measure_deviation(clothoid, a, adaptive_t_values)
+	uniform_deviation = measure_deviation(clothoid, a, np.linspace(0, t_max, num_adaptive + 1))
+
+	corner_times = []
+	for _ in range(args.repeat):
+		start = time.perf_counter()
+		clothoid.create_clothoid_corner_rectangle(clothoid_param_A=a, curve_length=args.curve_length, num_curve_vertices=args.vertices, num_arc_vertices=args.vertices, rectangle_width=20, rectangle_height=20)
+		corner_times.append(time.perf_counter() - start)
+
+	result = {
+		'vertices': args.vertices,
+		'clothoid_param': a,
+		'curve_length': args.curve_length,
+		'fresnel_error': fresnel_error,
+		'error': error,
+		'legacy_error': legacy_error,
+		'time': min(times),
+		'legacy_time': min(legacy_times),
+		'corner_rectangle_time': min(corner_times),
+		'max_deviation': args.max_deviation,
+		'adaptive_vertices': num_adaptive,
+		'adaptive_deviation': adaptive_deviation,
+		'uniform_deviation': uniform_deviation,
+	}
+	print(f'fresnel_integrals max error  {fresnel_error:.3e} (|z| <= {FRESNEL_TEST_RANGE})')
+	print(f'vertex max error             {error:.3e} (legacy integrator {legacy_error:.3e})')
+	print(f'{args.vertices} vertices         {result["time"]:9.4f}s (legacy {result["legacy_time"]:.4f}s, x{result["legacy_time"] / result["time"]:.0f})')
+	print(f'corner rectangle             {result["corner_rectangle_time"]:9.4f}s')
+	print(f'adaptive sampling            {num_adaptive} segments, deviation {adaptive_deviation:.3e} (max {args.max_deviation:.3e}, uniform {uniform_deviation:.3e})')
+
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as f:
+			json.dump(result, f, indent='\t')
+		print(f'Results written to {args.output}')
+
+	return 0 if fresnel_error <= FRESNEL_TOLERANCE and error <= FRESNEL_TOLERANCE * args.curve_length else 1
+
+
+
+
+
+
+
+
+
+
+if __name__ == "__main__":
+	# Blenderに渡された引数のうち、`--` 以降がこのスクリプトの引数
+	argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+	parser = argparse.ArgumentParser(prog='blender -b --factory-startup --python extra/benchmark_clothoid.py --', description="クロソイド曲線の頂点の計算時間と精度を、以前の積分による計算と比較するスクリプト")
+	parser.add_argument('-n', '--vertices', type=int, default=2048, help="頂点数（デフォルト: 2048）")
+	parser.add_argument('-a', '--clothoid-param', type=float, default=1.0, help="クロソイドパラメーター（デフォルト: 1.0）")
+	parser.add_argument('-l', '--curve-length', type=float, default=10.0, help="曲線長（デフォルト: 10.0）")
+	parser.add_argument('-d', '--max-deviation', type=float, default=0.001, help="適応サンプリングで許容するずれ（デフォルト: 0.001）")
+	parser.add_argument('-r', '--repeat', type=int, default=3, help="実行回数（デフォルト: 3）")
+	parser.add_argument('-o', '--output', help="計測結果を書き出すJSONファイル")
+	args = parser.parse_args(argv)
+
+	sys.exit(main(args))
@@ -0,0 +1,152 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+# 並列書き込みのプロセスはspawnで作られ、このスクリプトも`__mp_main__`として読み込まれる。
+# 別プロセスにはbpyが無いので、bpyとアドオンは関数の中で読み込むこと。
+
+
+
+
+
+# このスクリプトのディレクトリ（benchmark.pyの`load_addon`を使う）
+EXTRA_DIR = Path(__file__).resolve().parent
+
+
+
+
+
+
+
+
+
+
+def build_scene(num_collections: int, segments: int) -> list:
+	"""
+	UV球を1つずつ含むコレクションをシーン直下に作る。
+
+	Parameters
+	----------
+	num_collections : int
+		作るコレクションの数。
+	segments : int
+		UV球の分割数。リングの数はその半分。
+
+	Returns
+	-------
+	list
+		(コレクション名, オブジェクトのリスト)のリスト。
+	"""
+	import bpy
+
+	for obj in list(bpy.data.objects):
+		bpy.data.objects.remove(obj, do_unlink=True)
+	for collection in list(bpy.data.collections):
+		bpy.data.collections.remove(collection)
+
+	scene = bpy.context.scene
+	collections = []
+	for i in range(num_collections):
+		collection = bpy.data.collections.new(f'Part {i:03d}')
+		scene.collection.children.link(collection)
+		bpy.ops.mesh.primitive_uv_sphere_add(segments=segments, ring_count=segments // 2, location=(i * 3.0, 0, 0))
+		obj = bpy.context.active_object
+		for users_collection in obj.users_collection:
+			users_collection.objects.unlink(obj)
+		collection.objects.link(obj)
+		collections.append((collection.name, [obj]))
+	return collections
+
+
+
+
+
+
+
+
+
+
+def main(args: argparse.Namespace) -> int:
+	import bpy
+
+	sys.path.insert(0, str(EXTRA_DIR))
+	import benchmark
+	addon = benchmark.load_addon()
+	exporter = addon.export_collection_as_stl
+
+	collections = build_scene(args.collections, args.segments)
+	depsgraph = bpy.context.evaluated_depsgraph_get()
+
+	with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as parallel_dir:
+		serial_jobs = [(os.path.join(serial_dir, f'{name}.stl'), objects) for name, objects in collections]
+		parallel_jobs = [(os.path.join(parallel_dir, f'{name}.stl'), objects) for name, objects in collections]
+
+		serial_times = []
+		parallel_times = []
+		for _ in range(args.repeat):
+			start = time.perf_counter()
+			for filepath, objects in serial_jobs:
+				exporter.write_binary_stl(filepath, objects, depsgraph=depsgraph)
+			serial_times.append(time.perf_counter() - start)
+
+			start = time.perf_counter()
+			exporter.write_binary_stl_files_parallel(parallel_jobs, depsgraph=depsgraph, max_workers=args.workers)
+			parallel_times.append(time.perf_counter() - start)
+
+		# 直列と並列で同じファイルが書かれていることを確認する
+		identical = all(Path(a).read_bytes() == Path(b).read_bytes() for (a, _), (b, _) in zip(serial_jobs, parallel_jobs))
+		total_bytes = sum(os.path.getsize(filepath) for filepath, _ in serial_jobs)
+
+	result = {
+		'blender_version': bpy.app.version_string,
+		'cpu_count': os.cpu_count(),
+		'workers': args.workers or os.cpu_count(),
+		'collections': args.collections,
+		'segments': args.segments,
+		'total_bytes': total_bytes,
+		'serial_min': min(serial_times),
+		'serial_median': statistics.median(serial_times),
+		'parallel_min': min(parallel_times),
+		'parallel_median': statistics.median(parallel_times),
+		'identical': identical,
+	}
+	print(f'{args.collections} collections, {total_bytes / 1024 / 1024:.1f} MiB')
+	print(f'serial   {result["serial_min"]:8.3f}s (median {result["serial_median"]:.3f}s)')
+	print(f'parallel {result["parallel_min"]:8.3f}s (median {result["parallel_median"]:.3f}s, {result["workers"]} workers)')
+	print(f'speedup  {result["serial_min"] / result["parallel_min"]:8.2f}x')
+	print(f'identical output: {identical}')
+
+	if args.output:
+		with open(args.output, 'w', encoding='utf-8') as f:
+			json.dump(result, f, indent='\t')
+		print(f'Results written to {args.output}')
+
+	return 0 if identical else 1
+
+
+
+
+
+
+
+
+
+
+if __name__ == "__main__":
+	# Blenderに渡された引数のうち、`--` 以降がこのスクリプトの引数
+	argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+	parser = argparse.ArgumentParser(prog='blender -b --factory-startup --python extra/benchmark_stl_export.py --', description="バイナリSTLの直列と並列での書き込み時間を比較するスクリプト")
+	parser.add_argument('-n', '--collections', type=int, default=50, help="コレクションの数（デフォルト: 50）")
+	parser.add_argument('-s', '--segments', type=int, default=256, help="各コレクションのUV球の分割数（デフォルト: 256）")
+	parser.add_argument('-r', '--repeat', type=int, default=3, help="実行回数（デフォルト: 3）")
+	parser.add_argument('-w', '--workers', type=int, help="並列書き込みのプロセス数（デフォルト: CPUのコア数）")
+	parser.add_argument('-o', '--output', help="計測結果を書き出すJSONファイル")
+	args = parser.parse_args(argv)
+
+	sys.exit(main(args))
@@ -145,6 +145,16 @@ TRANSLATION_DICT = {
 		('*', 'Thickness'): '厚み',
 		('*', 'Curve Vertices'): '曲線の頂点数',
 		('*', 'Arc Vertices'): '円弧の頂点数',
+		('*', 'Sampling'): '頂点の配置',
+		('*', 'Uniform'): '等間隔',
+		('*', 'Adaptive'): '曲率に応じて',
+		('*', 'Place the specified number of vertices at equal intervals along the curve.'): '指定された数の頂点を曲線に沿って等間隔に配置します。',
+		('*', 'Place vertices according to the curvature so that the edges deviate from the curve by no more than the tolerance.'):
+			'辺と曲線のずれが許容値以下になるよう、曲率に応じて頂点を配置します。',
+		('*', 'Max Deviation'): '許容するずれ',
+		('*', 'Maximum distance between the edges and the curve'): '辺と曲線の距離の最大値',
+		('*', 'The number of vertices reached the limit of {limit}, so the edges deviate from the curve by more than Max Deviation'):
+			'頂点数が上限の{limit}に達したため、辺と曲線のずれが許容値を超えています',
 		('*', 'Angle of Circular Arc'): '円弧の角度',
 		('*', 'Total width(height) of rounded corner'): '角丸部全体の幅（高さ）',
 		('*', 'Clothoid Curve'): 'クロソイド曲線',
@@ -611,10 +621,28 @@ TRANSLATION_DICT = {
 		('*', 'Export all meshes in this collection as an STL file. The sub collections that were excluded from the layer view will be excluded.'): 'このコレクションのすべてのメッシュをSTLファイルとして出力します。レイヤビューから除外されたブコレクションは含まれません',
 		('*', 'Please save the active file first'): '先に編集中のファイルを保存して下さい',
 		('*', 'The collection {collection} is exported to: {filename}'): 'コレクション {collection} を {filename} にエクスポートしました',
+		('*', 'Export All Collections as STL'): 'すべてのコレクションをSTLファイルとしてエクスポート',
+		('*', 'Binary'): 'バイナリ',
+		('*', 'Parallel'): '並列処理',
+		('*', 'Incremental'): '差分のみ',
+		('*', 'Skip the collections whose geometry has not changed since the last export. The fingerprints are saved next to the .blend file'): '前回のエクスポートから形状が変わっていないコレクションは出力しません。判定用のフィンガープリントはblendファイルと同じフォルダに保存されます',
+		('*', 'The collection {collection} is unchanged: {filename}'): 'コレクション {collection} は変更されていません: {filename}',
+		('*', '{count} collections were exported, {skipped} unchanged collections were skipped ({size} KB, {time} s)'): '{count}個のコレクションをエクスポートし、変更されていない{skipped}個のコレクションをスキップしました ({size} KB, {time} 秒)',
+		('*', 'Write the binary STL files in multiple processes. Effective when there are many large collections'): 'バイナリSTLファイルを複数のプロセスで並列に書き込みます。大きなコレクションがたくさんある場合に効果があります',
+		('*', 'Write a binary STL file instead of an ASCII one. Binary files are much smaller and faster to write'): 'ASCIIではなくバイナリ形式のSTLファイルを出力します。ファイルが小さくなり、書き込みも速くなります',
+		('*', 'Export each top-level collection that is not excluded from the view layer as a separate STL file'): 'レイヤービューから除外されていないシーン直下のコレクションを、それぞれ別のSTLファイルとして出力します',
+		('*', '{collection}: {filename} ({size} KB, {time} s)'): '{collection}: {filename} ({size} KB, {time} 秒)',
+		('*', 'Failed to export the collection {collection}'): 'コレクション {collection} のエクスポートに失敗しました',
+		('*', '{count} collections were exported ({size} KB, {time} s)'): '{count}個のコレクションをエクスポートしました ({size} KB, {time} 秒)',
 		('*', 'Export Selection as STL'): '選択項目をSTLファイルとしてエクスポート',
 		('*', 'Export the selected objects as an STL file'): '選択されたオブジェクトをSTLファイルとしてエクスポートします',
 		('*', 'The selection is exported to: {filename}'): '選択されているオブジェクトを {filename} にエクスポートしました',
 
+		# Clear Mesh Cache
+		('*', 'Clear Mesh Cache'): 'メッシュキャッシュを削除',
+		('*', 'Delete all cached meshes of the generated parts from memory and disk'): '生成した部品のメッシュキャッシュをメモリとディスクからすべて削除します',
+		('*', '{count} cached meshes were deleted'): '{count}個のキャッシュされたメッシュを削除しました',
+
 		# Mil Size Panel
 		('*', 'Mil Size'): 'Milサイズ',
 		('*', 'Toggle Unit mm/mil(thou)'): 'mm/mil(thou) 単位切替',
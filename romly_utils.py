@@ -1,10 +1,24 @@
 import bpy
 import bmesh
 import mathutils
+import mathutils.geometry
+import mathutils.kdtree
 import math
+import os
+import sys
+import time
+import mmap
+import struct
+import hashlib
+import functools
+import numpy as np
+from contextlib import contextmanager
+from collections import OrderedDict
+from datetime import datetime
 from mathutils import Vector, Matrix
 from typing import Literal, NamedTuple
 from collections.abc import Callable
+from itertools import chain
 
 
 
@@ -31,6 +45,234 @@ ALIGN_PLANE_ITEMS = [
 	('view', 'View Plane', 'Cunstructs a curve on the View Plane'),
 ]
 
+
+
+
+
+
+
+
+
+
+# MARK: Legacy Flags
+def legacy_flag(name: str) -> bool:
+	"""
+	比較用に以前の構築方法を使うかどうかを、環境変数`ROMLY_{name}`から調べる。値が1の場合だけTrueになる。
+	呼ばれるたびに環境変数を読むので、実行中に`os.environ`を書き換えればアドオンを再読み込みしなくても切り替わる。
+
+	Parameters
+	----------
+	name : str
+		`ROMLY_`を除いた環境変数名。例えば`'OLOID_LEGACY_BUILDER'`。
+
+	Returns
+	-------
+	bool
+		以前の構築方法を使う場合はTrue。
+	"""
+	return os.environ.get(f'ROMLY_{name}', '0') == '1'
+
+
+
+
+
+
+
+
+
+
+# MARK: Profiling
+class Profiler:
+	"""
+	オペレーターの処理段階（ブーリアン、メッシュのクリーンアップなど）ごとの実行時間と回数を集計する。
+	無効の時は`profile_stage`などがほとんど何もしないので、常に呼び出しておいて構わない。
+
+	環境変数`ROMLY_PROFILE`を`1`にしてBlenderを起動するか、実行中に`enable_profiling`を呼ぶと有効になる。
+	環境変数`ROMLY_PROFILE_LOG`、または`enable_profiling`の引数でファイルを指定すると、集計結果をそのファイルにも追記する。
+	"""
+	def __init__(self):
+		self.enabled = os.environ.get('ROMLY_PROFILE', '0') not in ('', '0')
+		self.log_path = os.environ.get('ROMLY_PROFILE_LOG') or None
+		# 段階名 -> [回数, 合計時間（秒）]
+		self.stages: dict[str, list] = {}
+		# カウンター名 -> 回数
+		self.counters: dict[str, int] = {}
+		# 実行中の段階名。同じ段階が入れ子になった場合に二重に数えないようにする。
+		self.active_stages: list[str] = []
+		# 最後に集計したオペレーターの結果
+		self.last_result: dict = None
+
+
+
+	def reset(self) -> None:
+		self.stages.clear()
+		self.counters.clear()
+		self.active_stages.clear()
+
+
+
+	def add_time(self, name: str, seconds: float) -> None:
+		stage = self.stages.setdefault(name, [0, 0.0])
+		stage[0] += 1
+		stage[1] += seconds
+
+
+
+	def count(self, name: str, amount: int = 1) -> None:
+		self.counters[name] = self.counters.get(name, 0) + amount
+
+
+
+	def make_result(self, operator_name: str, total: float) -> dict:
+		"""
+		集計結果を辞書にまとめる。段階は時間の長い順に並べる。
+		"""
+		return {
+			'operator': operator_name,
+			'total': total,
+			'stages': {name: {'count': count, 'time': seconds} for name, (count, seconds) in sorted(self.stages.items(), key=lambda item: -item[1][1])},
+			'counters': dict(sorted(self.counters.items())),
+		}
+
+
+
+	def format_result(self, result: dict) -> str:
+		"""
+		集計結果を1行の文字列にする。段階の時間は入れ子になった他の段階の時間を含む。
+		"""
+		total = result['total']
+		stages = ', '.join(f'{name} {stage["count"]}x {stage["time"] * 1000:.1f}ms ({stage["time"] / total * 100 if total > 0 else 0:.0f}%)' for name, stage in result['stages'].items())
+		counters = ', '.join(f'{name} {count}' for name, count in result['counters'].items())
+		return f'{result["operator"]} {total * 1000:.1f}ms: {stages or "-"} | {counters or "-"}'
+
+
+
+PROFILER = Profiler()
+
+
+
+
+
+def enable_profiling(log_path: str = None) -> None:
+	"""
+	プロファイリングを有効にする。Blenderのコンソールから呼び出すことを想定している。
+
+	Parameters
+	----------
+	log_path : str, optional
+		集計結果を追記するファイルのパス。省略した場合はInfoレポートにだけ表示する。
+	"""
+	PROFILER.enabled = True
+	PROFILER.log_path = log_path
+
+
+
+
+
+def disable_profiling() -> None:
+	"""
+	プロファイリングを無効にする。
+	"""
+	PROFILER.enabled = False
+
+
+
+
+
+@contextmanager
+def profile_stage(name: str):
+	"""
+	withブロックの実行時間を、指定した段階名で集計するコンテキストマネージャー。
+	同じ名前の段階の中で入れ子になった場合は、外側の段階だけを数える。
+
+	Parameters
+	----------
+	name : str
+		段階名。
+	"""
+	if not PROFILER.enabled or name in PROFILER.active_stages:
+		yield
+		return
+
+	PROFILER.active_stages.append(name)
+	start = time.perf_counter()
+	try:
+		yield
+	finally:
+		PROFILER.add_time(name, time.perf_counter() - start)
+		PROFILER.active_stages.remove(name)
+
+
+
+
+
+def count_event(name: str, amount: int = 1) -> None:
+	"""
+	bmeshの読み書きやモードの切り替えなど、時間ではなく回数を数えたい処理を数える。
+
+	Parameters
+	----------
+	name : str
+		カウンター名。
+	amount : int, optional
+		加算する回数。
+	"""
+	if PROFILER.enabled:
+		PROFILER.count(name, amount)
+
+
+
+
+
+def set_mode(mode: Literal['OBJECT', 'EDIT']) -> None:
+	"""
+	`bpy.ops.object.mode_set`でモードを切り替える。切り替えの回数をプロファイラーで数える。
+
+	Parameters
+	----------
+	mode : Literal['OBJECT', 'EDIT']
+		切り替えるモード。
+	"""
+	count_event('mode_set')
+	with profile_stage('mode_set'):
+		bpy.ops.object.mode_set(mode=mode)
+
+
+
+
+
+def profile_execute(execute: Callable) -> Callable:
+	"""
+	オペレーターの`execute`メソッドに付けるデコレーター。
+	プロファイリングが有効な場合、`execute`の処理段階ごとの内訳をInfoレポートに表示し、ログファイルが指定されていれば追記する。
+	"""
+	@functools.wraps(execute)
+	def wrapper(self, context):
+		if not PROFILER.enabled:
+			return execute(self, context)
+
+		PROFILER.reset()
+		start = time.perf_counter()
+		try:
+			return execute(self, context)
+		finally:
+			result = PROFILER.make_result(self.bl_idname, time.perf_counter() - start)
+			PROFILER.last_result = result
+			line = PROFILER.format_result(result)
+			self.report({'INFO'}, line)
+			if PROFILER.log_path:
+				with open(PROFILER.log_path, 'a', encoding='utf-8') as f:
+					f.write(f'{datetime.now().isoformat(timespec="seconds")} {line}\n')
+	return wrapper
+
+
+
+
+
+
+
+
+
 def set_object_rotation_to_plane(obj: bpy.types.Object, plane: Literal['xy', 'xz', 'yz', 'view']) -> None:
 	"""
 	指定された平面に沿ってオブジェクトの回転を設定する。オブジェクトをディフォルトでxy平面上に展開されている図形として、指定された平面に展開されるよう回転する。
@@ -293,21 +535,120 @@ def make_arc_vertices_from_start_to_end(center: Vector, start: Vector, end: Vect
 
 
 
-def create_object(vertices: list[tuple[float, float, float]], faces: list = [], name: str = '', mesh_name: str = None, edges: list[tuple[int, int]] = []) -> bpy.types.Object:
+def make_mesh_buffers(faces: list | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	面のリストを、`foreach_set`でメッシュに渡せるループとポリゴンのバッファに変換する。
+
+	Parameters
+	----------
+	faces : list | np.ndarray
+		面を構成する頂点のインデックスのリスト。すべての面の頂点数が同じなら(F, k)の配列でもよい。
+
+	Returns
+	-------
+	tuple[np.ndarray, np.ndarray]
+		各ループの頂点インデックスの配列と、各ポリゴンの最初のループのインデックスの配列。どちらもint32。
+	"""
+	if isinstance(faces, np.ndarray):
+		faces = faces.reshape(len(faces), -1)
+		loop_vertex_indices = np.ascontiguousarray(faces, dtype=np.int32).ravel()
+		loop_starts = np.arange(len(faces), dtype=np.int32) * faces.shape[1]
+		return loop_vertex_indices, loop_starts
+
+	face_lengths = np.fromiter((len(f) for f in faces), dtype=np.int32, count=len(faces))
+	loop_vertex_indices = np.fromiter(chain.from_iterable(faces), dtype=np.int32, count=int(face_lengths.sum()))
+	loop_starts = np.zeros(len(faces), dtype=np.int32)
+	np.cumsum(face_lengths[:-1], out=loop_starts[1:])
+	return loop_vertex_indices, loop_starts
+
+
+
+
+
+
+
+
+
+
+def create_object_from_buffers(coords: np.ndarray, loop_vertex_indices: np.ndarray, loop_starts: np.ndarray, name: str = '', mesh_name: str = None, edges: np.ndarray = None) -> bpy.types.Object:
+	"""
+	頂点座標とループ、ポリゴンのバッファから`foreach_set`で直接メッシュを作り、新しいオブジェクトを生成する。
+	`from_pydata`のように頂点をひとつずつタプルに変換しないので、頂点数の多いメッシュでも速い。
+
+	Parameters
+	----------
+	coords : np.ndarray
+		頂点座標の配列。(N, 3)の配列でも、平らにした(N * 3)の配列でもよい。
+	loop_vertex_indices : np.ndarray
+		各ループ（面の角）の頂点インデックスの配列。
+	loop_starts : np.ndarray
+		各ポリゴンの最初のループのインデックスの配列。
+	name : str
+		作成されるオブジェクトの名前。
+	mesh_name : str, optional
+		作成されるメッシュデータの名前。省略した場合、オブジェクト名に '_mesh' を追加されたものになる。
+	edges : np.ndarray, optional
+		辺を構成する頂点インデックスの(E, 2)の配列。面から計算される辺以外に辺が必要な場合のみ指定する。
+
+	Returns
+	-------
+	bpy.types.Object
+		作成されたオブジェクトのインスタンス。シーンにはリンクされていない。
+	"""
+	with profile_stage('create_object'):
+		if mesh_name is None:
+			mesh_name = name + '_mesh'
+		mesh = bpy.data.meshes.new(mesh_name)
+
+		coords = np.ascontiguousarray(coords, dtype=np.float32).ravel()
+		mesh.vertices.add(len(coords) // 3)
+		mesh.vertices.foreach_set('co', coords)
+
+		num_edges = 0
+		if edges is not None and len(edges) > 0:
+			edges = np.ascontiguousarray(edges, dtype=np.int32).ravel()
+			num_edges = len(edges) // 2
+			mesh.edges.add(num_edges)
+			mesh.edges.foreach_set('vertices', edges)
+
+		num_polygons = len(loop_starts)
+		if num_polygons > 0:
+			mesh.loops.add(len(loop_vertex_indices))
+			mesh.loops.foreach_set('vertex_index', np.ascontiguousarray(loop_vertex_indices, dtype=np.int32))
+			mesh.polygons.add(num_polygons)
+			mesh.polygons.foreach_set('loop_start', np.ascontiguousarray(loop_starts, dtype=np.int32))
+
+		if num_edges > 0 or num_polygons > 0:
+			mesh.update(calc_edges=num_polygons > 0, calc_edges_loose=num_edges > 0)
+
+		obj = bpy.data.objects.new(name, mesh)
+		return obj
+
+
+
+
+
+
+
+
+
+
+def create_object(vertices: list[tuple[float, float, float]] | np.ndarray, faces: list | np.ndarray = [], name: str = '', mesh_name: str = None, edges: list[tuple[int, int]] | np.ndarray = []) -> bpy.types.Object:
 	"""
 	指定された頂点リストと面リストから新しいオブジェクトを生成する。
+	頂点と面はNumPyの配列のまま渡すこともできる。その場合はタプルに変換せずに`create_object_from_buffers`でメッシュが作られる。
 
 	Parameters
 	----------
-	vertices : list[tuple[float, float, float]]
-		オブジェクトの頂点座標のリスト。
-	faces : list of tuple of int, optional
-		オブジェクトの面を構成する頂点のインデックスのリスト。省略すると面は作成されない。
+	vertices : list[tuple[float, float, float]] | np.ndarray
+		オブジェクトの頂点座標のリスト、または(N, 3)の配列。
+	faces : list of tuple of int | np.ndarray, optional
+		オブジェクトの面を構成する頂点のインデックスのリスト、または(F, k)の配列。省略すると面は作成されない。
 	name : str
 		作成されるオブジェクトの名前。
 	mesh_name : str, optional
 		作成されるメッシュデータの名前。省略した場合、オブジェクト名に '_mesh' を追加されたものになる。
-	edges : list[tuple[int, int]], optional
+	edges : list[tuple[int, int]] | np.ndarray, optional
 		オブジェクトのエッジを構成する頂点のインデックスのリスト。デフォルトでは辺は作成されない。
 
 	Returns
@@ -315,12 +656,13 @@ def create_object(vertices: list[tuple[float, float, float]], faces: list = [],
 	bpy.types.Object
 		作成されたオブジェクトのインスタンス。
 	"""
-	if mesh_name is None:
-		mesh_name = name + '_mesh'
-	mesh = bpy.data.meshes.new(mesh_name)
-	mesh.from_pydata(vertices, edges, faces)
-	obj = bpy.data.objects.new(name, mesh)
-	return obj
+	with profile_stage('create_object'):
+		if not isinstance(vertices, np.ndarray):
+			vertices = np.fromiter(chain.from_iterable(vertices), dtype=np.float32, count=len(vertices) * 3)
+		if not isinstance(edges, np.ndarray):
+			edges = np.fromiter(chain.from_iterable(edges), dtype=np.int32, count=len(edges) * 2)
+		loop_vertex_indices, loop_starts = make_mesh_buffers(faces)
+		return create_object_from_buffers(vertices, loop_vertex_indices, loop_starts, name=name, mesh_name=mesh_name, edges=edges)
 
 
 
@@ -345,24 +687,22 @@ def create_combined_object(objects: list[bpy.types.Object], obj_name: str, mesh_
 		objects[0].name = obj_name
 		return objects[0]
 
-	vertices = []
-	faces = []
+	# 各オブジェクトのメッシュを配列のまま取り出して繋げる
+	coords_list = []
+	loops_list = []
+	loop_starts_list = []
 	vertex_index_offset = 0
+	loop_index_offset = 0
 	for obj in objects:
-		for v in obj.data.vertices:
-			vertices.append(obj.location + v.co - objects[0].location)
-		for f in obj.data.polygons:
-			faces.append([])
-			for v in f.vertices:
-				faces[len(faces) - 1].append(v + vertex_index_offset)
-		vertex_index_offset += len(obj.data.vertices)
-
-	if mesh_name is None:
-		mesh_name = obj_name + '_mesh'
-	mesh = bpy.data.meshes.new(mesh_name)
-	mesh.from_pydata(vertices, [], faces)
-
-	combined_obj = bpy.data.objects.new(obj_name, mesh)
+		coords, loops, loop_starts = get_mesh_buffers(obj)
+		coords_list.append(coords + np.array(obj.location - objects[0].location, dtype=np.float32))
+		loops_list.append(loops + vertex_index_offset)
+		loop_starts_list.append(loop_starts + loop_index_offset)
+
+		vertex_index_offset += len(coords)
+		loop_index_offset += len(loops)
+
+	combined_obj = create_object_from_buffers(np.concatenate(coords_list), np.concatenate(loops_list), np.concatenate(loop_starts_list), name=obj_name, mesh_name=mesh_name)
 	combined_obj.location = objects[0].location
 	return combined_obj
 
@@ -375,50 +715,33 @@ def create_combined_object(objects: list[bpy.types.Object], obj_name: str, mesh_
 
 
 
-def create_box(size: Vector | tuple[float, float, float], offset: Vector = Vector((0, 0, 0))) -> bpy.types.Object:
+def get_mesh_buffers(obj: bpy.types.Object, dtype=np.float32) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
 	"""
-	直方体のオブジェクトを生成する。
+	オブジェクトのメッシュを`create_object_from_buffers`に渡せる形の配列として取り出す。
 
 	Parameters
 	----------
-	size : Vector | tuple[float, float, float]
-		直方体の各軸の大きさを表すベクトル。(1.0, 1.0, 1.0)なら大きさ1の立方体を作る。
-	offset : Vector, optional
-		直方体の中心からのオフセットを表すベクトル。直方体の位置を決める。
+	obj : bpy.types.Object
+		メッシュを取り出すオブジェクト。
+	dtype : optional
+		頂点座標の配列の型。
 
 	Returns
 	-------
-	bpy.types.Object
-		作成されたオブジェクト。Blenderのシーンには既にリンクされた状態。
+	tuple[np.ndarray, np.ndarray, np.ndarray]
+		頂点座標の(N, 3)の配列、ループの頂点インデックスの配列、各面の最初のループのインデックスの配列。
 	"""
-	vertices = [
-		mathutils.Vector([-0.5, -0.5, -0.5]),	# 0 正面 左下
-		mathutils.Vector([-0.5, -0.5, 0.5]),	# 1 正面 左上
-		mathutils.Vector([-0.5, 0.5, -0.5]),	# 2 奥 左下
-		mathutils.Vector([-0.5, 0.5, 0.5]),		# 3 奥 左上
-		mathutils.Vector([0.5, -0.5, -0.5]),	# 4 正面 右下
-		mathutils.Vector([0.5, -0.5, 0.5]),		# 5 正面 右上
-		mathutils.Vector([0.5, 0.5, -0.5]),		# 6 奥 右下
-		mathutils.Vector([0.5, 0.5, 0.5])		# 7 奥 右上
-	]
-	faces = [
-		(1, 5, 4, 0),	# 正面
-		(3, 7, 6, 2),	# 背面
-		(1, 3, 2, 0),	# 左側面
-		(5, 7, 6, 4),	# 右側面
-		(0, 4, 6, 2),	# 底面
-		(1, 5, 7, 3),	# 上面
-	]
+	mesh = obj.data
+	coords = np.empty(len(mesh.vertices) * 3, dtype=dtype)
+	mesh.vertices.foreach_get('co', coords)
 
-	# sizeがVector型でない場合はVectorに変換する
-	if not isinstance(size, Vector):
-		size = Vector(size)
+	loops = np.empty(len(mesh.loops), dtype=np.int32)
+	mesh.loops.foreach_get('vertex_index', loops)
 
-	actual_vertices = [(v * size) + offset for v in vertices]
-	obj = cleanup_mesh(create_object(vertices=actual_vertices, faces=faces))
-	bpy.context.collection.objects.link(obj)
-	return obj
+	loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+	mesh.polygons.foreach_get('loop_start', loop_starts)
 
+	return coords.reshape(-1, 3), loops, loop_starts
 
 
 
@@ -428,104 +751,84 @@ def create_box(size: Vector | tuple[float, float, float], offset: Vector = Vecto
 
 
 
-def create_box_from_corners(corner1: tuple[float, float, float], corner2: tuple[float, float, float]) -> bpy.types.Object:
+
+# MARK: MeshCache
+class MeshCache:
 	"""
-	corner1、corner2を対角座標とする直方体を生成する。
+	生成したメッシュを配列のまま保持しておくLRUキャッシュ。
+	リドゥパネルで値を変更するたびに`execute`が最初から実行し直されるので、形状に関係するプロパティをキーにして部品のメッシュを使い回す。
+	保持している配列の合計が`max_bytes`を超えると、最も長く使われていないものから捨てる。
+	"""
+	def __init__(self, max_bytes: int):
+		self.max_bytes = max_bytes
+		self.total_bytes = 0
+		# キー -> (頂点座標, ループの頂点インデックス, 面の最初のループ, オブジェクトの位置[, 辺のベベルウェイト])
+		self.entries: OrderedDict[tuple, tuple] = OrderedDict()
 
-	Parameters
-	----------
-	corner1 : tuple[float, float, float]
-		直方体の1つ目の角の座標(x, y, z)。
-	corner2 : tuple[float, float, float]
-		corner1の対角位置の座標(x, y, z)。
 
-	Returns
-	-------
-	bpy.types.Object
-		作成されたオブジェクト。Blenderのシーンには既にリンクされた状態。
-	"""
-	# 座標を小さい順と大きい順で整理
-	min_c = [min(corner1[i], corner2[i]) for i in range(3)]
-	max_c = [max(corner1[i], corner2[i]) for i in range(3)]
 
-	# メッシュデータの作成
-	mesh = bpy.data.meshes.new('BoxMesh')
-	bm = bmesh.new()
+	@staticmethod
+	def entry_bytes(entry: tuple) -> int:
+		size = sum(array.nbytes for array in entry[:3])
+		if len(entry) > 4 and entry[4] is not None:
+			size += sum(array.nbytes for array in entry[4])
+		return size
 
-	# 頂点を追加
-	verts = [
-		bm.verts.new((min_c[0], min_c[1], min_c[2])),
-		bm.verts.new((max_c[0], min_c[1], min_c[2])),
-		bm.verts.new((max_c[0], max_c[1], min_c[2])),
-		bm.verts.new((min_c[0], max_c[1], min_c[2])),
-		bm.verts.new((min_c[0], min_c[1], max_c[2])),
-		bm.verts.new((max_c[0], min_c[1], max_c[2])),
-		bm.verts.new((max_c[0], max_c[1], max_c[2])),
-		bm.verts.new((min_c[0], max_c[1], max_c[2])),
-	]
 
-	# 面を作成
-	faces = [
-		(0, 1, 5, 4),  # 下面
-		(1, 2, 6, 5),  # 側面1
-		(2, 3, 7, 6),  # 上面
-		(3, 0, 4, 7),  # 側面2
-		(0, 3, 2, 1),  # 前面
-		(4, 5, 6, 7)   # 背面
-	]
 
-	for face in faces:
-		bm.faces.new([verts[i] for i in face])
+	def get(self, key: tuple) -> tuple | None:
+		entry = self.entries.get(key)
+		if entry is None:
+			return None
+		self.entries.move_to_end(key)
+		return entry
 
-	# メッシュデータをオブジェクトに変換
-	bm.to_mesh(mesh)
-	bm.free()
 
-	# オブジェクトを作成し、メッシュを割り当てる
-	box_object = bpy.data.objects.new('BoxObject', mesh)
 
-	# シーンにオブジェクトを追加
-	bpy.context.collection.objects.link(box_object)
+	def put(self, key: tuple, entry: tuple) -> None:
+		if key in self.entries:
+			self.total_bytes -= self.entry_bytes(self.entries.pop(key))
 
-	return box_object
+		size = self.entry_bytes(entry)
+		if size > self.max_bytes:
+			return
+		self.entries[key] = entry
+		self.total_bytes += size
+		self.evict()
 
 
 
+	def evict(self) -> None:
+		while self.total_bytes > self.max_bytes and self.entries:
+			_, entry = self.entries.popitem(last=False)
+			self.total_bytes -= self.entry_bytes(entry)
 
 
 
+	def clear(self) -> None:
+		self.entries.clear()
+		self.total_bytes = 0
 
 
 
+# 環境変数`ROMLY_MESH_CACHE_MB`で上限を変更できる
+MESH_CACHE = MeshCache(max_bytes=int(float(os.environ.get('ROMLY_MESH_CACHE_MB', '64')) * 1024 * 1024))
 
-# MARK: create_cylinder
-def create_cylinder(radius: float, length_z_plus: float, length_z_minus: float = 0, segments: int = 32) -> bpy.types.Object:
+
+
+
+
+def set_mesh_cache_limit(max_megabytes: float) -> None:
 	"""
-	円柱のオブジェクトを生成する。生成される円柱の長さは `length_z_plus` + `length_z_minus` となる。
+	メッシュキャッシュの上限を変更する。0にするとキャッシュを使わなくなる。
 
 	Parameters
 	----------
-	radius : float
-		円柱の半径。
-	length_z_plus : float
-		Z軸プラス方向に伸びる円柱の長さ。
-	length_z_minus : float, optional
-		Z軸マイナス方向に伸びる円柱の長さ（デフォルトは0）。
-	segments : int, optional
-		円柱のセグメントの数。ディフォルトは32。
-
-	Returns
-	-------
-	bpy.types.Object
-		生成された円柱のオブジェクト。Blenderのシーンには既にリンクされた状態。
+	max_megabytes : float
+		キャッシュに保持する配列の合計の上限（MiB）。
 	"""
-	vertices = make_circle_vertices(radius=radius, num_vertices=segments, center=(0, 0, -length_z_minus))
-	faces = [list(range(len(vertices)))]
-	extrude_face(vertices, faces=faces, extrude_vertex_indices=list(range(len(vertices))), z_offset=length_z_plus + length_z_minus)
-	cylinder = create_object(vertices=vertices, faces=faces)
-	cylinder = cleanup_mesh(cylinder)
-	bpy.context.collection.objects.link(cylinder)
-	return cylinder
+	MESH_CACHE.max_bytes = int(max_megabytes * 1024 * 1024)
+	MESH_CACHE.evict()
 
 
 
@@ -536,194 +839,249 @@ def create_cylinder(radius: float, length_z_plus: float, length_z_minus: float =
 
 
 
-# MARK: create_threaded_cylinder
-def create_threaded_cylinder(diameter: float, length: float, pitch: float, lead: int, thread_depth: float, segments: int, bevel_segments: int, edge_flat: bool = False) -> bpy.types.Object:
-	"""
-	ねじ切りの入った円柱を生成する。
+# MARK: DiskMeshCache
+# ディスクキャッシュのファイル形式のバージョン。形式を変えたら上げること
+DISK_MESH_CACHE_FORMAT_VERSION = 1
+DISK_MESH_CACHE_MAGIC = b'RMC1'
+DISK_MESH_CACHE_EXTENSION = '.rmc'
+# マジック、頂点数、ループ数、面数、ベベルウェイトのある辺の数、オブジェクトの位置
+DISK_MESH_CACHE_HEADER = struct.Struct('<4sIIII3d')
 
-	Parameters
-	----------
-	diameter : float
-		円柱の直径。
-	length : float
-		円柱の長さ。
-	pitch : float
-		ねじ山のピッチ（隣接するねじ山の谷の中心間の距離）。
-	lead : int
-		ねじのリード（一回のねじ山で進む距離）。ピッチの倍数で指定。
-	thread_depth : float
-		ねじ山の深さ。
-	segments : int
-		円柱の周りのセグメント数。
-	bevel_segments : int
-		ねじ山の先端のセグメント数。
-	edge_flat : bool, optional
-		Trueの場合、上下をまっすぐにカットする。
 
-	Returns
-	-------
-	bpy.types.Object
-		作成されたねじ山付き円柱のオブジェクト。位置は原点からZマイナス方向に配置される。オブジェクトはシーンにリンクされている。
-	"""
-	# 谷径、山と谷のベベルの半径を決める
-	minor_diameter = diameter - thread_depth
-	major_radius = diameter / 2
-	minor_radius = minor_diameter / 2
 
-	vertices = []
-	faces = []
 
-	# --------------------------------------------------------------------------------
 
-	# 蓋のエッジになる頂点のインデックスを保存しておく
-	lid_edge_vertex_index = 0
+@functools.cache
+def get_addon_signature() -> str:
+	"""
+	アドオンのバージョンとソースコードから作った文字列を返す。ディスクキャッシュのキーに混ぜて、アドオンを更新したら古いキャッシュが使われないようにする。
+	バージョン番号を上げずにコードを修正した場合にも対応できるように、アドオンのフォルダにある.pyファイルの内容のハッシュも含める。
+	"""
+	package = sys.modules.get(__package__) if __package__ else None
+	version = getattr(package, 'bl_info', {}).get('version', ())
 
-	# bevelSegmentsが0より大きい場合はネジの山と谷にベベルを作る
-	if bevel_segments > 0:
-		H = major_radius - minor_radius
+	digest = hashlib.sha1()
+	addon_dir = os.path.dirname(os.path.abspath(__file__))
+	for file_name in sorted(os.listdir(addon_dir)):
+		if file_name.endswith('.py'):
+			digest.update(file_name.encode())
+			with open(os.path.join(addon_dir, file_name), 'rb') as f:
+				digest.update(f.read())
+	return f'{".".join(str(v) for v in version)}-{digest.hexdigest()}'
 
-		z = (lead * pitch) - pitch
-		for i in range(lead):
-			temp_vertices = []
-			rh = math.tan(math.radians(30)) * (H / 4)
-			start_point = mathutils.Vector([-minor_radius - H / 4, 0, z + pitch - rh])
-			end_point = mathutils.Vector([start_point.x, 0, z + pitch + rh])
-			temp_vertices.append(start_point)
 
-			pt = start_point.copy()
-			da = 120 / (bevel_segments + 1)
-			angle = 30 + da
-			dz = abs(end_point.z - start_point.z) / bevel_segments
-			for i in range(bevel_segments - 1):
-				dx = dz / math.tan(math.radians(angle))
-				pt.x += dx if (i < bevel_segments) else -dx
-				pt.z += dz
-				temp_vertices.append(mathutils.Vector([pt.x, pt.y, pt.z]))
-				angle += da
 
-			temp_vertices.append(end_point)
 
-			for i in reversed(range(len(temp_vertices))):
-				vertices.append(temp_vertices[i])
 
-			# --------------------------------------------------------------------------------
 
-			# 山の頂点と麓2箇所からなす角を求める
-			base1 = mathutils.Vector([-minor_radius, 0, z + pitch])
-			peak = mathutils.Vector([-major_radius, 0, z + pitch / 2])
-			base2 = mathutils.Vector([-minor_radius, 0, z])
-			angle = calc_angle(peak=peak, point1=base1, point2=base2)
 
-			# アールの開始座標
-			rh = math.tan(angle / 2) * (H / 8)
-			bevel_start = mathutils.Vector([-major_radius + H / 8, 0, z + pitch / 2 + rh])
 
-			# アールの開始位置から適当に伸ばした垂線
-			perpendicular_point = rotated_vector(vector=(peak - bevel_start) * 100, angle_radians=math.radians(-90), axis='Y')
-			perpendicular_point += bevel_start
 
-			# アール（ベベル）の中心を求める
-			bevel_center = find_intersection(
-				line1_start=project_to_xz(bevel_start), line1_end=project_to_xz(perpendicular_point),
-				line2_start=project_to_xz(peak), line2_end=Vector((0, 0, z + pitch / 2)))
 
-			# 円弧を構成する頂点郡を返す
-			vertices.extend(make_arc_vertices(start=bevel_start, center=bevel_center, axis='Y', rotate_degrees=-(90 - math.degrees(angle) / 2) * 2, segments=bevel_segments))
+class DiskMeshCache:
+	"""
+	生成したメッシュをバイナリファイルとして保存しておくディスクキャッシュ。Blenderを再起動しても残るので、同じ部品を何度も作る場合に生成処理とブーリアンを丸ごと省略できる。
+	ファイルはキー（部品の種類とパラメーター）とアドオンのバージョンから作ったハッシュを名前にして保存し、読み込みはメモリマップで行う。
+	保存しているファイルの合計が`max_bytes`を超えると、最も長く使われていないもの（更新日時の古いもの）から削除する。
+	"""
+	def __init__(self, directory: str | None, max_bytes: int):
+		self._directory = directory
+		self.max_bytes = max_bytes
 
-			# ----------------------------------------------------------------------
 
-			rh = math.tan(math.radians(30)) * (H / 4)
-			v = mathutils.Vector([-minor_radius - H / 4, 0, z + rh])
-			vertices.append(v)
 
-			z -= pitch
+	@property
+	def directory(self) -> str:
+		"""キャッシュを保存するフォルダ。指定が無ければBlenderのユーザーデータフォルダの中に作る。"""
+		if not self._directory:
+			self._directory = bpy.utils.user_resource('DATAFILES', path=os.path.join('romly_blender_addon', 'mesh_cache'), create=True)
+		return self._directory
 
-	else:
-		# 山と谷のベベルのセグメントが0の場合は鋭利な山と谷になる
-		vertices.append(mathutils.Vector([0, 0, lead * pitch]))
-		z = (lead * pitch) - pitch
-		for i in range(lead):
-			vertices.append(mathutils.Vector([-minor_radius, 0, z + pitch]))
-			vertices.append(mathutils.Vector([-major_radius, 0, z + pitch / 2]))
-			vertices.append(mathutils.Vector([-minor_radius, 0, z]))
-			z -= pitch
-		vertices.append(mathutils.Vector([0, 0, 0]))
 
-	# 回転体の頂点数を取得しておく
-	revolution_vertex_count = len(vertices)
 
-	# ----------------------------------------------------------------------
+	def path_for(self, key: tuple) -> str:
+		text = repr((key, get_addon_signature(), DISK_MESH_CACHE_FORMAT_VERSION))
+		return os.path.join(self.directory, hashlib.sha1(text.encode()).hexdigest() + DISK_MESH_CACHE_EXTENSION)
 
-	# 回してスクリューを作る
-	pitch_iteration = math.ceil(length / (lead * pitch)) + 2
-	for _ in range(pitch_iteration):
-		add_revolved_surface(vertices=vertices, faces=faces, rotation_vertex_count=revolution_vertex_count, segments=segments, z_offset=-lead * pitch)
 
-	# ----------------------------------------------------------------------
 
-	num_last_vertex_index_ecluding_lid_and_bottom = len(vertices) - 1
-	bottomZ = vertices[-1].z
+	def list_files(self) -> list[os.DirEntry]:
+		try:
+			with os.scandir(self.directory) as it:
+				return [entry for entry in it if entry.is_file() and entry.name.endswith(DISK_MESH_CACHE_EXTENSION)]
+		except OSError:
+			return []
 
-	# 蓋を作る
-	vertices.append(mathutils.Vector([0, 0, vertices[lid_edge_vertex_index].z]))
-	lid_center_vertex_index = len(vertices) - 1
-	for i in range(segments):
-		faces.append([lid_center_vertex_index, lid_edge_vertex_index + revolution_vertex_count * i, lid_edge_vertex_index + 	revolution_vertex_count * i + revolution_vertex_count])
 
-	# 最初の回転体の側面兼蓋となる面を作る
-	lid_face = []
-	lid_face.extend(range(0, revolution_vertex_count))
-	lid_face.append(lid_center_vertex_index)
-	faces.append(lid_face)
 
-	vertices.append(mathutils.Vector([0, 0, bottomZ]))
-	bottom_center_vertex_index = len(vertices) - 1
-	for i in range(segments):
-		faces.append([bottom_center_vertex_index,
-			num_last_vertex_index_ecluding_lid_and_bottom - revolution_vertex_count * i,
-			num_last_vertex_index_ecluding_lid_and_bottom - revolution_vertex_count * (i + 1)])
+	def get(self, key: tuple) -> tuple | None:
+		"""
+		キャッシュからメッシュを読み込む。無い場合や壊れている場合はNoneを返す。
 
-	# 最後の回転体の側面兼底となる面を作る
-	bottom_face = []
-	bottom_face.extend(range(num_last_vertex_index_ecluding_lid_and_bottom - revolution_vertex_count + 1, num_last_vertex_index_ecluding_lid_and_bottom + 1))
-	bottom_face.append(bottom_center_vertex_index)
-	faces.append(bottom_face)
+		Returns
+		-------
+		tuple | None
+			`MeshCache`と同じ形式のエントリ。
+		"""
+		if self.max_bytes <= 0:
+			return None
+		path = self.path_for(key)
+		try:
+			with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+				magic, num_vertices, num_loops, num_polygons, num_weighted_edges, *location = DISK_MESH_CACHE_HEADER.unpack_from(buffer, 0)
+				if magic != DISK_MESH_CACHE_MAGIC:
+					raise ValueError(f'Invalid mesh cache file: {path}')
+
+				# メモリマップのビューはファイルを閉じると使えなくなるので、必要な分だけコピーしてから閉じる
+				arrays = []
+				offset = DISK_MESH_CACHE_HEADER.size
+				for dtype, count in ((np.float32, num_vertices * 3), (np.int32, num_loops), (np.int32, num_polygons), (np.int32, num_weighted_edges * 2), (np.float32, num_weighted_edges)):
+					view = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+					arrays.append(view.copy())
+					offset += view.nbytes
+					del view
+		except FileNotFoundError:
+			return None
+		except (OSError, ValueError, struct.error):
+			# 壊れたファイルは消しておく
+			self.invalidate(key)
+			return None
+
+		# 最近使ったものとして更新日時を更新する
+		try:
+			os.utime(path)
+		except OSError:
+			pass
+
+		coords, loops, loop_starts, weighted_edges, weights = arrays
+		bevel_weights = (weighted_edges.reshape(-1, 2), weights) if num_weighted_edges > 0 else None
+		return coords.reshape(-1, 3), loops, loop_starts, tuple(location), bevel_weights
+
+
+
+	def put(self, key: tuple, entry: tuple) -> None:
+		"""メッシュをキャッシュに保存する。一時ファイルに書いてから置き換えるので、書き込み途中のファイルを読み込むことはない。"""
+		if self.max_bytes <= 0:
+			return
+		coords, loops, loop_starts, location = entry[:4]
+		bevel_weights = entry[4] if len(entry) > 4 else None
+		weighted_edges, weights = bevel_weights if bevel_weights is not None else (np.empty((0, 2), dtype=np.int32), np.empty(0, dtype=np.float32))
+
+		header = DISK_MESH_CACHE_HEADER.pack(DISK_MESH_CACHE_MAGIC, len(coords), len(loops), len(loop_starts), len(weights), *location)
+		arrays = [
+			np.ascontiguousarray(coords, dtype=np.float32),
+			np.ascontiguousarray(loops, dtype=np.int32),
+			np.ascontiguousarray(loop_starts, dtype=np.int32),
+			np.ascontiguousarray(weighted_edges, dtype=np.int32),
+			np.ascontiguousarray(weights, dtype=np.float32),
+		]
+		if len(header) + sum(array.nbytes for array in arrays) > self.max_bytes:
+			return
+
+		path = self.path_for(key)
+		temp_path = f'{path}.{os.getpid()}.tmp'
+		try:
+			os.makedirs(self.directory, exist_ok=True)
+			with open(temp_path, 'wb') as f:
+				f.write(header)
+				for array in arrays:
+					f.write(array.tobytes())
+			os.replace(temp_path, path)
+		except OSError:
+			if os.path.exists(temp_path):
+				os.remove(temp_path)
+			return
+		self.evict()
+
+
+
+	def evict(self) -> None:
+		"""合計サイズが上限に収まるまで、更新日時の古いファイルから削除する。"""
+		files = []
+		for entry in self.list_files():
+			try:
+				stat = entry.stat()
+			except OSError:
+				continue
+			files.append((stat.st_mtime, stat.st_size, entry.path))
+
+		total_bytes = sum(size for _, size, _ in files)
+		for _, size, path in sorted(files):
+			if total_bytes <= self.max_bytes:
+				break
+			try:
+				os.remove(path)
+				total_bytes -= size
+			except OSError:
+				pass
+
+
+
+	def invalidate(self, key: tuple) -> None:
+		"""指定したキーのキャッシュを削除する。"""
+		try:
+			os.remove(self.path_for(key))
+		except OSError:
+			pass
+
+
+
+	def clear(self) -> int:
+		"""
+		保存されているキャッシュをすべて削除する。
 
-	# ----------------------------------------------------------------------
+		Returns
+		-------
+		int
+			削除したファイルの数。
+		"""
+		count = 0
+		for entry in self.list_files():
+			try:
+				os.remove(entry.path)
+				count += 1
+			except OSError:
+				pass
+		return count
 
-	obj = cleanup_mesh(object=create_object(vertices=vertices, faces=faces, name='screw'))
-	bpy.context.collection.objects.link(obj)
 
-	# 上下のカット
-	if edge_flat:
-		cutter = create_box(size=Vector((diameter * 2, diameter * 2, length)), offset=Vector((0, 0, -length - length / 2)))
-		apply_boolean_object(obj, cutter)
-		cutter = create_box(size=Vector((diameter * 2, diameter * 2, length)), offset=Vector((0, 0, length / 2)))
-		apply_boolean_object(obj, cutter)
 
-	return obj
+# 環境変数`ROMLY_DISK_CACHE_DIR`で保存先を、`ROMLY_DISK_CACHE_MB`で上限を変更できる
+DISK_MESH_CACHE = DiskMeshCache(directory=os.environ.get('ROMLY_DISK_CACHE_DIR'), max_bytes=int(float(os.environ.get('ROMLY_DISK_CACHE_MB', '256')) * 1024 * 1024))
 
 
 
 
 
+def set_disk_mesh_cache_limit(max_megabytes: float) -> None:
+	"""
+	ディスクキャッシュの上限を変更する。0にするとディスクキャッシュを使わなくなる（保存済みのファイルは削除しない）。
 
+	Parameters
+	----------
+	max_megabytes : float
+		保存するファイルの合計の上限（MiB）。
+	"""
+	DISK_MESH_CACHE.max_bytes = int(max_megabytes * 1024 * 1024)
+	if DISK_MESH_CACHE.max_bytes > 0:
+		DISK_MESH_CACHE.evict()
 
 
 
 
-def create_empty_object() -> bpy.types.Object:
+
+def clear_mesh_caches() -> int:
 	"""
-	頂点を持たない空のオブジェクトを生成する。
+	メモリとディスクのメッシュキャッシュをすべて削除する。
 
 	Returns
 	-------
-	bpy.types.Object
-		生成されたオブジェクト。Blenderのシーンには既にリンクされた状態。
+	int
+		削除したディスクキャッシュのファイルの数。
 	"""
-	empty = create_object(vertices=[], faces=[])
-	bpy.context.collection.objects.link(empty)
-	return empty
+	MESH_CACHE.clear()
+	EDGE_ADJACENCY_CACHE.clear()
+	return DISK_MESH_CACHE.clear()
 
 
 
@@ -734,66 +1092,108 @@ def create_empty_object() -> bpy.types.Object:
 
 
 
-def cleanup_mesh(object: bpy.types.Object, remove_doubles=True, recalc_normals=True) -> bpy.types.Object:
+def get_edge_bevel_weights(obj: bpy.types.Object) -> tuple[np.ndarray, np.ndarray] | None:
 	"""
-	メッシュオブジェクトの重複する頂点を削除し、法線を再計算することでメッシュをクリーンアップする。
-
-	Parameters
-	----------
-	object : bpy.types.Object
-		クリーンアップするメッシュオブジェクト
-	remove_doubles : bool, optional
-		True の場合、重複する頂点を削除します。デフォルトは True。
-	recalc_normals : bool, optional
-		True の場合、法線を再計算します。デフォルトは True。
+	オブジェクトのメッシュから、ベベルウェイトが設定されている辺とその値を取り出す。
 
 	Returns
 	-------
-	bpy.types.Object
+	tuple[np.ndarray, np.ndarray] | None
+		辺の両端の頂点インデックスの(K, 2)の配列と、ベベルウェイトの(K)の配列。ベベルウェイトが設定されている辺が無い場合はNone。
 	"""
-	bm = bmesh.new()
-	bm.from_mesh(object.data)
-	if remove_doubles:
-		bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
-	if recalc_normals:
-		bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
-	bm.to_mesh(object.data)
-	bm.clear()
-	object.data.update()
-	bm.free()
-	return object
+	mesh = obj.data
+	attribute = mesh.attributes.get('bevel_weight_edge')
+	if attribute is None or attribute.domain != 'EDGE' or len(mesh.edges) == 0:
+		return None
+
+	weights = np.empty(len(mesh.edges), dtype=np.float32)
+	attribute.data.foreach_get('value', weights)
+	weighted = np.flatnonzero(weights)
+	if len(weighted) == 0:
+		return None
 
+	edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+	mesh.edges.foreach_get('vertices', edges)
+	return edges.reshape(-1, 2)[weighted], weights[weighted]
 
 
 
 
-def translate_vertices(object, vector):
+
+def set_edge_bevel_weights(obj: bpy.types.Object, weighted_edges: np.ndarray, weights: np.ndarray) -> None:
 	"""
-	オブジェクト（またはオブジェクトのリスト）の頂点を移動する。
+	`get_edge_bevel_weights`で取り出したベベルウェイトを、頂点インデックスで辺を探してオブジェクトのメッシュに設定する。
+	辺の並び順はメッシュの作り方によって変わるので、辺のインデックスではなく両端の頂点で対応を取る。
+	"""
+	mesh = obj.data
+	edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+	mesh.edges.foreach_get('vertices', edges)
+	edge_indices = {tuple(sorted(edge)): i for i, edge in enumerate(edges.reshape(-1, 2).tolist())}
+
+	values = np.zeros(len(mesh.edges), dtype=np.float32)
+	for edge, weight in zip(weighted_edges.tolist(), weights.tolist()):
+		index = edge_indices.get(tuple(sorted(edge)))
+		if index is not None:
+			values[index] = weight
+
+	attribute = mesh.attributes.get('bevel_weight_edge') or mesh.attributes.new('bevel_weight_edge', 'FLOAT', 'EDGE')
+	attribute.data.foreach_set('value', values)
+
+
+
+
+
+def create_cached_object(key: tuple, build: Callable[[], bpy.types.Object], name: str = '', persistent: bool = True) -> bpy.types.Object:
+	"""
+	キャッシュにメッシュがあればそこからオブジェクトを作成し、無ければ`build`で作成してキャッシュに入れる。
+	メモリ上のキャッシュを先に探し、無ければディスクキャッシュを探す。
+	キャッシュされるのは頂点と面、オブジェクトの位置、辺のベベルウェイトだけなので、それ以外のデータ（モディファイアなど）は呼び出し側で設定すること。
 
 	Parameters
 	----------
-	object : bpy.types.Mesh, bpy.types.Object, または list
-		頂点を移動するオブジェクト、またはオブジェクトのリスト。
-	vector : mathutils.Vector
-		移動量を指定するベクトル。
+	key : tuple
+		メッシュの形状を決めるパラメーターをすべて含むタプル。最初の要素には部品の種類を表す文字列を入れる。
+	build : Callable[[], bpy.types.Object]
+		キャッシュに無い場合にオブジェクトを作成する関数。シーンにリンクされていないオブジェクトを返すこと。
+	name : str, optional
+		キャッシュから作成するオブジェクトの名前。
+	persistent : bool, optional
+		ディスクキャッシュも使うかどうか。作成が十分速い部品ではFalseにする。
 
-	Raises
-	------
-	TypeError
-		与えられたオブジェクトが bpy.types.Mesh, bpy.types.Object, または list のいずれでもない場合。
+	Returns
+	-------
+	bpy.types.Object
+		作成されたオブジェクト。シーンにはリンクされていない。
 	"""
-	if isinstance(object, bpy.types.Mesh) or isinstance(object, bpy.types.Object):
-		bm = bmesh.new()
-		bm.from_mesh(object.data)
-		bmesh.ops.translate(bm, vec=vector, verts=bm.verts)
-		bm.to_mesh(object.data)
-		bm.clear()
-		object.data.update()
-		bm.free()
-	elif isinstance(object, list):
-		for i in range(len(object)):
-			object[i] = object[i] + vector
+	entry = MESH_CACHE.get(key)
+	if entry is not None:
+		count_event('mesh_cache_hit')
+	elif persistent:
+		with profile_stage('disk_cache_read'):
+			entry = DISK_MESH_CACHE.get(key)
+		if entry is not None:
+			count_event('disk_cache_hit')
+			if MESH_CACHE.max_bytes > 0:
+				MESH_CACHE.put(key, entry)
+
+	if entry is not None:
+		coords, loops, loop_starts, location = entry[:4]
+		obj = create_object_from_buffers(coords, loops, loop_starts, name=name)
+		obj.location = location
+		if len(entry) > 4 and entry[4] is not None:
+			set_edge_bevel_weights(obj, *entry[4])
+		return obj
+
+	count_event('mesh_cache_miss')
+	obj = build()
+	if MESH_CACHE.max_bytes > 0 or (persistent and DISK_MESH_CACHE.max_bytes > 0):
+		entry = get_mesh_buffers(obj) + (tuple(obj.location), get_edge_bevel_weights(obj))
+		if MESH_CACHE.max_bytes > 0:
+			MESH_CACHE.put(key, entry)
+		if persistent:
+			with profile_stage('disk_cache_write'):
+				DISK_MESH_CACHE.put(key, entry)
+	return obj
 
 
 
@@ -803,82 +1203,1619 @@ def translate_vertices(object, vector):
 
 
 
-def add_revolved_surface(vertices: list[Vector], faces: list[list[int]], rotation_vertex_count: int, segments: int, close=False, z_offset: float = 0, rotation_degree: float = 360, ccw: bool = False) -> None:
+
+def create_box(size: Vector | tuple[float, float, float], offset: Vector = Vector((0, 0, 0))) -> bpy.types.Object:
 	"""
-	頂点群で表される面を360度回転させて回転体を作る。
+	直方体のオブジェクトを生成する。
 
 	Parameters
 	----------
-	vertices : list[Vector]
-		頂点リスト。回転させる頂点も含む。新しく作った頂点もここに追加される。
-	faces : list[list[int]]
-		面のインデックスリスト。新しい面の追加用で、読み取りはされない。
-	rotation_vertex_count : int
-		回転させる頂点の数。この数だけの頂点が回転軸周りで回転される。
-	segments : int
-		回転体を構成するセグメントの数。360度をこの数で割った角度で頂点が回転される。
+	size : Vector | tuple[float, float, float]
+		直方体の各軸の大きさを表すベクトル。(1.0, 1.0, 1.0)なら大きさ1の立方体を作る。
+	offset : Vector, optional
+		直方体の中心からのオフセットを表すベクトル。直方体の位置を決める。
+
+	Returns
+	-------
+	bpy.types.Object
+		作成されたオブジェクト。Blenderのシーンには既にリンクされた状態。
+	"""
+	vertices = [
+		mathutils.Vector([-0.5, -0.5, -0.5]),	# 0 正面 左下
+		mathutils.Vector([-0.5, -0.5, 0.5]),	# 1 正面 左上
+		mathutils.Vector([-0.5, 0.5, -0.5]),	# 2 奥 左下
+		mathutils.Vector([-0.5, 0.5, 0.5]),		# 3 奥 左上
+		mathutils.Vector([0.5, -0.5, -0.5]),	# 4 正面 右下
+		mathutils.Vector([0.5, -0.5, 0.5]),		# 5 正面 右上
+		mathutils.Vector([0.5, 0.5, -0.5]),		# 6 奥 右下
+		mathutils.Vector([0.5, 0.5, 0.5])		# 7 奥 右上
+	]
+	faces = [
+		(1, 5, 4, 0),	# 正面
+		(3, 7, 6, 2),	# 背面
+		(1, 3, 2, 0),	# 左側面
+		(5, 7, 6, 4),	# 右側面
+		(0, 4, 6, 2),	# 底面
+		(1, 5, 7, 3),	# 上面
+	]
+
+	# sizeがVector型でない場合はVectorに変換する
+	if not isinstance(size, Vector):
+		size = Vector(size)
+
+	actual_vertices = [(v * size) + offset for v in vertices]
+	obj = cleanup_mesh(create_object(vertices=actual_vertices, faces=faces))
+	bpy.context.collection.objects.link(obj)
+	return obj
+
+
+
+
+
+
+
+
+
+
+def create_box_from_corners(corner1: tuple[float, float, float], corner2: tuple[float, float, float]) -> bpy.types.Object:
+	"""
+	corner1、corner2を対角座標とする直方体を生成する。
+
+	Parameters
+	----------
+	corner1 : tuple[float, float, float]
+		直方体の1つ目の角の座標(x, y, z)。
+	corner2 : tuple[float, float, float]
+		corner1の対角位置の座標(x, y, z)。
+
+	Returns
+	-------
+	bpy.types.Object
+		作成されたオブジェクト。Blenderのシーンには既にリンクされた状態。
+	"""
+	# 座標を小さい順と大きい順で整理
+	min_c = [min(corner1[i], corner2[i]) for i in range(3)]
+	max_c = [max(corner1[i], corner2[i]) for i in range(3)]
+
+	# メッシュデータの作成
+	mesh = bpy.data.meshes.new('BoxMesh')
+	bm = bmesh.new()
+
+	# 頂点を追加
+	verts = [
+		bm.verts.new((min_c[0], min_c[1], min_c[2])),
+		bm.verts.new((max_c[0], min_c[1], min_c[2])),
+		bm.verts.new((max_c[0], max_c[1], min_c[2])),
+		bm.verts.new((min_c[0], max_c[1], min_c[2])),
+		bm.verts.new((min_c[0], min_c[1], max_c[2])),
+		bm.verts.new((max_c[0], min_c[1], max_c[2])),
+		bm.verts.new((max_c[0], max_c[1], max_c[2])),
+		bm.verts.new((min_c[0], max_c[1], max_c[2])),
+	]
+
+	# 面を作成
+	faces = [
+		(0, 1, 5, 4),  # 下面
+		(1, 2, 6, 5),  # 側面1
+		(2, 3, 7, 6),  # 上面
+		(3, 0, 4, 7),  # 側面2
+		(0, 3, 2, 1),  # 前面
+		(4, 5, 6, 7)   # 背面
+	]
+
+	for face in faces:
+		bm.faces.new([verts[i] for i in face])
+
+	# メッシュデータをオブジェクトに変換
+	bm.to_mesh(mesh)
+	bm.free()
+
+	# オブジェクトを作成し、メッシュを割り当てる
+	box_object = bpy.data.objects.new('BoxObject', mesh)
+
+	# シーンにオブジェクトを追加
+	bpy.context.collection.objects.link(box_object)
+
+	return box_object
+
+
+
+
+
+
+
+
+
+
+# MARK: create_cylinder
+def create_cylinder(radius: float, length_z_plus: float, length_z_minus: float = 0, segments: int = 32) -> bpy.types.Object:
+	"""
+	円柱のオブジェクトを生成する。生成される円柱の長さは `length_z_plus` + `length_z_minus` となる。
+
+	Parameters
+	----------
+	radius : float
+		円柱の半径。
+	length_z_plus : float
+		Z軸プラス方向に伸びる円柱の長さ。
+	length_z_minus : float, optional
+		Z軸マイナス方向に伸びる円柱の長さ（デフォルトは0）。
+	segments : int, optional
+		円柱のセグメントの数。ディフォルトは32。
+
+	Returns
+	-------
+	bpy.types.Object
+		生成された円柱のオブジェクト。Blenderのシーンには既にリンクされた状態。
+	"""
+	vertices = make_circle_vertices(radius=radius, num_vertices=segments, center=(0, 0, -length_z_minus))
+	faces = [list(range(len(vertices)))]
+	extrude_face(vertices, faces=faces, extrude_vertex_indices=list(range(len(vertices))), z_offset=length_z_plus + length_z_minus)
+	cylinder = create_object(vertices=vertices, faces=faces)
+	cylinder = cleanup_mesh(cylinder)
+	bpy.context.collection.objects.link(cylinder)
+	return cylinder
+
+
+
+
+
+
+
+
+
+
+# MARK: make_thread_profile_vertices
+def make_thread_profile_vertices(diameter: float, pitch: float, lead: int, thread_depth: float, bevel_segments: int) -> list[Vector]:
+	"""
+	ねじ切りの入った円柱の、回転体の元になる断面（XZ平面上、Xマイナス側）の頂点群を作る。
+
+	Parameters
+	----------
+	diameter : float
+		円柱の直径。
+	pitch : float
+		ねじ山のピッチ。
+	lead : int
+		ねじのリード。ピッチの倍数で指定。
+	thread_depth : float
+		ねじ山の深さ。
+	bevel_segments : int
+		ねじ山の先端のセグメント数。0の場合は鋭利な山と谷になり、断面の両端に回転軸上の頂点が追加される。
+
+	Returns
+	-------
+	list[Vector]
+		上から下へ並んだ断面の頂点のリスト。リード1回分(lead * pitch)の高さになる。
+	"""
+	# 谷径、山と谷のベベルの半径を決める
+	minor_diameter = diameter - thread_depth
+	major_radius = diameter / 2
+	minor_radius = minor_diameter / 2
+
+	vertices = []
+
+	# bevelSegmentsが0より大きい場合はネジの山と谷にベベルを作る
+	if bevel_segments > 0:
+		H = major_radius - minor_radius
+
+		z = (lead * pitch) - pitch
+		for i in range(lead):
+			temp_vertices = []
+			rh = math.tan(math.radians(30)) * (H / 4)
+			start_point = mathutils.Vector([-minor_radius - H / 4, 0, z + pitch - rh])
+			end_point = mathutils.Vector([start_point.x, 0, z + pitch + rh])
+			temp_vertices.append(start_point)
+
+			pt = start_point.copy()
+			da = 120 / (bevel_segments + 1)
+			angle = 30 + da
+			dz = abs(end_point.z - start_point.z) / bevel_segments
+			for i in range(bevel_segments - 1):
+				dx = dz / math.tan(math.radians(angle))
+				pt.x += dx if (i < bevel_segments) else -dx
+				pt.z += dz
+				temp_vertices.append(mathutils.Vector([pt.x, pt.y, pt.z]))
+				angle += da
+
+			temp_vertices.append(end_point)
+
+			for i in reversed(range(len(temp_vertices))):
+				vertices.append(temp_vertices[i])
+
+			# --------------------------------------------------------------------------------
+
+			# 山の頂点と麓2箇所からなす角を求める
+			base1 = mathutils.Vector([-minor_radius, 0, z + pitch])
+			peak = mathutils.Vector([-major_radius, 0, z + pitch / 2])
+			base2 = mathutils.Vector([-minor_radius, 0, z])
+			angle = calc_angle(peak=peak, point1=base1, point2=base2)
+
+			# アールの開始座標
+			rh = math.tan(angle / 2) * (H / 8)
+			bevel_start = mathutils.Vector([-major_radius + H / 8, 0, z + pitch / 2 + rh])
+
+			# アールの開始位置から適当に伸ばした垂線
+			perpendicular_point = rotated_vector(vector=(peak - bevel_start) * 100, angle_radians=math.radians(-90), axis='Y')
+			perpendicular_point += bevel_start
+
+			# アール（ベベル）の中心を求める
+			bevel_center = find_intersection(
+				line1_start=project_to_xz(bevel_start), line1_end=project_to_xz(perpendicular_point),
+				line2_start=project_to_xz(peak), line2_end=Vector((0, 0, z + pitch / 2)))
+
+			# 円弧を構成する頂点郡を返す
+			vertices.extend(make_arc_vertices(start=bevel_start, center=bevel_center, axis='Y', rotate_degrees=-(90 - math.degrees(angle) / 2) * 2, segments=bevel_segments))
+
+			# ----------------------------------------------------------------------
+
+			rh = math.tan(math.radians(30)) * (H / 4)
+			v = mathutils.Vector([-minor_radius - H / 4, 0, z + rh])
+			vertices.append(v)
+
+			z -= pitch
+
+	else:
+		# 山と谷のベベルのセグメントが0の場合は鋭利な山と谷になる
+		vertices.append(mathutils.Vector([0, 0, lead * pitch]))
+		z = (lead * pitch) - pitch
+		for i in range(lead):
+			vertices.append(mathutils.Vector([-minor_radius, 0, z + pitch]))
+			vertices.append(mathutils.Vector([-major_radius, 0, z + pitch / 2]))
+			vertices.append(mathutils.Vector([-minor_radius, 0, z]))
+			z -= pitch
+		vertices.append(mathutils.Vector([0, 0, 0]))
+
+	return vertices
+
+
+
+
+
+
+
+
+
+
+# MARK: make_clipped_thread_buffers
+def make_clipped_thread_buffers(profile: list[Vector], lead_length: float, segments: int, z_top: float, z_bottom: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	ねじ山の断面を螺旋状に回転させた面を、Z = `z_top`とZ = `z_bottom`の平面で直接切り取り、上下に平らな蓋を張ったメッシュのバッファを作る。
+	ブーリアンを使わずに上下が平らなねじ切り円柱を作るためのもので、計算量は頂点数に比例する。
+
+	Parameters
+	----------
+	profile : list[Vector]
+		`make_thread_profile_vertices`で作ったリード1回分の断面。回転軸上の頂点は無視される。
+	lead_length : float
+		1回転で進む距離（リード × ピッチ）。
+	segments : int
+		円周方向のセグメント数。
+	z_top : float
+		上面のZ座標。
+	z_bottom : float
+		底面のZ座標。
+
+	Returns
+	-------
+	tuple[np.ndarray, np.ndarray, np.ndarray]
+		`create_object_from_buffers`にそのまま渡せる、頂点座標、ループの頂点インデックス、ポリゴンの開始ループの配列。
+
+	Notes
+	-----
+	断面はリード1回分で、最後の頂点は最初の頂点をリード分下げた位置にある。
+	そこで最後の頂点を除き、断面の末尾を1回転後の断面の先頭に面で繋ぐことで、螺旋全体をひと続きの格子として扱う。
+	格子の面のうち上下の平面をまたぐものだけをPythonで切り取り、それ以外はNumPyでまとめて振り分ける。
+	"""
+	# 回転軸上の頂点と、連続する重複頂点を除いた断面
+	points = np.array([tuple(v) for v in profile], dtype=np.float64)
+	points = points[np.hypot(points[:, 0], points[:, 1]) > 1e-9]
+	keep = np.ones(len(points), dtype=bool)
+	keep[1:] = np.linalg.norm(np.diff(points, axis=0), axis=1) > 1e-9
+	points = points[keep][:-1]
+
+	# 上下に1回転ずつ余裕を持たせ、切り取る範囲を螺旋が完全に覆うようにする
+	points[:, 2] += z_top + lead_length
+	turns = math.ceil((z_top - z_bottom) / lead_length) + 4
+	n = len(points)
+	revolved, faces = make_revolved_surface(points, segments=segments, z_offset=-lead_length, rotation_degree=360 * turns, index_offset=0)
+	vertices = np.vstack([points, revolved])
+	num_rings = len(vertices) // n
+
+	# 断面の末尾と、1回転後の断面の先頭を繋ぐ面
+	j = np.arange(num_rings - segments - 1)
+	wrap_faces = np.stack([j * n + n - 1, (j + segments) * n, (j + segments + 1) * n, (j + 1) * n + n - 1], axis=1)
+	faces = np.vstack([faces, wrap_faces])
+
+	# 面ごとに、上下の平面の内側にあるかどうかで振り分ける
+	face_z = vertices[faces, 2]
+	# 平面にちょうど接している面も、蓋の縁になる辺を拾うためにまたぐ面として扱う
+	inside = np.all((face_z < z_top) & (face_z > z_bottom), axis=1)
+	outside = np.all(face_z >= z_top, axis=1) | np.all(face_z <= z_bottom, axis=1)
+	crossing = ~inside & ~outside
+
+	# 平面をまたぐ面を切り取る。交点は辺ごとに一度だけ作る
+	vertex_list = vertices.tolist()
+	intersections = {}
+	cap_edges = {z_top: [], z_bottom: []}
+
+	def clip(polygon: list[int], plane_z: float, sign: float) -> list[int]:
+		"""多角形を平面で切り取り、平面の内側の部分を返す。sign * (plane_z - z)が0以上の側を内側とする。"""
+		result = []
+		for k in range(len(polygon)):
+			current = polygon[k]
+			following = polygon[(k + 1) % len(polygon)]
+			d_current = sign * (plane_z - vertex_list[current][2])
+			d_following = sign * (plane_z - vertex_list[following][2])
+			if d_current >= 0:
+				result.append(current)
+			if (d_current > 0 and d_following < 0) or (d_current < 0 and d_following > 0):
+				key = (plane_z, min(current, following), max(current, following))
+				index = intersections.get(key)
+				if index is None:
+					a = vertex_list[key[1]]
+					b = vertex_list[key[2]]
+					t = (plane_z - a[2]) / (b[2] - a[2])
+					vertex_list.append([a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t, plane_z])
+					index = len(vertex_list) - 1
+					intersections[key] = index
+				result.append(index)
+		return result
+
+	clipped_faces = []
+	for polygon in faces[crossing].tolist():
+		polygon = clip(polygon, z_top, 1)
+		polygon = clip(polygon, z_bottom, -1)
+		if len(set(polygon)) < 3:
+			continue
+		clipped_faces.append(polygon)
+
+		# 平面上に並んだ頂点同士の辺は蓋の縁になる
+		for k in range(len(polygon)):
+			a = polygon[k]
+			b = polygon[(k + 1) % len(polygon)]
+			for plane_z in cap_edges:
+				if vertex_list[a][2] == plane_z and vertex_list[b][2] == plane_z:
+					cap_edges[plane_z].append((a, b))
+
+	# 蓋は中心からの扇形の三角形で張る。断面は中心から見て星形なので扇形で問題ない
+	# 縁の辺を面と逆向きに辿ることで、面の向きも揃う
+	for plane_z, edges in cap_edges.items():
+		vertex_list.append([0.0, 0.0, plane_z])
+		center = len(vertex_list) - 1
+		clipped_faces.extend([center, b, a] for a, b in edges)
+
+	# 使われている頂点だけを残して詰める
+	inside_loops, inside_starts = make_mesh_buffers(faces[inside])
+	clipped_loops, clipped_starts = make_mesh_buffers(clipped_faces)
+	loop_vertex_indices = np.concatenate([inside_loops, clipped_loops])
+	loop_starts = np.concatenate([inside_starts, clipped_starts + len(inside_loops)])
+	used, loop_vertex_indices = np.unique(loop_vertex_indices, return_inverse=True)
+	coords = np.array(vertex_list, dtype=np.float64)[used]
+
+	return coords, loop_vertex_indices.astype(np.int32), loop_starts.astype(np.int32)
+
+
+
+
+
+
+
+
+
+
+# MARK: create_threaded_cylinder
+def create_threaded_cylinder(diameter: float, length: float, pitch: float, lead: int, thread_depth: float, segments: int, bevel_segments: int, edge_flat: bool = False, clip_method: Literal['analytic', 'boolean'] = 'analytic') -> bpy.types.Object:
+	"""
+	ねじ切りの入った円柱を生成する。
+
+	Parameters
+	----------
+	diameter : float
+		円柱の直径。
+	length : float
+		円柱の長さ。
+	pitch : float
+		ねじ山のピッチ（隣接するねじ山の谷の中心間の距離）。
+	lead : int
+		ねじのリード（一回のねじ山で進む距離）。ピッチの倍数で指定。
+	thread_depth : float
+		ねじ山の深さ。
+	segments : int
+		円柱の周りのセグメント数。
+	bevel_segments : int
+		ねじ山の先端のセグメント数。
+	edge_flat : bool, optional
+		Trueの場合、上下をまっすぐにカットする。
+	clip_method : Literal['analytic', 'boolean'], optional
+		`edge_flat`の時のカット方法。'analytic'なら螺旋の断面を上下の平面で直接切り取って蓋を張るので、ブーリアンを一切使わない。
+		'boolean'は以前の方法で、余分に長く作った螺旋を直方体2つのブーリアンで削る。
+
+	Returns
+	-------
+	bpy.types.Object
+		作成されたねじ山付き円柱のオブジェクト。位置は原点からZマイナス方向に配置される。オブジェクトはシーンにリンクされている。
+	"""
+	vertices = make_thread_profile_vertices(diameter=diameter, pitch=pitch, lead=lead, thread_depth=thread_depth, bevel_segments=bevel_segments)
+	faces = []
+
+	# 上下をまっすぐにカットする場合は、螺旋を解析的に切り取って直接蓋を張る
+	if edge_flat and clip_method == 'analytic':
+		coords, loop_vertex_indices, loop_starts = make_clipped_thread_buffers(vertices, lead_length=lead * pitch, segments=segments, z_top=0, z_bottom=-length)
+		obj = cleanup_mesh(object=create_object_from_buffers(coords, loop_vertex_indices, loop_starts, name='screw'))
+		bpy.context.collection.objects.link(obj)
+		return obj
+
+	# 蓋のエッジになる頂点のインデックスを保存しておく
+	lid_edge_vertex_index = 0
+
+	# 回転体の頂点数を取得しておく
+	revolution_vertex_count = len(vertices)
+
+	# ----------------------------------------------------------------------
+
+	# 回してスクリューを作る
+	pitch_iteration = math.ceil(length / (lead * pitch)) + 2
+	add_revolved_surface(vertices=vertices, faces=faces, rotation_vertex_count=revolution_vertex_count, segments=segments, z_offset=-lead * pitch, rotation_degree=360 * pitch_iteration)
+
+	# ----------------------------------------------------------------------
+
+	num_last_vertex_index_ecluding_lid_and_bottom = len(vertices) - 1
+	bottomZ = vertices[-1].z
+
+	# 蓋を作る
+	vertices.append(mathutils.Vector([0, 0, vertices[lid_edge_vertex_index].z]))
+	lid_center_vertex_index = len(vertices) - 1
+	for i in range(segments):
+		faces.append([lid_center_vertex_index, lid_edge_vertex_index + revolution_vertex_count * i, lid_edge_vertex_index + 	revolution_vertex_count * i + revolution_vertex_count])
+
+	# 最初の回転体の側面兼蓋となる面を作る
+	lid_face = []
+	lid_face.extend(range(0, revolution_vertex_count))
+	lid_face.append(lid_center_vertex_index)
+	faces.append(lid_face)
+
+	vertices.append(mathutils.Vector([0, 0, bottomZ]))
+	bottom_center_vertex_index = len(vertices) - 1
+	for i in range(segments):
+		faces.append([bottom_center_vertex_index,
+			num_last_vertex_index_ecluding_lid_and_bottom - revolution_vertex_count * i,
+			num_last_vertex_index_ecluding_lid_and_bottom - revolution_vertex_count * (i + 1)])
+
+	# 最後の回転体の側面兼底となる面を作る
+	bottom_face = []
+	bottom_face.extend(range(num_last_vertex_index_ecluding_lid_and_bottom - revolution_vertex_count + 1, num_last_vertex_index_ecluding_lid_and_bottom + 1))
+	bottom_face.append(bottom_center_vertex_index)
+	faces.append(bottom_face)
+
+	# ----------------------------------------------------------------------
+
+	obj = cleanup_mesh(object=create_object(vertices=vertices, faces=faces, name='screw'))
+	bpy.context.collection.objects.link(obj)
+
+	# 上下のカット
+	if edge_flat:
+		cutter = create_box(size=Vector((diameter * 2, diameter * 2, length)), offset=Vector((0, 0, -length - length / 2)))
+		apply_boolean_object(obj, cutter)
+		cutter = create_box(size=Vector((diameter * 2, diameter * 2, length)), offset=Vector((0, 0, length / 2)))
+		apply_boolean_object(obj, cutter)
+
+	return obj
+
+
+
+
+
+
+
+
+
+
+def create_empty_object() -> bpy.types.Object:
+	"""
+	頂点を持たない空のオブジェクトを生成する。
+
+	Returns
+	-------
+	bpy.types.Object
+		生成されたオブジェクト。Blenderのシーンには既にリンクされた状態。
+	"""
+	empty = create_object(vertices=[], faces=[])
+	bpy.context.collection.objects.link(empty)
+	return empty
+
+
+
+
+
+
+
+
+
+
+def cleanup_mesh(object: bpy.types.Object, remove_doubles=True, recalc_normals=True) -> bpy.types.Object:
+	"""
+	メッシュオブジェクトの重複する頂点を削除し、法線を再計算することでメッシュをクリーンアップする。
+
+	Parameters
+	----------
+	object : bpy.types.Object
+		クリーンアップするメッシュオブジェクト
+	remove_doubles : bool, optional
+		True の場合、重複する頂点を削除します。デフォルトは True。
+	recalc_normals : bool, optional
+		True の場合、法線を再計算します。デフォルトは True。
+
+	Returns
+	-------
+	bpy.types.Object
+	"""
+	bm = bmesh.new()
+	count_event('bmesh_round_trip')
+	bm.from_mesh(object.data)
+	if remove_doubles:
+		bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
+	if recalc_normals:
+		bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+	bm.to_mesh(object.data)
+	bm.clear()
+	object.data.update()
+	bm.free()
+	return object
+
+
+
+
+
+def translate_vertices(object, vector):
+	"""
+	オブジェクト（またはオブジェクトのリスト）の頂点を移動する。
+
+	Parameters
+	----------
+	object : bpy.types.Mesh, bpy.types.Object, または list
+		頂点を移動するオブジェクト、またはオブジェクトのリスト。
+	vector : mathutils.Vector
+		移動量を指定するベクトル。
+
+	Raises
+	------
+	TypeError
+		与えられたオブジェクトが bpy.types.Mesh, bpy.types.Object, または list のいずれでもない場合。
+	"""
+	if isinstance(object, bpy.types.Mesh) or isinstance(object, bpy.types.Object):
+		bm = bmesh.new()
+		count_event('bmesh_round_trip')
+		bm.from_mesh(object.data)
+		bmesh.ops.translate(bm, vec=vector, verts=bm.verts)
+		bm.to_mesh(object.data)
+		bm.clear()
+		object.data.update()
+		bm.free()
+	elif isinstance(object, list):
+		for i in range(len(object)):
+			object[i] = object[i] + vector
+
+
+
+
+
+
+
+
+
+def make_revolved_surface(profile: np.ndarray, segments: int, close: bool = False, z_offset: float = 0, rotation_degree: float = 360, ccw: bool = False, index_offset: int = 0) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	断面の頂点群をZ軸周りに回転させた回転体の頂点と面を、NumPyの配列としてまとめて生成する。
+	全セグメント分の回転行列を一度に作って掛けるので、Pythonのループで頂点をひとつずつ回すより圧倒的に速い。
+
+	Parameters
+	----------
+	profile : np.ndarray
+		回転させる断面の頂点座標。(N, 3)の配列。
+	segments : int
+		回転体を構成するセグメントの数。360度をこの数で割った角度で頂点が回転される。
+	close : bool, optional
+		断面の最後の頂点と最初の頂点の間にも面を張るかどうか。
+	z_offset : float, optional
+		360度回転する間に頂点のZ座標に加算されるオフセット。ねじ切りはこの値を使うことで軸方向にずらしている。
+	rotation_degree : float, optional
+		回転させる角度。360を超える値を指定すると、その分だけ螺旋状に回転を続ける。
+	ccw : bool, optional
+		True の場合、左回りに作成する。ディフォルトでは False で右回り。
+	index_offset : int, optional
+		`profile`の先頭の頂点の、呼び出し元の頂点リスト上でのインデックス。面のインデックスはこの値を基準に作られる。
+
+	Returns
+	-------
+	tuple[np.ndarray, np.ndarray]
+		新しく作られた頂点の(M, 3)の配列と、面を構成する頂点インデックスの(F, 4)の配列。
+		頂点には`profile`自体は含まれず、`index_offset + len(profile)`番目から続くものとして面のインデックスが振られる。
+	"""
+	profile = np.asarray(profile, dtype=np.float64).reshape(-1, 3)
+	n = len(profile)
+
+	# 浮動小数点の誤差で最後のセグメントが余りとして扱われないよう、僅かに余裕を持たせて数える
+	degree_per_segment = 360.0 / segments
+	count = math.floor(rotation_degree / degree_per_segment + 1e-9)
+	remain_degree = rotation_degree - (count * degree_per_segment)
+
+	# 各セグメントの累積の回転角度とZ方向のずれ
+	degrees = np.arange(1, count + 1) * degree_per_segment
+	if remain_degree > 1e-9:
+		degrees = np.append(degrees, rotation_degree)
+	z = degrees / 360.0 * z_offset
+
+	if n == 0 or len(degrees) == 0:
+		return np.empty((0, 3)), np.empty((0, 4), dtype=np.int64)
+
+	# Z軸周りの回転行列をセグメント数分まとめて作る
+	radians = np.radians(degrees) if ccw else -np.radians(degrees)
+	cos = np.cos(radians)
+	sin = np.sin(radians)
+	rotations = np.zeros((len(degrees), 3, 3))
+	rotations[:, 0, 0] = cos
+	rotations[:, 0, 1] = -sin
+	rotations[:, 1, 0] = sin
+	rotations[:, 1, 1] = cos
+	rotations[:, 2, 2] = 1.0
+
+	# ずらしてから回転
+	shifted = np.repeat(profile[np.newaxis, :, :], len(degrees), axis=0)
+	shifted[:, :, 2] += z[:, np.newaxis]
+	vertices = np.einsum('kij,knj->kni', rotations, shifted).reshape(-1, 3)
+
+	# ひとつ前の断面と新しい断面の間に張る面。断面ごとにずらして全体の面にする
+	j = np.arange(n - 1)
+	quad = np.stack([j, j + 1, j + 1 + n, j + n], axis=1)
+	if close:
+		quad = np.vstack([quad, [[n - 1, 0, n, n * 2 - 1]]])
+	ring_starts = index_offset + np.arange(len(degrees)) * n
+	faces = (quad[np.newaxis, :, :] + ring_starts[:, np.newaxis, np.newaxis]).reshape(-1, 4)
+
+	return vertices, faces
+
+
+
+
+
+
+
+
+
+
+def add_revolved_surface(vertices: list[Vector], faces: list[list[int]], rotation_vertex_count: int, segments: int, close=False, z_offset: float = 0, rotation_degree: float = 360, ccw: bool = False) -> None:
+	"""
+	頂点群で表される面を360度回転させて回転体を作る。実際の計算は`make_revolved_surface`で行う。
+
+	Parameters
+	----------
+	vertices : list[Vector]
+		頂点リスト。回転させる頂点も含む。新しく作った頂点もここに追加される。
+	faces : list[list[int]]
+		面のインデックスリスト。新しい面の追加用で、読み取りはされない。
+	rotation_vertex_count : int
+		回転させる頂点の数。この数だけの頂点が回転軸周りで回転される。
+	segments : int
+		回転体を構成するセグメントの数。360度をこの数で割った角度で頂点が回転される。
 	close : bool, optional
 		回転体の両端を閉じるかどうか。Trueの場合、端の面が作成される。
 	z_offset : float, optional
 		頂点のZ座標に加算されるオフセット。このオフセットは全セグメントに渡って線形に加算される。ねじ切りはこの値を使うことで軸方向にずらしている。
 	rotation_degree : float, optional
+		回転させる角度。360を超える値を指定すると螺旋状に回転を続ける。
+	ccw : bool, optional
+		True の場合、左回りに作成する。ディフォルトでは False で見回り。
+
+	Notes
+	-----
+	この関数は`vertices`と`faces`を直接変更します。メッシュデータは呼び出し元で管理する必要があります。
+	"""
+	index_offset = len(vertices) - rotation_vertex_count
+	profile = [tuple(v) for v in vertices[index_offset:]]
+	new_vertices, new_faces = make_revolved_surface(np.array(profile), segments=segments, close=close, z_offset=z_offset, rotation_degree=rotation_degree, ccw=ccw, index_offset=index_offset)
+	vertices.extend(Vector(v) for v in new_vertices.tolist())
+	faces.extend(new_faces.tolist())
+
+
+
+
+
+
+
+
+
+
+def cleanup_mesh(object: bpy.types.Object, remove_doubles=True, recalc_normals=True):
+	"""
+	メッシュオブジェクトの重複する頂点を削除し、法線を再計算することでメッシュをクリーンアップする。
+
+	Parameters
+	----------
+	object : bpy.types.Object
+		クリーンアップするメッシュオブジェクト
+	remove_doubles : bool, optional
+		True の場合、重複する頂点を削除します。デフォルトは True。
+	recalc_normals : bool, optional
+		True の場合、法線を再計算します。デフォルトは True。
+
+	Returns
+	-------
+	bpy.types.Object
+	"""
+	with profile_stage('cleanup_mesh'):
+		bm = bmesh.new()
+		count_event('bmesh_round_trip')
+		bm.from_mesh(object.data)
+		if remove_doubles:
+			bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
+		if recalc_normals:
+			bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+		bm.to_mesh(object.data)
+		bm.clear()
+		object.data.update()
+		bm.free()
+		return object
+
+
+
+
+
+
+
+
+
+
+def extrude_face(vertices: list[Vector | tuple[float, float, float]], faces: list[list[int]], extrude_vertex_indices: list[int], z_offset: float = 1, offset: Vector = None, cap=True):
+	"""
+	指定された面を掃引して、新しくできた頂点と面を追加する。
+
+	Parameters
+	----------
+	vertices : list[Vector | tuple[float, float, float]]
+		頂点のリスト
+	faces : list[list[int]]
+		面を構成する頂点インデックスのリスト
+	extrude_vertex_indices : list[int]
+		掃引する頂点のインデックスのリスト。頂点(Vector)のリストじゃないので注意してね。
+	z_offset : float
+		掃引する距離
+	cap : bool, optional
+		掃引したすべての頂点を結ぶ面を作るか。つまり、面をキャップ（閉じる）するかどうか。
+	"""
+	# 各頂点を掃引した位置に複製する
+	for i in extrude_vertex_indices:
+		if isinstance(vertices[i], Vector):
+			v = vertices[i].copy()
+		else:
+			v = Vector((vertices[i][0], vertices[i][1], vertices[i][2]))
+		if offset:
+			v += offset
+		else:
+			v.z += z_offset
+		vertices.append(v)
+
+	l = len(vertices)
+	numExtrudeFaceVertices = len(extrude_vertex_indices)
+	for i in range(numExtrudeFaceVertices):
+		if i == numExtrudeFaceVertices - 1:
+			faces.append([
+				extrude_vertex_indices[i],
+				extrude_vertex_indices[0],
+				l - numExtrudeFaceVertices,
+				l - numExtrudeFaceVertices + i])
+		else:
+			faces.append([
+				extrude_vertex_indices[i],
+				extrude_vertex_indices[i + 1],
+				l - numExtrudeFaceVertices + i + 1,
+				l - numExtrudeFaceVertices + i])
+
+	if cap:
+		faces.append(list(reversed(range(l - numExtrudeFaceVertices, l))))
+
+
+
+
+
+
+
+
+
+
+# MARK: ExtrusionProfile
+class ExtrusionProfile(NamedTuple):
+	"""
+	`make_extrusion_profile`の戻り値を格納するNamedTuple。
+
+	Attributes
+	----------
+	vertices : np.ndarray
+		断面の頂点のXY座標の(N, 2)の配列。
+	boundary_loops : list[list[int]]
+		断面の境界の頂点インデックスのリスト。外周は反時計回り、内側の空洞は時計回りで、どちらも断面の内側を左手に見て進む。
+	faces : list[list[int]]
+		断面を覆う面（反時計回り）の頂点インデックスのリスト。どの面も穴を持たない。
+	"""
+	vertices: np.ndarray
+	boundary_loops: list[list[int]]
+	faces: list[list[int]]
+
+
+
+
+
+def merge_face_loops(loop1: dict[int, int], loop2: dict[int, int]) -> dict[int, int] | None:
+	"""
+	辺を共有する2つの面を、共有する辺を除いてつなげた1つの面にする。
+
+	Parameters
+	----------
+	loop1 : dict[int, int]
+		1つ目の面の、頂点インデックスから次の頂点インデックスへの辞書。
+	loop2 : dict[int, int]
+		2つ目の面の、同じ形式の辞書。
+
+	Returns
+	-------
+	dict[int, int] | None
+		つなげた面の辞書。共有する辺が1続きでなく、つなげると1周の輪にならない（穴ができる、1つの頂点で接する）場合はNone。
+	"""
+	merged = {}
+	for loop, other in ((loop1, loop2), (loop2, loop1)):
+		for v1, v2 in loop.items():
+			if other.get(v2) == v1:
+				continue
+			if v1 in merged:
+				return None
+			merged[v1] = v2
+
+	# 1周で全ての辺をたどれるか
+	start = next(iter(merged), None)
+	if start is None:
+		return None
+	count = 1
+	v = merged[start]
+	while v != start:
+		v = merged.get(v)
+		count += 1
+		if v is None or count > len(merged):
+			return None
+	return merged if count == len(merged) else None
+
+
+
+
+
+def loop_to_list(loop: dict[int, int], start: int) -> list[int]:
+	"""頂点インデックスから次の頂点インデックスへの辞書を、`start`から1周分の頂点インデックスのリストにする。"""
+	vertices = [start]
+	v = loop[start]
+	while v != start:
+		vertices.append(v)
+		v = loop[v]
+	return vertices
+
+
+
+
+
+def trace_loops(edges: list[tuple[int, int]], points: np.ndarray) -> list[list[int]]:
+	"""
+	有向辺をたどって閉じた輪にする。分かれ道では内側を左手に見て一番左に曲がる辺を選ぶので、1つの頂点で接する輪も別々の輪になる。
+
+	Parameters
+	----------
+	edges : list[tuple[int, int]]
+		有向辺の始点と終点の頂点インデックスのリスト。
+	points : np.ndarray
+		頂点のXY座標の(N, 2)の配列。
+
+	Returns
+	-------
+	list[list[int]]
+		輪の頂点インデックスのリスト。閉じずに途切れた辺は含まれない。
+	"""
+	outgoing = {}
+	for v1, v2 in edges:
+		outgoing.setdefault(v1, []).append(v2)
+	loops = []
+	for start in sorted(outgoing):
+		while outgoing[start]:
+			loop = [start]
+			v = outgoing[start].pop()
+			while v != start:
+				candidates = outgoing.get(v)
+				if not candidates:
+					break
+				incoming = points[v] - points[loop[-1]]
+				turns = [math.atan2(incoming[0] * d[1] - incoming[1] * d[0], incoming[0] * d[0] + incoming[1] * d[1]) for d in (points[candidates] - points[v]).tolist()]
+				loop.append(v)
+				v = candidates.pop(turns.index(max(turns)))
+			if v == start:
+				loops.append(loop)
+	return loops
+
+
+
+
+
+def points_in_loops(points: np.ndarray, loops: list[np.ndarray]) -> np.ndarray:
+	"""
+	点が閉じた折れ線の組の内側にあるか、偶奇規則で調べる。
+
+	Parameters
+	----------
+	points : np.ndarray
+		調べる点の(P, 2)の配列。
+	loops : list[np.ndarray]
+		閉じた折れ線の頂点の(N, 2)の配列のリスト。
+
+	Returns
+	-------
+	np.ndarray
+		内側にある点がTrueの(P,)の配列。
+	"""
+	inside = np.zeros(len(points), dtype=bool)
+	px, py = points[:, 0:1], points[:, 1:2]
+	for loop in loops:
+		x1, y1 = loop[:, 0], loop[:, 1]
+		x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+		crossing = (y1 > py) != (y2 > py)
+		with np.errstate(divide='ignore', invalid='ignore'):
+			x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+		inside ^= (np.count_nonzero(crossing & (px < x), axis=1) % 2).astype(bool)
+	return inside
+
+
+
+
+
+def distances_to_segments(points: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	点から線分までの最短距離と、最も近い線分を求める。
+
+	Parameters
+	----------
+	points : np.ndarray
+		点の(P, 2)の配列。
+	starts : np.ndarray
+		線分の始点の(E, 2)の配列。
+	ends : np.ndarray
+		線分の終点の(E, 2)の配列。
+
+	Returns
+	-------
+	tuple[np.ndarray, np.ndarray]
+		最短距離の(P,)の配列と、最も近い線分のインデックスの(P,)の配列。
+	"""
+	directions = ends - starts
+	lengths2 = np.maximum(np.einsum('ij,ij->i', directions, directions), 1e-300)
+	offsets = points[:, None, :] - starts[None, :, :]
+	t = np.clip(np.einsum('pej,ej->pe', offsets, directions) / lengths2, 0, 1)
+	distances = np.linalg.norm(offsets - t[..., None] * directions[None, :, :], axis=2)
+	nearest = np.argmin(distances, axis=1)
+	return distances[np.arange(len(points)), nearest], nearest
+
+
+
+
+
+def subtract_polygon(loops: list[np.ndarray], clip: np.ndarray, tolerance: float) -> list[np.ndarray]:
+	"""
+	閉じた折れ線の組で囲まれた領域から、多角形をくり抜く。
+	Weiler–Athertonと同じように両方の辺を交点で分割し、残す辺だけを内側を左手に見る向きでたどり直す。
+
+	- 領域の辺は、多角形の外側にあるものを残す。多角形の辺と重なる場合は、向きが逆（多角形の内側が領域の外側）なら残す。
+	- 多角形の辺は、領域の内側にあるものを向きを逆にして残す。領域の辺と重なる場合は残さない。
+	- `tolerance`以内の交点と頂点は同じ頂点として扱うので、頂点が辺の上にある場合も扱える。
+
+	Parameters
+	----------
+	loops : list[np.ndarray]
+		領域の境界の頂点の(N, 2)の配列のリスト。外周は反時計回り、内側の穴は時計回り。
+	clip : np.ndarray
+		くり抜く多角形の頂点の(M, 2)の配列。反時計回り。
+	tolerance : float
+		同じ点とみなす距離。
+
+	Returns
+	-------
+	list[np.ndarray]
+		くり抜いた後の領域の境界のリスト。向きは`loops`と同じで、領域が無くなった場合は空のリスト。
+	"""
+	subject_starts = np.concatenate(loops)
+	subject_ends = np.concatenate([np.roll(loop, -1, axis=0) for loop in loops])
+	clip_starts = clip
+	clip_ends = np.roll(clip, -1, axis=0)
+	subject_directions = subject_ends - subject_starts
+	clip_directions = clip_ends - clip_starts
+	subject_lengths = np.linalg.norm(subject_directions, axis=1)
+	clip_lengths = np.linalg.norm(clip_directions, axis=1)
+
+	# 全ての辺の組の交点を、それぞれの辺の上の位置（0〜1）として求める
+	offsets = clip_starts[None, :, :] - subject_starts[:, None, :]
+	denominators = np.cross(subject_directions[:, None, :], clip_directions[None, :, :])
+	parallel = np.abs(denominators) <= 1e-12 * subject_lengths[:, None] * clip_lengths[None, :]
+	with np.errstate(divide='ignore', invalid='ignore'):
+		t = np.cross(offsets, clip_directions[None, :, :]) / denominators
+		u = np.cross(offsets, subject_directions[:, None, :]) / denominators
+	crossing = ~parallel & (t * subject_lengths[:, None] >= -tolerance) & ((t - 1) * subject_lengths[:, None] <= tolerance) & (u * clip_lengths[None, :] >= -tolerance) & ((u - 1) * clip_lengths[None, :] <= tolerance)
+	subject_splits = [[0.0, 1.0] for _ in range(len(subject_starts))]
+	clip_splits = [[0.0, 1.0] for _ in range(len(clip_starts))]
+	for i, j in zip(*np.nonzero(crossing)):
+		subject_splits[i].append(min(max(float(t[i, j]), 0.0), 1.0))
+		clip_splits[j].append(min(max(float(u[i, j]), 0.0), 1.0))
+
+	# 同じ直線上で重なる辺は、互いの端点で分割する
+	collinear = parallel & (np.abs(np.cross(subject_directions[:, None, :], offsets)) <= tolerance * subject_lengths[:, None])
+	for i, j in zip(*np.nonzero(collinear)):
+		for point in (clip_starts[j], clip_ends[j]):
+			s = float(np.dot(point - subject_starts[i], subject_directions[i])) / subject_lengths[i] ** 2
+			if 0 < s < 1:
+				subject_splits[i].append(s)
+		for point in (subject_starts[i], subject_ends[i]):
+			s = float(np.dot(point - clip_starts[j], clip_directions[j])) / clip_lengths[j] ** 2
+			if 0 < s < 1:
+				clip_splits[j].append(s)
+
+	# 分割した辺の端点を、近いものどうしまとめる。元の頂点を先に並べて、交点は元の頂点に寄せる
+	points = [subject_starts, clip_starts]
+	for starts, directions, splits in ((subject_starts, subject_directions, subject_splits), (clip_starts, clip_directions, clip_splits)):
+		for start, direction, split in zip(starts, directions, splits):
+			points.append(start + np.array(sorted(set(split)))[:, None] * direction)
+	points = np.concatenate(points)
+	tree = mathutils.kdtree.KDTree(len(points))
+	for i, (x, y) in enumerate(points.tolist()):
+		tree.insert((x, y, 0), i)
+	tree.balance()
+	representative = [min(index for _, index, _ in tree.find_range((x, y, 0), tolerance)) for x, y in points.tolist()]
+
+	def split_edges(splits: list[list[float]], offset: int) -> list[tuple[int, int]]:
+		edges = []
+		for split in splits:
+			count = len(set(split))
+			indices = [representative[offset + k] for k in range(count)]
+			edges.extend((v1, v2) for v1, v2 in zip(indices, indices[1:]) if v1 != v2)
+			offset += count
+		return edges
+
+	subject_edges = split_edges(subject_splits, len(subject_starts) + len(clip_starts))
+	clip_edges = split_edges(clip_splits, len(subject_starts) + len(clip_starts) + sum(len(set(split)) for split in subject_splits))
+
+	# 残す辺を選ぶ
+	kept = []
+	if subject_edges:
+		edges = np.array(subject_edges)
+		midpoints = (points[edges[:, 0]] + points[edges[:, 1]]) / 2
+		distances, nearest = distances_to_segments(midpoints, clip_starts, clip_ends)
+		inside = points_in_loops(midpoints, [clip])
+		same_direction = np.einsum('ij,ij->i', points[edges[:, 1]] - points[edges[:, 0]], clip_directions[nearest]) > 0
+		keep = np.where(distances <= tolerance, ~same_direction, ~inside)
+		kept.extend(edge for edge, k in zip(subject_edges, keep.tolist()) if k)
+	if clip_edges:
+		edges = np.array(clip_edges)
+		midpoints = (points[edges[:, 0]] + points[edges[:, 1]]) / 2
+		distances, _ = distances_to_segments(midpoints, subject_starts, subject_ends)
+		keep = (distances > tolerance) & points_in_loops(midpoints, loops)
+		kept.extend((v2, v1) for (v1, v2), k in zip(clip_edges, keep.tolist()) if k)
+
+	# 残した辺をたどって閉じた折れ線にする
+	result = []
+	for loop in trace_loops(kept, points):
+		coords = points[loop]
+		area = np.sum(coords[:, 0] * np.roll(coords[:, 1], -1) - np.roll(coords[:, 0], -1) * coords[:, 1]) / 2
+		if len(loop) >= 3 and abs(area) > tolerance * tolerance:
+			result.append(coords)
+	return result
+
+
+
+
+
+def cut_polygon(polygon: np.ndarray, cutouts: list[np.ndarray], tolerance: float) -> list[np.ndarray]:
+	"""
+	多角形から、いくつかの多角形をくり抜いた面を、穴の無い多角形のリストとして求める。
+	くり抜く多角形が面の内側に収まって穴になる場合は、穴の周りを三角形に分割する。
+
+	Parameters
+	----------
+	polygon : np.ndarray
+		面の頂点の(N, 2)の配列。反時計回り。
+	cutouts : list[np.ndarray]
+		くり抜く多角形の頂点の(M, 2)の配列のリスト。どれも反時計回りで、互いに重ならない。
+	tolerance : float
+		同じ点とみなす距離。
+
+	Returns
+	-------
+	list[np.ndarray]
+		穴の無い多角形の頂点の配列のリスト。
+	"""
+	loops = [polygon]
+	for cutout in cutouts:
+		minimum = np.min(np.concatenate(loops), axis=0)
+		maximum = np.max(np.concatenate(loops), axis=0)
+		if np.any(np.min(cutout, axis=0) > maximum + tolerance) or np.any(np.max(cutout, axis=0) < minimum - tolerance):
+			continue
+		loops = subtract_polygon(loops, cutout, tolerance)
+		if not loops:
+			return []
+
+	def signed_area(loop: np.ndarray) -> float:
+		return np.sum(loop[:, 0] * np.roll(loop[:, 1], -1) - np.roll(loop[:, 0], -1) * loop[:, 1]) / 2
+
+	outers = [loop for loop in loops if signed_area(loop) > 0]
+	holes = [loop for loop in loops if signed_area(loop) < 0]
+	if not holes:
+		return outers
+
+	# 穴を持つ外周は三角形に分割する（三角形は後で穴ができない範囲でつなげ直される）
+	polygons = []
+	for outer in outers:
+		inner = [hole for hole in holes if points_in_loops((hole[:1] + hole[1:2]) / 2, [outer])[0]]
+		if not inner:
+			polygons.append(outer)
+			continue
+		coords = np.concatenate([outer] + inner)
+		for triangle in mathutils.geometry.tessellate_polygon([loop.tolist() for loop in [outer] + inner]):
+			polygons.append(coords[list(triangle)])
+	return polygons
+
+
+
+
+
+def make_extrusion_profile(vertices: list[Vector | tuple[float, float, float]], faces: list[list[int]], merge_distance: float = 0.0001, cutouts: list[np.ndarray] | None = None) -> ExtrusionProfile:
+	"""
+	辺を共有するいくつもの面でできた断面を、掃引するための境界と面にまとめる。
+	面を1つずつ掃引すると面どうしの間に内部の壁ができるが、共有する辺を除いた境界だけを掃引すれば、内部の壁を作ってから削除する必要は無い。
+
+	- `cutouts`を指定した場合は、掃引する前に面ごとにくり抜いておく（掃引した立体をブーリアンでくり抜く必要は無い）。
+	- `merge_distance`以内にある頂点は1つにまとめ、面の向きは反時計回りに揃える。
+	- 共有する辺で隣り合う面は、穴の無い1つの面になる限りつなげる（空洞を囲む場合は、つながずに残した辺で面が分かれる）。
+	- 境界上で直線の途中にある頂点のうち、1つの面にしか使われていないものは取り除く。
+
+	Parameters
+	----------
+	vertices : list[Vector | tuple[float, float, float]]
+		XY平面上の頂点のリスト。Z座標は無視する。
+	faces : list[list[int]]
+		面を構成する頂点インデックスのリスト。面の向きは揃っていなくてよい。
+	merge_distance : float, optional
+		同じ頂点とみなす距離。
+	cutouts : list[np.ndarray] | None, optional
+		断面からくり抜く穴の多角形の頂点の(M, 2)の配列のリスト。どれも反時計回りで、互いに重ならない。
+
+	Returns
+	-------
+	ExtrusionProfile
+		使われている頂点だけを詰めた頂点、境界、面。
+	"""
+	coords = np.array([(v[0], v[1]) for v in vertices], dtype=np.float64)
+
+	# 面ごとに穴をくり抜く。辺の上の交点は、隣の面でも同じ位置に作られるので、次の頂点をまとめる処理でつながる
+	if cutouts:
+		polygons = []
+		for face in faces:
+			polygon = coords[face]
+			if np.sum(polygon[:, 0] * np.roll(polygon[:, 1], -1) - np.roll(polygon[:, 0], -1) * polygon[:, 1]) < 0:
+				polygon = polygon[::-1]
+			polygons.extend(cut_polygon(polygon, cutouts, tolerance=merge_distance))
+		coords = np.concatenate(polygons) if polygons else np.zeros((0, 2))
+		sizes = [len(polygon) for polygon in polygons]
+		faces = [list(range(start, start + size)) for start, size in zip(np.cumsum([0] + sizes[:-1]).tolist(), sizes)]
+
+	# 近い頂点をまとめる
+	tree = mathutils.kdtree.KDTree(len(coords))
+	for i, (x, y) in enumerate(coords.tolist()):
+		tree.insert((x, y, 0), i)
+	tree.balance()
+	representative = [min(index for _, index, _ in tree.find_range((x, y, 0), merge_distance)) for x, y in coords.tolist()]
+
+	# 面を反時計回りの辞書にする
+	loops = []
+	for face in faces:
+		face = [representative[i] for i in face]
+		face = [v for i, v in enumerate(face) if v != face[i - 1]]
+		points = coords[face]
+		if np.sum(points[:, 0] * np.roll(points[:, 1], -1) - np.roll(points[:, 0], -1) * points[:, 1]) < 0:
+			face.reverse()
+		loops.append(dict(zip(face, face[1:] + face[:1])))
+
+	# 辺を共有する面の組。共有しない辺が境界になる
+	edge_faces = {(v1, v2): face_index for face_index, loop in enumerate(loops) for v1, v2 in loop.items()}
+	adjacent_pairs = sorted({(min(face_index, edge_faces[(v2, v1)]), max(face_index, edge_faces[(v2, v1)])) for (v1, v2), face_index in edge_faces.items() if (v2, v1) in edge_faces})
+	boundary = [(v1, v2) for v1, v2 in edge_faces if (v2, v1) not in edge_faces]
+
+	# 隣り合う面をつなげる。つなげられなかった組も、他の面とつながった後でつなげられることがあるので、変化が無くなるまで繰り返す
+	parents = list(range(len(loops)))
+	def find(i: int) -> int:
+		while parents[i] != i:
+			parents[i] = parents[parents[i]]
+			i = parents[i]
+		return i
+
+	changed = True
+	while changed:
+		changed = False
+		for face1, face2 in adjacent_pairs:
+			root1, root2 = find(face1), find(face2)
+			if root1 == root2:
+				continue
+			merged = merge_face_loops(loops[root1], loops[root2])
+			if merged is not None:
+				loops[root1] = merged
+				parents[root2] = root1
+				changed = True
+	cap_loops = [loops[i] for i in range(len(loops)) if find(i) == i]
+
+	# 境界上で直線の途中にあり、1つの面にしか使われていない頂点を取り除く。穴が接して境界が2回通る頂点は残す
+	next_vertices = {}
+	previous_vertices = {}
+	for v1, v2 in boundary:
+		next_vertices.setdefault(v1, []).append(v2)
+		previous_vertices.setdefault(v2, []).append(v1)
+	face_counts = {}
+	for loop in cap_loops:
+		for v in loop:
+			face_counts[v] = face_counts.get(v, 0) + 1
+	removed = set()
+	for v in list(next_vertices):
+		if len(next_vertices[v]) != 1 or face_counts[v] != 1:
+			continue
+		(p,), (n,) = previous_vertices[v], next_vertices[v]
+		if p == n:
+			continue
+		d1 = coords[v] - coords[p]
+		d2 = coords[n] - coords[v]
+		if np.dot(d1, d2) > 0 and abs(d1[0] * d2[1] - d1[1] * d2[0]) <= merge_distance * np.linalg.norm(d1 + d2):
+			next_vertices[p][next_vertices[p].index(v)] = n
+			previous_vertices[n][previous_vertices[n].index(v)] = p
+			removed.add(v)
+			for loop in cap_loops:
+				if v in loop:
+					loop[p] = n
+					del loop[v]
+
+	# 使われている頂点だけに詰める
+	boundary_loops = trace_loops([(v1, v2) for v1, targets in next_vertices.items() if v1 not in removed for v2 in targets], coords)
+	cap_faces = [loop_to_list(loop, min(loop)) for loop in cap_loops]
+
+	used = sorted({v for face in cap_faces for v in face})
+	remap = {v: i for i, v in enumerate(used)}
+	return ExtrusionProfile(
+		vertices=coords[used],
+		boundary_loops=[[remap[v] for v in loop] for loop in boundary_loops],
+		faces=[[remap[v] for v in face] for face in cap_faces])
+
+
+
+
+
+def create_extruded_profile_object(profile: ExtrusionProfile, length: float, name: str) -> bpy.types.Object:
+	"""
+	`make_extrusion_profile`でまとめた断面をZ軸プラス方向に掃引したオブジェクトを作成する。
+	側面は境界の辺だけから作るので、内部の壁や重複する頂点はできない。
+
+	Parameters
+	----------
+	profile : ExtrusionProfile
+		断面の頂点、境界、面。
+	length : float
+		掃引する長さ。
+	name : str
+		作成されるオブジェクトの名前。
+
+	Returns
+	-------
+	bpy.types.Object
+		作成されたオブジェクト。シーンにはリンクされていない。
+	"""
+	num_vertices = len(profile.vertices)
+	coords = np.zeros((num_vertices * 2, 3))
+	coords[:num_vertices, :2] = profile.vertices
+	coords[num_vertices:, :2] = profile.vertices
+	coords[num_vertices:, 2] = length
+
+	# 側面は境界の辺ごとの四角形。境界は断面の内側を左手に見て進むので、この順番で外向きになる
+	starts = np.concatenate([np.array(loop) for loop in profile.boundary_loops])
+	ends = np.concatenate([np.roll(np.array(loop), -1) for loop in profile.boundary_loops])
+	walls = np.column_stack((starts, ends, ends + num_vertices, starts + num_vertices))
+
+	# 底面は下向き、上面は上向き
+	faces = [face[::-1] for face in profile.faces] + [[v + num_vertices for v in face] for face in profile.faces] + walls.tolist()
+	loop_vertex_indices, loop_starts = make_mesh_buffers(faces)
+	return create_object_from_buffers(coords, loop_vertex_indices, loop_starts, name=name)
+
+
+
+
+
+
+
+
+
+
+def remove_decimal_trailing_zeros(value: float) -> str:
+	"""数値を文字列に変換し、小数点以下の右端に0があれば削除する。"""
+	s = f'{value:.3f}'
+	if '.' in s:
+		s = s.rstrip('0')
+		if s[-1] == '.':
+			s = s[0:-1]
+	return s
+
+
+
+
+
+
+
+
+
+
+def units_to_string(value, category=bpy.utils.units.categories.LENGTH, removeSpace=False):
+	"""
+	Blender内の単位を文字列に変換する。
+
+	Parameters
+	----------
+	value : float
+		変換する単位の値。
+	category : str, optional
+		変換する単位のカテログリ。bpy.utils.units.categoriesの定数。デフォルトは 'LENGTH'。
+	removeSpace : bool, optional
+		結果の文字列からスペースを削除するかどうか。デフォルトはFalse。
+
+	Returns
+	-------
+	str
+		変換された単位の文字列。
+
+	Examples
+	--------
+	>>> units_to_string(2)
+	'2 m'
+	>>> units_to_string(2, True)
+	'2m'
+	"""
+	if category == bpy.utils.units.categories.LENGTH:
+		s = bpy.utils.units.to_string(unit_system=bpy.context.scene.unit_settings.system, unit_category=category, value=value * bpy.context.scene.unit_settings.scale_length)
+	else:
+		s = bpy.utils.units.to_string(unit_system=bpy.context.scene.unit_settings.system, unit_category=category, value=value)
+
+	# スペースの削除
+	if removeSpace:
+		s = s.replace(' ', '')
+
+	return s
+
+
+
+
+
+def rotated_vector(vector: Vector, angle_radians: float, axis: Literal['X', 'Y', 'Z']) -> Vector:
+	"""原点周りで回転したベクトルを生成して返す。
+
+	Parameters
+	----------
+	vector : Vector
+		元になるベクトル。
+	angle_radians : float
+		ラジアン単位の回転角度。
+	axis : Literal['X', 'Y', 'Z']
+		回転軸。Matrix.Rotationメソッドにそのまま渡される。
+
+	Returns
+	-------
+	Vector
+		回転したベクトル。新しいベクトルが生成されて返される。
+	"""
+	v = vector.copy()
+	v.rotate(mathutils.Matrix.Rotation(angle_radians, 4, axis))
+	return v
+
+
+
+
+
+
+
+
+
+
+def rotate_object(object: bpy.types.Object, degrees: float, axis: Literal['X', 'Y', 'Z']) -> None:
+	"""
+	オブジェクト内のすべての頂点を原点周りで回転する
+
+	Parameters
+	----------
+	object : bpy.types.Object
+		回転する頂点を持つオブジェクト。
+	axis : Literal['X', 'Y', 'Z']
+		回転軸。`Matrix.Rotation`メソッドにそのまま渡される。
+	"""
+	bm = bmesh.new()
+	count_event('bmesh_round_trip')
+	bm.from_mesh(object.data)
+	bmesh.ops.rotate(bm, verts=bm.verts, cent=(0.0, 0.0, 0.0), matrix=mathutils.Matrix.Rotation(math.radians(degrees), 4, axis))
+	bm.to_mesh(object.data)
+	bm.clear()
+	object.data.update()
+	bm.free()
+
+
+
+
+
+
+
+
+
+
+def rotate_vertices(vertices: list[Vector | tuple[float, float, float]], degrees: float, axis: Literal['X', 'Y', 'Z']) -> None:
+	"""
+	Vectorまたは座標を表すタプルの配列のすべての頂点を原点周りで回転する
+
+	Parameters
+	----------
+	vertices : list[Vector | tuple[float, float, float]]
+		回転する頂点を含むVectorまたは座標を表すタプルの配列。
+	axis : Literal['X', 'Y', 'Z']
+		回転軸。`Matrix.Rotation`メソッドにそのまま渡される。
+	"""
+	for i in range(len(vertices)):
+		v = vertices[i]
+		if isinstance(v, mathutils.Vector):
+			v.rotate(mathutils.Matrix.Rotation(math.radians(degrees), 4, axis))
+			vertices[i] = v
+		else:
+			vec = Vector(v)
+			vec.rotate(mathutils.Matrix.Rotation(math.radians(degrees), 4, axis))
+			vertices[i] = vec.to_tuple()
+
+
+
+
+
+
+
+
+
+
+def project_to_xy(v: Vector) -> Vector:
+	"""ベクトルのZ成分を0にしてXY平面に投影する。"""
+	return Vector((v.x, v.y, 0))
+
+
+
+
+
+
+
+
+
+
+def project_to_xz(v: Vector) -> Vector:
+	"""ベクトルのY成分を0にしてXZ平面に投影する。"""
+	return Vector((v.x, 0, v.z))
+
+
+
 
-	ccw : bool, optional
-		True の場合、左回りに作成する。ディフォルトでは False で見回り。
+
+
+
+
+
+
+def calc_angle(peak: Vector, point1: Vector, point2: Vector) -> float:
+	"""peakからpoint1へのベクトルと、peakからpoint2へのベクトルのなす角度を計算する。"""
+	v1 = point1 - peak
+	v2 = point2 - peak
+	return math.acos(v1.dot(v2) / (v1.magnitude * v2.magnitude))
+
+
+
+
+
+
+
+
+
+
+# モディファイアを`bpy.ops.object.modifier_apply`で適用する場合は、環境変数`ROMLY_APPLY_MODIFIERS_WITH_OPERATOR`を1にする
+APPLY_MODIFIERS_WITH_OPERATOR_FLAG = 'APPLY_MODIFIERS_WITH_OPERATOR'
+
+
+
+
+
+def apply_modifier(obj: bpy.types.Object, modifier: bpy.types.Modifier) -> None:
+	"""
+	モディファイアを適用する。
+	オペレーターは使わず、評価済みのオブジェクトから`new_from_object`で作ったメッシュをオブジェクトのメッシュと差し替える。
+	アクティブオブジェクトや選択状態、アンドゥの履歴を変更しないので、コンテキストに依存せずにバックグラウンドでも使える。
+
+	Parameters
+	----------
+	obj : bpy.types.Object
+		対象のオブジェクト。ビューレイヤーにリンクされていること。
+	modifier : bpy.types.Modifier
+		適用するモディファイア。`obj`のモディファイアであること。
 
 	Notes
 	-----
-	この関数は`vertices`と`faces`を直接変更します。メッシュデータは呼び出し元で管理する必要があります。
+	`modifier_apply`と同じく、指定したモディファイアだけを元のメッシュに適用する。他のモディファイアは評価中だけ無効にして、そのまま残す。
+	メッシュが複数のオブジェクトに共有されている場合やビューレイヤーに無い場合は、これまで通りオペレーターで適用する。
 	"""
-	def append_revolution_vertices(vertices: list[Vector], faces: list[list[int]], num_revolution_vertices: int, rotation_matrix: Matrix, z_offset: float, close: bool):
-		temp_vertices = []
-		for j in range(num_revolution_vertices):
-			current = vertices[len(vertices) - num_revolution_vertices + j]
-			v = current.copy() if isinstance(current, Vector) else Vector(current)
-			v.z += z_offset
-			v.rotate(rotation_matrix)
-			temp_vertices.append(v)
-		for j in range(len(temp_vertices)):
-			vertices.append(temp_vertices[j])
-
-		# 面を張る
-		current_vertex_count = len(vertices)
-		for j in range(num_revolution_vertices - 1):
-			faces.append([
-				current_vertex_count - num_revolution_vertices * 2 + j,
-				current_vertex_count - num_revolution_vertices * 2 + 1 + j,
-				current_vertex_count - num_revolution_vertices + 1 + j,
-				current_vertex_count - num_revolution_vertices + j])
-		if close:
-			faces.append([
-				current_vertex_count - num_revolution_vertices * 2 + num_revolution_vertices - 1,
-				current_vertex_count - num_revolution_vertices * 2,
-				current_vertex_count - num_revolution_vertices,
-				current_vertex_count - num_revolution_vertices + num_revolution_vertices - 1])
+	count_event('modifier_apply')
+	view_layer = bpy.context.view_layer
+	if legacy_flag(APPLY_MODIFIERS_WITH_OPERATOR_FLAG) or obj.data.users > 1 or view_layer.objects.get(obj.name) != obj:
+		view_layer.objects.active = obj
+		bpy.ops.object.modifier_apply(modifier=modifier.name)
+		return
+
+	# 他のモディファイアは評価中だけ無効にする
+	others = [mod for mod in obj.modifiers if mod != modifier and mod.show_viewport]
+	for mod in others:
+		mod.show_viewport = False
+	modifier.show_viewport = True
+
+	try:
+		depsgraph = bpy.context.evaluated_depsgraph_get()
+		new_mesh = bpy.data.meshes.new_from_object(obj.evaluated_get(depsgraph), preserve_all_data_layers=True, depsgraph=depsgraph)
+	finally:
+		for mod in others:
+			mod.show_viewport = True
 
+	obj.modifiers.remove(modifier)
+	old_mesh = obj.data
+	name = old_mesh.name
+	obj.data = new_mesh
+	bpy.data.meshes.remove(old_mesh)
+	new_mesh.name = name
 
 
-	degree_per_segment = 360.0 / segments
-	count = math.floor(rotation_degree / degree_per_segment)
 
-	radians = -math.radians(degree_per_segment)
-	if ccw:
-		radians = -radians
-	rot = mathutils.Matrix.Rotation(radians, 4, 'Z')
 
-	for _ in range(count):
-		# 頂点を複製して面を貼る
-		append_revolution_vertices(vertices, faces, num_revolution_vertices=rotation_vertex_count, rotation_matrix=rot, z_offset=z_offset / segments, close=close)
 
-	remain_degree = rotation_degree - (count * degree_per_segment)
-	if remain_degree > 0.0:
-		radians = -math.radians(remain_degree)
-		if ccw:
-			radians = -radians
-		rot = mathutils.Matrix.Rotation(radians, 4, 'Z')
 
-		# 頂点を複製して面を貼る
-		append_revolution_vertices(vertices, faces, num_revolution_vertices=rotation_vertex_count, rotation_matrix=rot, z_offset=z_offset * (remain_degree / 360), close=close)
+
+
+
+
+def apply_boolean_object(object, boolObject, operation='DIFFERENCE', use_self=False, unlink=True, apply=True, fast_solver=False, use_hole_torelant=False):
+	"""
+	ブーリアンモデファイア(Difference)を使ってメッシュをもう一方のメッシュの形状で削る。
+
+	Parameters
+	----------
+	object : Mesh
+		元となるメッシュ。
+	boolObject : Mesh
+		ブーリアンモデファイアに設定されるメッシュ。シーンにリンクされていないとエラーになる。
+	unlink : Bool
+		処理後にboolObjectをシーンからアンリンクするか。
+	apply : Bool, optional
+		ブーリアンモデファイアを適用するかどうか。デフォルトはTrue。
+	use_hole_torelant: Bool, optional
+		穴を許容
+	"""
+	with profile_stage('boolean'):
+		mod = object.modifiers.new(type='BOOLEAN', name='Boolean')
+		mod.operation = operation
+		mod.object = boolObject
+		mod.use_self = use_self
+		mod.use_hole_tolerant = use_hole_torelant
+		if fast_solver:
+			mod.solver = 'FAST'
+		if apply:
+			apply_modifier(object, mod)
+		if unlink:
+			bpy.context.collection.objects.unlink(boolObject)
+
 
 
 
@@ -888,91 +2825,103 @@ def add_revolved_surface(vertices: list[Vector], faces: list[list[int]], rotatio
 
 
 
-def cleanup_mesh(object: bpy.types.Object, remove_doubles=True, recalc_normals=True):
+def create_merged_object(objects: list[bpy.types.Object], matrices: list[Matrix] = None, name: str = 'Merged') -> bpy.types.Object:
 	"""
-	メッシュオブジェクトの重複する頂点を削除し、法線を再計算することでメッシュをクリーンアップする。
+	複数のオブジェクトのメッシュを、それぞれの変換（位置・回転・拡大縮小）を頂点に適用した状態でひとつのオブジェクトにまとめる。
+	`matrices`を指定すると、同じオブジェクトを複数の位置に配置したものもまとめられる。
 
 	Parameters
 	----------
-	object : bpy.types.Object
-		クリーンアップするメッシュオブジェクト
-	remove_doubles : bool, optional
-		True の場合、重複する頂点を削除します。デフォルトは True。
-	recalc_normals : bool, optional
-		True の場合、法線を再計算します。デフォルトは True。
+	objects : list[bpy.types.Object]
+		まとめるオブジェクトのリスト。同じオブジェクトが何度含まれていてもよい。
+	matrices : list[Matrix], optional
+		`objects`の各要素に適用する変換行列のリスト。省略した場合は各オブジェクトの`matrix_basis`が使われる。
+		鏡像反転を含む行列の場合は、面の向きが保たれるように頂点の並びを逆にする。
+	name : str, optional
+		作成されるオブジェクトの名前。
 
 	Returns
 	-------
 	bpy.types.Object
+		まとめたオブジェクト。変換は単位行列で、シーンにはリンクされていない。
 	"""
-	bm = bmesh.new()
-	bm.from_mesh(object.data)
-	if remove_doubles:
-		bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
-	if recalc_normals:
-		bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
-	bm.to_mesh(object.data)
-	bm.clear()
-	object.data.update()
-	bm.free()
-	return object
+	if matrices is None:
+		matrices = [obj.matrix_basis.copy() for obj in objects]
 
+	coords_list = []
+	loops_list = []
+	loop_starts_list = []
+	vertex_index_offset = 0
+	loop_index_offset = 0
+	for obj, matrix in zip(objects, matrices):
+		coords, loops, loop_starts = get_mesh_buffers(obj, dtype=np.float64)
+		matrix = np.array(matrix, dtype=np.float64)
+		coords_list.append(coords @ matrix[:3, :3].T + matrix[:3, 3])
 
+		# 鏡像反転する行列の場合は面の向きが裏返るので、各面の頂点の並びを逆にする
+		if np.linalg.det(matrix[:3, :3]) < 0:
+			loop_totals = np.diff(np.append(loop_starts, len(loops)))
+			starts = np.repeat(loop_starts, loop_totals)
+			ends = np.repeat(loop_starts + loop_totals - 1, loop_totals)
+			loops = loops[starts + ends - np.arange(len(loops))]
 
+		loops_list.append(loops + vertex_index_offset)
+		loop_starts_list.append(loop_starts + loop_index_offset)
 
+		vertex_index_offset += len(coords)
+		loop_index_offset += len(loops)
 
+	return create_object_from_buffers(np.concatenate(coords_list), np.concatenate(loops_list), np.concatenate(loop_starts_list), name=name)
 
 
 
 
 
-def extrude_face(vertices: list[Vector | tuple[float, float, float]], faces: list[list[int]], extrude_vertex_indices: list[int], z_offset: float = 1, offset: Vector = None, cap=True):
+
+
+
+
+
+def apply_boolean_objects(object: bpy.types.Object, boolObjects: list[bpy.types.Object], matrices: list[Matrix] = None, operation='DIFFERENCE', use_self=False, unlink=True, apply=True, fast_solver=False, use_hole_torelant=False) -> None:
 	"""
-	指定された面を掃引して、新しくできた頂点と面を追加する。
+	複数のオブジェクトをひとつにまとめてから、一度のブーリアンでまとめて削る（または結合する）。
+	穴ごとにブーリアンを適用すると、そのたびに大きくなっていくメッシュ全体にソルバーが走るので、穴の数が多いほど差が出る。
 
 	Parameters
 	----------
-	vertices : list[Vector | tuple[float, float, float]]
-		頂点のリスト
-	faces : list[list[int]]
-		面を構成する頂点インデックスのリスト
-	extrude_vertex_indices : list[int]
-		掃引する頂点のインデックスのリスト。頂点(Vector)のリストじゃないので注意してね。
-	z_offset : float
-		掃引する距離
-	cap : bool, optional
-		掃引したすべての頂点を結ぶ面を作るか。つまり、面をキャップ（閉じる）するかどうか。
+	object : bpy.types.Object
+		元となるオブジェクト。
+	boolObjects : list[bpy.types.Object]
+		ブーリアンに使うオブジェクトのリスト。同じオブジェクトを`matrices`で複数の位置に配置してもよい。
+	matrices : list[Matrix], optional
+		`boolObjects`の各要素の変換行列。省略した場合は各オブジェクトの現在の変換が使われる。
+	use_self : bool, optional
+		ブーリアンに使うオブジェクト同士が重なる場合はTrueにする（正確ソルバーの「セルフ交差」）。
+	unlink : bool, optional
+		処理後に`boolObjects`をシーンからアンリンクするか。
+	apply : bool, optional
+		ブーリアンモデファイアを適用するかどうか。Falseの場合、まとめたオブジェクトはシーンに残る。
+	fast_solver : bool, optional
+		高速ソルバーを使うかどうか。
+	use_hole_torelant : bool, optional
+		穴を許容
+
+	Notes
+	-----
+	その他の引数は`apply_boolean_object`と同じ。
 	"""
-	# 各頂点を掃引した位置に複製する
-	for i in extrude_vertex_indices:
-		if isinstance(vertices[i], Vector):
-			v = vertices[i].copy()
-		else:
-			v = Vector((vertices[i][0], vertices[i][1], vertices[i][2]))
-		if offset:
-			v += offset
-		else:
-			v.z += z_offset
-		vertices.append(v)
+	with profile_stage('boolean'):
+		if len(boolObjects) == 0:
+			return
 
-	l = len(vertices)
-	numExtrudeFaceVertices = len(extrude_vertex_indices)
-	for i in range(numExtrudeFaceVertices):
-		if i == numExtrudeFaceVertices - 1:
-			faces.append([
-				extrude_vertex_indices[i],
-				extrude_vertex_indices[0],
-				l - numExtrudeFaceVertices,
-				l - numExtrudeFaceVertices + i])
-		else:
-			faces.append([
-				extrude_vertex_indices[i],
-				extrude_vertex_indices[i + 1],
-				l - numExtrudeFaceVertices + i + 1,
-				l - numExtrudeFaceVertices + i])
+		cutter = create_merged_object(boolObjects, matrices=matrices, name=boolObjects[0].name)
+		bpy.context.collection.objects.link(cutter)
+		apply_boolean_object(object, cutter, operation=operation, use_self=use_self, unlink=apply, apply=apply, fast_solver=fast_solver, use_hole_torelant=use_hole_torelant)
 
-	if cap:
-		faces.append(list(reversed(range(l - numExtrudeFaceVertices, l))))
+		if unlink:
+			for obj in set(boolObjects):
+				if bpy.context.collection.objects.get(obj.name) == obj:
+					bpy.context.collection.objects.unlink(obj)
 
 
 
@@ -983,15 +2932,51 @@ def extrude_face(vertices: list[Vector | tuple[float, float, float]], faces: lis
 
 
 
-def remove_decimal_trailing_zeros(value: float) -> str:
-	"""数値を文字列に変換し、小数点以下の右端に0があれば削除する。"""
-	s = f'{value:.3f}'
-	if '.' in s:
-		s = s.rstrip('0')
-		if s[-1] == '.':
-			s = s[0:-1]
-	return s
+def apply_bevel_modifier(obj: bpy.types.Object, width: float, segments: int = 1) -> None:
+	with profile_stage('bevel'):
+		bevel_modifier = obj.modifiers.new(name='Bevel', type='BEVEL')
+		bevel_modifier.offset_type = 'OFFSET'
+		bevel_modifier.use_clamp_overlap = True
+		bevel_modifier.limit_method = 'WEIGHT'
+		bevel_modifier.width = width
+		bevel_modifier.segments = segments
+		bevel_modifier.profile = 0.5
+		apply_modifier(obj, bevel_modifier)
+
+
+
+
+
+
+
+
+
+
+def apply_bevel_modifier_to_edges(obj: bpy.types.Object, width: float, edge_select_func: Callable[[bmesh.types.BMEdge], bool] | None = None, segments: int = 1, edge_mask_func: Callable[['EdgeAdjacencyIndex'], np.ndarray] | None = None) -> None:
+	"""
+	条件に合った辺にベベルウェイトを設定して、ベベルモディファイアを適用する。
+
+	Parameters
+	----------
+	obj : bpy.types.Object
+		対象のオブジェクト。
+	width : float
+		ベベルの幅。
+	edge_select_func : Callable[[bmesh.types.BMEdge], bool] | None, optional
+		辺ごとにベベルするかどうかを返す関数。
+	segments : int, optional
+		ベベルのセグメント数。
+	edge_mask_func : Callable[[EdgeAdjacencyIndex], np.ndarray] | None, optional
+		`EdgeAdjacencyIndex`を受け取り、ベベルする辺のマスクを返す関数。指定した場合は`edge_select_func`の代わりにこちらで全ての辺をまとめて判定する。
+	"""
+	# 辺を選択してから選択中の辺に設定する代わりに、ベベルウェイトを直接書き込む
+	if edge_mask_func is not None:
+		set_edge_bevel_weight_by_mask(obj, edge_mask_func(get_edge_adjacency_index(obj.data)))
+	else:
+		set_edge_bevel_weight_by_condition(obj, edge_select_func)
 
+	# ベベルモディファイアを追加、適用
+	apply_bevel_modifier(obj, width, segments=segments)
 
 
 
@@ -1001,279 +2986,459 @@ def remove_decimal_trailing_zeros(value: float) -> str:
 
 
 
-def units_to_string(value, category=bpy.utils.units.categories.LENGTH, removeSpace=False):
+
+def calc_linked_face_dot(edge: bmesh.types.BMEdge) -> float | None:
 	"""
-	Blender内の単位を文字列に変換する。
+	辺を共有する2つの面の法線の内積を計算する。辺に対する面が2つでなかった場合はNoneを返す。
 
 	Parameters
 	----------
-	value : float
-		変換する単位の値。
-	category : str, optional
-		変換する単位のカテログリ。bpy.utils.units.categoriesの定数。デフォルトは 'LENGTH'。
-	removeSpace : bool, optional
-		結果の文字列からスペースを削除するかどうか。デフォルトはFalse。
+	edge : bmesh.types.BMEdge
+		内積を計算する辺。
 
 	Returns
 	-------
-	str
-		変換された単位の文字列。
-
-	Examples
-	--------
-	>>> units_to_string(2)
-	'2 m'
-	>>> units_to_string(2, True)
-	'2m'
+	float
+		法線の内積。
 	"""
-	if category == bpy.utils.units.categories.LENGTH:
-		s = bpy.utils.units.to_string(unit_system=bpy.context.scene.unit_settings.system, unit_category=category, value=value * bpy.context.scene.unit_settings.scale_length)
+	linked_faces = edge.link_faces
+	if len(linked_faces) == 2:
+		# 両面の法線を取得
+		n1 = linked_faces[0].normal
+		n2 = linked_faces[1].normal
+
+		# 法線の内積を計算
+		return n1.dot(n2)
 	else:
-		s = bpy.utils.units.to_string(unit_system=bpy.context.scene.unit_settings.system, unit_category=category, value=value)
+		return None
 
-	# スペースの削除
-	if removeSpace:
-		s = s.replace(' ', '')
 
-	return s
 
 
 
 
 
-def rotated_vector(vector: Vector, angle_radians: float, axis: Literal['X', 'Y', 'Z']) -> Vector:
-	"""原点周りで回転したベクトルを生成して返す。
 
-	Parameters
-	----------
-	vector : Vector
-		元になるベクトル。
-	angle_radians : float
-		ラジアン単位の回転角度。
-	axis : Literal['X', 'Y', 'Z']
-		回転軸。Matrix.Rotationメソッドにそのまま渡される。
 
-	Returns
-	-------
-	Vector
-		回転したベクトル。新しいベクトルが生成されて返される。
+
+class MeshArrays(NamedTuple):
 	"""
-	v = vector.copy()
-	v.rotate(mathutils.Matrix.Rotation(angle_radians, 4, axis))
-	return v
+	辺の隣接関係や面の法線の計算に使う、メッシュの配列。
+
+	Attributes
+	----------
+	coords : np.ndarray
+		頂点座標の(N, 3)のfloat32の配列。
+	edge_vertices : np.ndarray
+		辺の両端の頂点インデックスの(E, 2)の配列。
+	loop_vertices : np.ndarray
+		ループの頂点インデックスの配列。
+	loop_edges : np.ndarray
+		ループの辺インデックスの配列。
+	loop_starts : np.ndarray
+		各面の最初のループのインデックスの配列。
+	loop_totals : np.ndarray
+		各面のループの数の配列。
+	"""
+	coords: np.ndarray
+	edge_vertices: np.ndarray
+	loop_vertices: np.ndarray
+	loop_edges: np.ndarray
+	loop_starts: np.ndarray
+	loop_totals: np.ndarray
 
 
+	def calc_hash(self) -> bytes:
+		"""
+		頂点座標とトポロジーのハッシュを計算する。どれか1つでも変わればハッシュも変わる。
+		"""
+		h = hashlib.blake2b(digest_size=16)
+		for array in self:
+			h.update(struct.pack('<Q', array.size))
+			h.update(array.tobytes())
+		return h.digest()
 
 
 
 
 
+def read_mesh_attribute(mesh: bpy.types.Mesh, name: str, size: int, width: int, dtype: type) -> np.ndarray:
+	"""
+	メッシュの組み込みの属性を配列で読み込む。`mesh.vertices`などの`foreach_get`より何十倍も速い。
+	要素が無い場合は属性自体が存在しないので、空の配列を返す。
 
+	Parameters
+	----------
+	mesh : bpy.types.Mesh
+		対象のメッシュ。
+	name : str
+		属性の名前（`position`、`.edge_verts`、`.corner_vert`など）。
+	size : int
+		要素の数。
+	width : int
+		要素ごとの値の数。
+	dtype : type
+		配列の型。
+	"""
+	array = np.empty(size * width, dtype=dtype)
+	attribute = mesh.attributes.get(name)
+	if attribute is not None and size > 0:
+		attribute.data.foreach_get('vector' if attribute.data_type == 'FLOAT_VECTOR' else 'value', array)
+	return array.reshape(-1, width) if width > 1 else array
 
 
-def rotate_object(object: bpy.types.Object, degrees: float, axis: Literal['X', 'Y', 'Z']) -> None:
+
+
+
+def read_mesh_arrays(mesh: bpy.types.Mesh) -> MeshArrays:
 	"""
-	オブジェクト内のすべての頂点を原点周りで回転する
+	メッシュから`MeshArrays`を読み込む。
 
 	Parameters
 	----------
-	object : bpy.types.Object
-		回転する頂点を持つオブジェクト。
-	axis : Literal['X', 'Y', 'Z']
-		回転軸。`Matrix.Rotation`メソッドにそのまま渡される。
+	mesh : bpy.types.Mesh
+		対象のメッシュ。編集モードの場合は、先にオブジェクトモードに戻して編集内容を反映しておくこと。
 	"""
-	bm = bmesh.new()
-	bm.from_mesh(object.data)
-	bmesh.ops.rotate(bm, verts=bm.verts, cent=(0.0, 0.0, 0.0), matrix=mathutils.Matrix.Rotation(math.radians(degrees), 4, axis))
-	bm.to_mesh(object.data)
-	bm.clear()
-	object.data.update()
-	bm.free()
+	coords = read_mesh_attribute(mesh, 'position', len(mesh.vertices), 3, np.float32)
+	edge_vertices = read_mesh_attribute(mesh, '.edge_verts', len(mesh.edges), 2, np.int32)
+	loop_vertices = read_mesh_attribute(mesh, '.corner_vert', len(mesh.loops), 1, np.int32)
+	loop_edges = read_mesh_attribute(mesh, '.corner_edge', len(mesh.loops), 1, np.int32)
+	loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+	mesh.polygons.foreach_get('loop_start', loop_starts)
+	loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+	mesh.polygons.foreach_get('loop_total', loop_totals)
+	return MeshArrays(coords, edge_vertices, loop_vertices, loop_edges, loop_starts, loop_totals)
+
 
 
 
 
+def get_edge_linked_face_pairs(arrays: MeshArrays) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	ちょうど2つの面に共有されている辺と、その2つの面のインデックスを配列で取得する。
+	`edge.link_faces`を辺ごとに調べる代わりに、ループの辺インデックスから一度にまとめて求める。
+
+	Parameters
+	----------
+	arrays : MeshArrays
+		対象のメッシュの配列。
 
+	Returns
+	-------
+	tuple[np.ndarray, np.ndarray]
+		辺のインデックスの(K)の配列と、それぞれの辺を共有する2つの面のインデックスの(K, 2)の配列。
+	"""
+	# 各ループがどの面に属するか（Blender 3.6以降、面のループは面の順番に隙間なく並んでいる）
+	loop_faces = np.repeat(np.arange(len(arrays.loop_totals), dtype=np.int32), arrays.loop_totals)
 
+	# 辺ごとにループをまとめ、ループが2つの辺（2つの面に共有されている辺）だけを取り出す
+	counts = np.bincount(arrays.loop_edges, minlength=len(arrays.edge_vertices))
+	order = np.argsort(arrays.loop_edges, kind='stable')
+	firsts = np.cumsum(counts) - counts
+	edges = np.flatnonzero(counts == 2)
+	faces = np.stack([loop_faces[order[firsts[edges]]], loop_faces[order[firsts[edges] + 1]]], axis=1)
+	return edges, faces
 
 
 
 
-def rotate_vertices(vertices: list[Vector | tuple[float, float, float]], degrees: float, axis: Literal['X', 'Y', 'Z']) -> None:
+
+def calc_face_normals(arrays: MeshArrays) -> np.ndarray:
 	"""
-	Vectorまたは座標を表すタプルの配列のすべての頂点を原点周りで回転する
+	面の法線をbmeshの`BMFace.normal`と同じ計算方法・精度で求める。
+	メッシュの`polygon.normal`は計算方法が違い、平面上の面でも最後の桁がずれることがあるので、`calc_linked_face_dot`と同じ結果が必要な場合はこちらを使う。
+	（三角形と四角形は対角線の外積、それ以上はNewell法で、すべてfloat32で計算する。面積が0の面は0ベクトルになる）
 
 	Parameters
 	----------
-	vertices : list[Vector | tuple[float, float, float]]
-		回転する頂点を含むVectorまたは座標を表すタプルの配列。
-	axis : Literal['X', 'Y', 'Z']
-		回転軸。`Matrix.Rotation`メソッドにそのまま渡される。
+	arrays : MeshArrays
+		対象のメッシュの配列。
+
+	Returns
+	-------
+	np.ndarray
+		面の法線の(P, 3)のfloat32の配列。
 	"""
-	for i in range(len(vertices)):
-		v = vertices[i]
-		if isinstance(v, mathutils.Vector):
-			v.rotate(mathutils.Matrix.Rotation(math.radians(degrees), 4, axis))
-			object[i] = v
-		else:
-			vec = Vector(v)
-			vec.rotate(mathutils.Matrix.Rotation(math.radians(degrees), 4, axis))
-			object[i] = vec.to_tuple()
+	coords = arrays.coords
+	loops = arrays.loop_vertices
+	loop_starts = arrays.loop_starts
+	loop_totals = arrays.loop_totals
 
+	def cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+		return np.stack([
+			a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1],
+			a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2],
+			a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]], axis=1)
 
+	normals = np.zeros((len(loop_totals), 3), dtype=np.float32)
 
+	# 三角形
+	faces = np.flatnonzero(loop_totals == 3)
+	v1, v2, v3 = (coords[loops[loop_starts[faces] + i]] for i in range(3))
+	normals[faces] = cross(v1 - v2, v2 - v3)
 
+	# 四角形
+	faces = np.flatnonzero(loop_totals == 4)
+	v1, v2, v3, v4 = (coords[loops[loop_starts[faces] + i]] for i in range(4))
+	normals[faces] = cross(v1 - v3, v2 - v4)
 
+	# 多角形はNewell法。面ごとに頂点の順番で足していく
+	faces = np.flatnonzero(loop_totals > 4)
+	if len(faces) > 0:
+		starts = loop_starts[faces]
+		totals = loop_totals[faces]
+		newell = np.zeros((len(faces), 3), dtype=np.float32)
+		v_prev = coords[loops[starts + totals - 1]]
+		for i in range(totals.max()):
+			active = totals > i
+			v_curr = coords[loops[starts[active] + i]]
+			p = v_prev[active]
+			newell[active, 0] += (p[:, 1] - v_curr[:, 1]) * (p[:, 2] + v_curr[:, 2])
+			newell[active, 1] += (p[:, 2] - v_curr[:, 2]) * (p[:, 0] + v_curr[:, 0])
+			newell[active, 2] += (p[:, 0] - v_curr[:, 0]) * (p[:, 1] + v_curr[:, 1])
+			v_prev[active] = v_curr
+		normals[faces] = newell
 
+	# 正規化
+	squared_lengths = normals[:, 0] * normals[:, 0] + normals[:, 1] * normals[:, 1] + normals[:, 2] * normals[:, 2]
+	valid = squared_lengths > np.float32(1.0e-35)
+	factors = np.zeros(len(normals), dtype=np.float32)
+	np.divide(np.float32(1.0), np.sqrt(squared_lengths), out=factors, where=valid)
+	return normals * factors[:, np.newaxis]
 
 
 
 
-def project_to_xy(v: Vector) -> Vector:
-	"""ベクトルのZ成分を0にしてXY平面に投影する。"""
-	return Vector((v.x, v.y, 0))
 
 
 
 
 
 
+# MARK: EdgeAdjacencyIndex
+class EdgeAdjacencyIndex:
+	"""
+	辺と面の隣接関係と、辺を共有する2つの面の法線の内積（二面角）をまとめて保持するインデックス。
+	一度作っておけば、閾値を変えて何度選択し直しても法線や内積を計算し直さなくて済む。
+	`get_edge_adjacency_index`で取得すると、頂点座標とトポロジーのハッシュをキーにしたキャッシュから使い回される。
 
+	Attributes
+	----------
+	arrays : MeshArrays
+		インデックスを作ったメッシュの配列。
+	linked_edges : np.ndarray
+		ちょうど2つの面に共有されている辺のインデックスの(K)の配列。
+	linked_faces : np.ndarray
+		`linked_edges`のそれぞれの辺を共有する2つの面のインデックスの(K, 2)の配列。
+	face_normals : np.ndarray
+		`BMFace.normal`と同じ精度の面の法線の(P, 3)の配列。
+	dots : np.ndarray
+		辺ごとの法線の内積の配列。辺に対する面が2つでない辺はNaN。
+	"""
+	def __init__(self, arrays: MeshArrays):
+		self.arrays = arrays
+		self.linked_edges, self.linked_faces = get_edge_linked_face_pairs(arrays)
+		self.face_normals = calc_face_normals(arrays)
+		self.dots = np.full(len(arrays.edge_vertices), np.nan)
+		self.dots[self.linked_edges] = dot_float_vectors(self.face_normals[self.linked_faces[:, 0]], self.face_normals[self.linked_faces[:, 1]])
+		self._edge_directions = None
 
 
 
-def project_to_xz(v: Vector) -> Vector:
-	"""ベクトルのY成分を0にしてXZ平面に投影する。"""
-	return Vector((v.x, 0, v.z))
+	@property
+	def num_edges(self) -> int:
+		return len(self.arrays.edge_vertices)
+
+
+
+	@property
+	def edge_coords(self) -> np.ndarray:
+		"""
+		辺の両端の頂点座標の(E, 2, 3)のfloat64の配列。
+		"""
+		return self.arrays.coords[self.arrays.edge_vertices].astype(np.float64)
+
 
 
+	@property
+	def edge_directions(self) -> np.ndarray:
+		"""
+		辺の向きの単位ベクトルの(E, 3)のfloat32の配列（mathutilsの`Vector.normalized`と同じ精度）。最初に使ったときに計算する。
+		"""
+		if self._edge_directions is None:
+			coords = self.arrays.coords
+			edge_vertices = self.arrays.edge_vertices
+			self._edge_directions = normalize_float_vectors(coords[edge_vertices[:, 1]] - coords[edge_vertices[:, 0]])
+		return self._edge_directions
 
 
 
+	def fair_edges(self, threshold_degree: float = 0) -> np.ndarray:
+		"""
+		平面上にある辺（隣接する面の法線の角度が閾値以下の辺）のマスクを返す。面が2つでない辺はFalse。
+		"""
+		with np.errstate(invalid='ignore'):
+			return self.dots >= math.cos(math.radians(threshold_degree))
 
 
 
+	def sharp_edges(self, threshold_degree: float = 0) -> np.ndarray:
+		"""
+		角になっている辺（隣接する面の法線の角度が閾値より大きい辺）のマスクを返す。面が2つでない辺はFalse。
+		"""
+		with np.errstate(invalid='ignore'):
+			return self.dots < math.cos(math.radians(threshold_degree))
 
 
-def calc_angle(peak: Vector, point1: Vector, point2: Vector) -> float:
-	"""peakからpoint1へのベクトルと、peakからpoint2へのベクトルのなす角度を計算する。"""
-	v1 = point1 - peak
-	v2 = point2 - peak
-	return math.acos(v1.dot(v2) / (v1.magnitude * v2.magnitude))
 
+	def edges_along_axis(self, axis: tuple[bool, bool, bool], threshold_degree: float = 0) -> np.ndarray:
+		"""
+		指定の軸に沿った辺（軸との角度が閾値以下の辺）のマスクを返す。複数の軸を指定した場合はどれかに沿っていればTrue。
+		"""
+		cos_value = math.cos(math.radians(threshold_degree))
+		mask = np.zeros(self.num_edges, dtype=bool)
+		for i in range(3):
+			if axis[i]:
+				# 辺の方向ベクトルの各成分が、そのまま各軸との内積になる
+				mask |= np.abs(self.edge_directions[:, i].astype(np.float64)) >= cos_value
+		return mask
 
 
 
+# 頂点座標とトポロジーのハッシュ -> EdgeAdjacencyIndex
+EDGE_ADJACENCY_CACHE: OrderedDict[bytes, EdgeAdjacencyIndex] = OrderedDict()
 
+# キャッシュに保持するインデックスの数
+EDGE_ADJACENCY_CACHE_SIZE = 8
 
 
 
 
 
-def apply_boolean_object(object, boolObject, operation='DIFFERENCE', use_self=False, unlink=True, apply=True, fast_solver=False, use_hole_torelant=False):
+def get_edge_adjacency_index(mesh: bpy.types.Mesh) -> EdgeAdjacencyIndex:
 	"""
-	ブーリアンモデファイア(Difference)を使ってメッシュをもう一方のメッシュの形状で削る。
+	メッシュの`EdgeAdjacencyIndex`を取得する。頂点座標とトポロジーが同じならキャッシュしてあるものを返す。
+	メッシュを編集するとハッシュが変わるので、古いインデックスが使われることはない。
 
 	Parameters
 	----------
-	object : Mesh
-		元となるメッシュ。
-	boolObject : Mesh
-		ブーリアンモデファイアに設定されるメッシュ。シーンにリンクされていないとエラーになる。
-	unlink : Bool
-		処理後にboolObjectをシーンからアンリンクするか。
-	apply : Bool, optional
-		ブーリアンモデファイアを適用するかどうか。デフォルトはTrue。
-	use_hole_torelant: Bool, optional
-		穴を許容
+	mesh : bpy.types.Mesh
+		対象のメッシュ。編集モードの場合は、先にオブジェクトモードに戻して編集内容を反映しておくこと。
 	"""
-	bpy.context.view_layer.objects.active = object
-	mod = bpy.context.object.modifiers.new(type='BOOLEAN', name='Boolean')
-	mod.operation = operation
-	mod.object = boolObject
-	mod.use_self = use_self
-	mod.use_hole_tolerant = use_hole_torelant
-	if fast_solver:
-		mod.solver = 'FAST'
-	if apply:
-		bpy.ops.object.modifier_apply(modifier=mod.name)
-	if unlink:
-		bpy.context.collection.objects.unlink(boolObject)
+	arrays = read_mesh_arrays(mesh)
+	key = arrays.calc_hash()
+	index = EDGE_ADJACENCY_CACHE.get(key)
+	if index is not None:
+		EDGE_ADJACENCY_CACHE.move_to_end(key)
+		return index
 
+	count_event('edge_adjacency_index_build')
+	index = EdgeAdjacencyIndex(arrays)
+	EDGE_ADJACENCY_CACHE[key] = index
+	while len(EDGE_ADJACENCY_CACHE) > EDGE_ADJACENCY_CACHE_SIZE:
+		EDGE_ADJACENCY_CACHE.popitem(last=False)
+	return index
 
 
 
 
 
+def calc_linked_face_dots(mesh: bpy.types.Mesh) -> np.ndarray:
+	"""
+	すべての辺について、辺を共有する2つの面の法線の内積を計算する。`calc_linked_face_dot`の配列版。
 
+	Parameters
+	----------
+	mesh : bpy.types.Mesh
+		対象のメッシュ。
 
+	Returns
+	-------
+	np.ndarray
+		辺ごとの法線の内積の配列。辺に対する面が2つでない辺はNaN。
+	"""
+	return get_edge_adjacency_index(mesh).dots.copy()
 
 
-def apply_bevel_modifier(obj: bpy.types.Object, width: float, segments: int = 1) -> None:
-	bevel_modifier = obj.modifiers.new(name='Bevel', type='BEVEL')
-	bevel_modifier.offset_type = 'OFFSET'
-	bevel_modifier.use_clamp_overlap = True
-	bevel_modifier.limit_method = 'WEIGHT'
-	bevel_modifier.width = width
-	bevel_modifier.segments = segments
-	bevel_modifier.profile = 0.5
-	bpy.context.view_layer.objects.active = obj
-	bpy.ops.object.modifier_apply(modifier=bevel_modifier.name)
 
 
 
+def dot_float_vectors(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+	"""
+	(N, 3)のfloat32の配列同士の行ごとの内積を、mathutilsの`Vector.dot`と同じ精度で計算する（doubleで計算される）。
+	"""
+	products = a.astype(np.float64) * b.astype(np.float64)
+	return products[:, 0] + products[:, 1] + products[:, 2]
 
 
 
 
 
+def normalize_float_vectors(vectors: np.ndarray) -> np.ndarray:
+	"""
+	(N, 3)のfloat32の配列の各行を、mathutilsの`Vector.normalized`と同じ精度で正規化する。長さがほぼ0のベクトルは0ベクトルになる。
+	"""
+	squared_lengths = dot_float_vectors(vectors, vectors)
+	lengths = np.sqrt(squared_lengths).astype(np.float32)
+	inverse = np.zeros_like(lengths)
+	np.divide(np.float32(1.0), lengths, out=inverse, where=squared_lengths > 1.0e-35)
+	return vectors * inverse[:, np.newaxis]
 
 
-def apply_bevel_modifier_to_edges(obj: bpy.types.Object, width: float, edge_select_func: Callable[[bmesh.types.BMEdge], bool], segments: int = 1) -> None:
-	select_edges_by_condition(obj, lambda edge: edge_select_func(edge))
-	set_bevel_weight(obj)
 
-	# ベベルモディファイアを追加、適用
-	apply_bevel_modifier(obj, width, segments=segments)
 
 
+def set_edges_selection(obj: bpy.types.Object, mask: np.ndarray) -> None:
+	"""
+	マスクがTrueの辺とその両端の頂点だけを選択し、それ以外の選択を解除する。隠されている辺は選択しない。
+	オブジェクトモードで呼ぶこと。
 
+	Parameters
+	----------
+	obj : bpy.types.Object
+		対象のオブジェクト。
+	mask : np.ndarray
+		辺ごとのboolの配列。
+	"""
+	mesh = obj.data
+	# 隠されている辺が無い場合は`.hide_edge`属性自体が無い
+	if mesh.attributes.get('.hide_edge') is not None:
+		mask = mask & ~read_mesh_attribute(mesh, '.hide_edge', len(mesh.edges), 1, bool)
 
+	edge_vertices = read_mesh_attribute(mesh, '.edge_verts', len(mesh.edges), 2, np.int32)
+	vertex_mask = np.zeros(len(mesh.vertices), dtype=bool)
+	vertex_mask[edge_vertices[mask].ravel()] = True
 
+	mesh.vertices.foreach_set('select', vertex_mask)
+	mesh.edges.foreach_set('select', mask)
+	mesh.polygons.foreach_set('select', np.zeros(len(mesh.polygons), dtype=bool))
+	mesh.update()
 
 
 
 
 
-def calc_linked_face_dot(edge: bmesh.types.BMEdge) -> float | None:
+def select_edges_by_mask(obj: bpy.types.Object, calc_mask: Callable[[EdgeAdjacencyIndex], np.ndarray]) -> None:
 	"""
-	辺を共有する2つの面の法線の内積を計算する。辺に対する面が2つでなかった場合はNoneを返す。
+	`calc_mask`が`EdgeAdjacencyIndex`から計算したマスクで辺を選択する。
+	編集モードの場合はいったんオブジェクトモードに戻して編集内容をメッシュに反映し、配列でまとめて計算してから編集モードに戻る。
 
 	Parameters
 	----------
-	edge : bmesh.types.BMEdge
-		内積を計算する辺。
-
-	Returns
-	-------
-	float
-		法線の内積。
+	obj : bpy.types.Object
+		対象のオブジェクト。
+	calc_mask : Callable[[EdgeAdjacencyIndex], np.ndarray]
+		メッシュのインデックスを受け取り、辺ごとのboolの配列を返す関数。
 	"""
-	linked_faces = edge.link_faces
-	if len(linked_faces) == 2:
-		# 両面の法線を取得
-		n1 = linked_faces[0].normal
-		n2 = linked_faces[1].normal
-
-		# 法線の内積を計算
-		return n1.dot(n2)
-	else:
-		return None
-
-
-
+	in_edit_mode = obj.mode == 'EDIT'
+	if in_edit_mode:
+		bpy.ops.mesh.select_mode(type='EDGE')
+		set_mode('OBJECT')
 
+	set_edges_selection(obj, calc_mask(get_edge_adjacency_index(obj.data)))
 
+	if in_edit_mode:
+		set_mode('EDIT')
 
 
 
@@ -1282,29 +3447,14 @@ def calc_linked_face_dot(edge: bmesh.types.BMEdge) -> float | None:
 def select_edges_on_fair_surface(obj: bpy.types.Object, threshold_degree: float = 0) -> None:
 	"""
 	平面上にある辺（隣接する面の法線が同じ辺）を選択します。
+	辺ごとに`calc_linked_face_dot`を呼ぶ代わりに、`EdgeAdjacencyIndex`で全ての辺をまとめて判定する。
 
 	Parameters
 	----------
 	obj : bpy.types.Object
 		法線を比較して辺を選択する対象のBlenderオブジェクト。
 	"""
-	bpy.ops.mesh.select_mode(type='EDGE')
-	bm = bmesh.from_edit_mesh(obj.data)
-
-	# まず選択を解除
-	bpy.ops.mesh.select_all(action='DESELECT')
-
-	# 閾値値の角度を内積の値に変換
-	threshold_radian = math.radians(threshold_degree)
-	cos_value = math.cos(threshold_radian)
-
-	for edge in bm.edges:
-		dot = calc_linked_face_dot(edge)
-		if dot is not None and dot >= cos_value:
-			edge.select = True
-
-	# 更新を反映
-	bmesh.update_edit_mesh(obj.data)
+	select_edges_by_mask(obj, lambda index: index.fair_edges(threshold_degree))
 
 
 
@@ -1326,28 +3476,7 @@ def select_edges_along_axis(obj: bpy.types.Object, axis: tuple[bool, bool, bool]
 	axis : tuple[bool, bool, bool]
 		軸を指定するタプル(X, Y, Z)。同時に複数の軸を指定可。
 	"""
-	bpy.ops.mesh.select_mode(type='EDGE')
-	bm = bmesh.from_edit_mesh(obj.data)
-
-	# まず選択を解除
-	bpy.ops.mesh.select_all(action='DESELECT')
-
-	# 閾値値の角度を内積の値に変換
-	threshold_radian = math.radians(threshold_degree)
-	cos_value = math.cos(threshold_radian)
-
-	VECTORS = [Vector((1, 0, 0)), Vector((0, 1, 0)), Vector((0, 0, 1))]
-	for edge in bm.edges:
-		edge_vector = (edge.verts[1].co - edge.verts[0].co).normalized()
-
-		for i in range(3):
-			if axis[i]:
-				dot_abs = abs(edge_vector.dot(VECTORS[i]))
-				if dot_abs >= cos_value:
-					edge.select = True
-
-	# 更新を反映
-	bmesh.update_edit_mesh(obj.data)
+	select_edges_by_mask(obj, lambda index: index.edges_along_axis(axis, threshold_degree))
 
 
 
@@ -1368,6 +3497,7 @@ def select_edges_by_condition(obj: bpy.types.Object, condition_func: Callable[[b
 		選択の条件となるboolを返す関数。
 	"""
 	bm = bmesh.new()
+	count_event('bmesh_round_trip')
 	bm.from_mesh(obj.data)
 	bm.select_flush(True)
 	for edge in bm.edges:
@@ -1399,6 +3529,7 @@ def select_verts_by_condition(obj: bpy.types.Object, condition_func: Callable[[b
 		選択の条件となるboolを返す関数。
 	"""
 	bm = bmesh.new()
+	count_event('bmesh_round_trip')
 	bm.from_mesh(obj.data)
 	bm.select_flush(True)
 	for vert in bm.verts:
@@ -1437,6 +3568,17 @@ def is_edge_along_z_axis(edge: bmesh.types.BMEdge) -> bool:
 
 
 
+def edges_along_z_axis_mask(index: EdgeAdjacencyIndex) -> np.ndarray:
+	"""
+	`is_edge_along_z_axis`の配列版。`apply_bevel_modifier_to_edges`の`edge_mask_func`用。
+	"""
+	z = index.arrays.coords[index.arrays.edge_vertices, 2]
+	return z[:, 0] == z[:, 1]
+
+
+
+
+
 
 
 
@@ -1461,6 +3603,16 @@ def is_edge_along_z_axis2(edge: bmesh.types.BMEdge) -> bool:
 
 
 
+def edges_along_z_axis2_mask(index: EdgeAdjacencyIndex) -> np.ndarray:
+	"""
+	`is_edge_along_z_axis2`の配列版。`apply_bevel_modifier_to_edges`の`edge_mask_func`用。
+	"""
+	return np.abs(index.edge_directions[:, 2].astype(np.float64)) >= 0.99
+
+
+
+
+
 
 
 
@@ -1476,8 +3628,7 @@ def clear_bevel_weight(obj: bpy.types.Object) -> None:
 	obj : bpy.types.Object
 		_description_
 	"""
-	select_edges_by_condition(obj, lambda edge: True)
-	set_bevel_weight(obj, bevel_weight=0.0)
+	set_edge_bevel_weight_by_mask(obj, np.ones(len(obj.data.edges), dtype=bool), bevel_weight=0.0)
 
 
 
@@ -1519,21 +3670,77 @@ def set_bevel_weight(obj: bpy.types.Object, bevel_weight: float = 1.0) -> None:
 	bevel_weight : float, optional
 		設定するベベルウェイトの値。省略した場合は1.0。
 	"""
+	mesh = obj.data
+	# 何も選択されていない場合は`.select_edge`属性自体が無い
+	selected = np.zeros(len(mesh.edges), dtype=bool)
+	if mesh.attributes.get('.select_edge') is not None:
+		selected = read_mesh_attribute(mesh, '.select_edge', len(mesh.edges), 1, bool)
+	set_edge_bevel_weight_by_mask(obj, selected, bevel_weight=bevel_weight)
+
+
+
+
+
+def set_edge_bevel_weight_by_mask(obj: bpy.types.Object, mask: np.ndarray, bevel_weight: float = 1.0) -> None:
+	"""
+	マスクがTrueの辺に Bevel Weight を設定する。bmeshを使わず、`bevel_weight_edge`属性に直接書き込む。
+	マスクがFalseの辺の Bevel Weight は変更しない。オブジェクトモードで呼ぶこと。
+
+	Parameters
+	----------
+	obj : bpy.types.Object
+		対象のオブジェクト。
+	mask : np.ndarray
+		辺ごとのboolの配列。
+	bevel_weight : float, optional
+		設定するベベルウェイトの値。省略した場合は1.0。
+	"""
+	mesh = obj.data
+	attribute = mesh.attributes.get('bevel_weight_edge')
+	if attribute is None:
+		attribute = mesh.attributes.new('bevel_weight_edge', 'FLOAT', 'EDGE')
+		weights = np.zeros(len(mesh.edges), dtype=np.float32)
+	else:
+		weights = read_mesh_attribute(mesh, 'bevel_weight_edge', len(mesh.edges), 1, np.float32)
+
+	weights[mask] = bevel_weight
+	attribute.data.foreach_set('value', weights)
+
+	# これも忘れないように実行しないと即時反映されない
+	mesh.update()
+
+
+
+
+
+def set_edge_bevel_weight_by_condition(obj: bpy.types.Object, condition_func: Callable[[bmesh.types.BMEdge], bool], bevel_weight: float = 1.0) -> None:
+	"""
+	条件に合った辺に Bevel Weight を設定する。辺の選択を経由せず、1回のbmeshの読み書きで設定する。
+	配列で判定できる条件なら`set_edge_bevel_weight_by_mask`の方が速い。
+
+	Parameters
+	----------
+	obj : bpy.types.Object
+		対象のオブジェクト。
+	condition_func : Callable[[bmesh.types.BMEdge], bool]
+		Bevel Weight を設定する条件となるboolを返す関数。
+	bevel_weight : float, optional
+		設定するベベルウェイトの値。省略した場合は1.0。
+	"""
 	bm = bmesh.new()
+	count_event('bmesh_round_trip')
 	bm.from_mesh(obj.data)
 
 	# Bevel Weightのレイヤーを取得（存在しない場合は新しく作成）
 	KEY = 'bevel_weight_edge'
 	bevel_layer = bm.edges.layers.float.get(KEY, bm.edges.layers.float.new(KEY))
 	for edge in bm.edges:
-		if edge.select:
+		if condition_func(edge):
 			edge[bevel_layer] = bevel_weight
 
 	# 更新
 	bm.to_mesh(obj.data)
 	bm.free()
-
-	# これも忘れないように実行しないと即時反映されない
 	obj.data.update()
 
 
@@ -1556,6 +3763,7 @@ def set_verts_bevel_weight(obj: bpy.types.Object, bevel_weight: float = 1.0) ->
 		設定するベベルウェイトの値。省略した場合は1.0。
 	"""
 	bm = bmesh.new()
+	count_event('bmesh_round_trip')
 	bm.from_mesh(obj.data)
 
 	# Bevel Weightのレイヤーを取得（存在しない場合は新しく作成）
@@ -0,0 +1,131 @@
+# バイナリSTLを書き込むための関数。
+# 別プロセスで実行できるように、このモジュールではbpyを使わずNumPyだけで書いている。
+import os
+import time
+import struct
+import numpy as np
+from collections.abc import Iterable
+
+
+
+
+
+
+
+
+
+
+# バイナリSTLの1三角形分のレコード（法線、3頂点、属性バイト数）。合計50バイト
+STL_RECORD_DTYPE = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+
+# 一度に書き込む三角形の数。メモリ使用量はこれに比例する（65536三角形で約3MB）
+STL_CHUNK_TRIANGLES = 65536
+
+STL_HEADER = b'Binary STL exported by Romly Blender Add-on'
+
+
+
+
+
+
+
+
+
+
+def transform_to_world(coords: np.ndarray, triangles: np.ndarray, matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+	"""
+	ローカル座標の頂点をワールド座標に変換する。負のスケールで裏返っている場合は三角形の向きを反転する。
+
+	Parameters
+	----------
+	coords : np.ndarray
+		頂点座標の(N, 3)の配列。
+	triangles : np.ndarray
+		三角形の頂点インデックスの(T, 3)の配列。
+	matrix : np.ndarray
+		オブジェクトのワールド行列（4x4）。
+
+	Returns
+	-------
+	tuple[np.ndarray, np.ndarray]
+		ワールド座標の頂点の(N, 3)のfloat32の配列と、三角形の頂点インデックスの配列。
+	"""
+	matrix = np.asarray(matrix, dtype=np.float64)
+	coords = (coords.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]).astype(np.float32)
+	if np.linalg.det(matrix[:3, :3]) < 0:
+		triangles = triangles[:, ::-1]
+	return coords, triangles
+
+
+
+
+
+def write_triangles(f, coords: np.ndarray, triangles: np.ndarray, records: np.ndarray) -> None:
+	"""
+	三角形を`records`の大きさずつ、法線を計算しながらバイナリSTLのレコードとして書き込む。
+
+	Parameters
+	----------
+	f : file object
+		書き込み先のファイル。
+	coords : np.ndarray
+		ワールド座標の頂点の(N, 3)の配列。
+	triangles : np.ndarray
+		三角形の頂点インデックスの(T, 3)の配列。
+	records : np.ndarray
+		書き込みに使うバッファ。`STL_RECORD_DTYPE`の配列。
+	"""
+	chunk_triangles = len(records)
+	for start in range(0, len(triangles), chunk_triangles):
+		chunk = triangles[start:start + chunk_triangles]
+		chunk_records = records[:len(chunk)]
+		vertices = coords[chunk]
+		chunk_records['vertices'] = vertices
+
+		# 面の法線
+		normals = np.cross(vertices[:, 1] - vertices[:, 0], vertices[:, 2] - vertices[:, 0])
+		lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+		np.divide(normals, lengths, out=normals, where=lengths > 0)
+		chunk_records['normal'] = normals
+
+		f.write(chunk_records.tobytes())
+
+
+
+
+
+def write_binary_stl_arrays(filepath: str, parts: Iterable[tuple[np.ndarray, np.ndarray, np.ndarray]], chunk_triangles: int = STL_CHUNK_TRIANGLES) -> tuple[str, int, int, float]:
+	"""
+	配列で渡されたメッシュをバイナリSTLとして書き込む。
+
+	Parameters
+	----------
+	filepath : str
+		書き込むファイルのパス。
+	parts : Iterable[tuple[np.ndarray, np.ndarray, np.ndarray]]
+		(ローカル座標の頂点の(N, 3)の配列, 三角形の頂点インデックスの(T, 3)の配列, ワールド行列)のイテラブル。
+		ジェネレーターを渡せば、1つずつ取り出しながら書き込むので全体をメモリに持たなくて済む。
+	chunk_triangles : int, optional
+		一度に書き込む三角形の数。
+
+	Returns
+	-------
+	tuple[str, int, int, float]
+		(ファイルのパス, 書き込んだ三角形の数, ファイルサイズ, 書き込みにかかった時間（秒）)
+	"""
+	start_time = time.perf_counter()
+	num_triangles = 0
+	with open(filepath, 'wb') as f:
+		# 三角形の数は最後に分かるので、先に0で書いておいて後で書き直す
+		f.write(STL_HEADER.ljust(80, b' '))
+		f.write(struct.pack('<I', 0))
+
+		records = np.zeros(chunk_triangles, dtype=STL_RECORD_DTYPE)
+		for coords, triangles, matrix in parts:
+			coords, triangles = transform_to_world(coords, triangles, matrix)
+			write_triangles(f, coords, triangles, records)
+			num_triangles += len(triangles)
+
+		f.seek(80)
+		f.write(struct.pack('<I', num_triangles))
+	return filepath, num_triangles, os.path.getsize(filepath), time.perf_counter() - start_time